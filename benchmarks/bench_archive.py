@@ -0,0 +1,103 @@
+"""Benchmark: disk use and cold-read bytes, one flat archive vs monthly segments.
+
+Both projects record the same consultations; the segmented one closes its
+archive segment after each month's batch, as the first record of the next
+month would. Cold reads start from empty caches and are measured with
+``rchar`` from /proc/self/io (Linux). Run with
+``python benchmarks/bench_archive.py [months] [consultations per month]``.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    ARCHIVE_FILES,
+    SEGMENT_DIR,
+    build_memory_response,
+    close_archive_segment,
+    get_backend,
+    invalidate_memory_cache,
+    load_lessons,
+    record_consultation,
+)
+
+TOPICS = ["database cache tier", "kubernetes deploy probes", "jwt secret rotation", "queue backpressure"]
+
+
+def _record(project: str, i: int) -> None:
+    topic = TOPICS[i % len(TOPICS)]
+    record_consultation(
+        project_dir=project,
+        session_id=None,
+        goal=f"{topic} for service {i}",
+        strategist_summary=f"Roll out the {topic} change behind a flag, one service at a time.",
+        critic_summary=f"The {topic} change needs a rollback path and an owner on call.",
+        decision=f"Ship the {topic} change for service {i} behind a flag.",
+        strategist_lesson=f"Staged rollouts of the {topic} kept service {i} reversible.",
+        critic_lesson=f"Without alerts on the {topic}, service {i} regressed silently.",
+        hub_lesson=f"Service {i}: decide the {topic} owner before shipping.",
+    )
+
+
+def _disk_bytes(project: str, archive_only: bool = False) -> int:
+    memory_dir = Path(project) / ".council" / "memory"
+    archive = {*ARCHIVE_FILES, "lessons-index.json", "decisions-index.json"}
+    return sum(
+        p.stat().st_size
+        for p in memory_dir.rglob("*")
+        if p.is_file() and (not archive_only or p.name in archive or p.parent.name == SEGMENT_DIR)
+    )
+
+
+def _rchar() -> int:
+    with open("/proc/self/io") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("rchar:"))
+
+
+def _cold_read(run) -> int:
+    invalidate_memory_cache()
+    memory._segment_lessons.cache_clear()
+    memory._segment_member.cache_clear()
+    start = _rchar()
+    run()
+    return _rchar() - start
+
+
+def main() -> None:
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    per_month = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    with tempfile.TemporaryDirectory() as flat, tempfile.TemporaryDirectory() as segmented:
+        for project in (flat, segmented):
+            (Path(project) / ".council" / "memory").mkdir(parents=True)
+        for month in range(months):
+            for i in range(month * per_month, (month + 1) * per_month):
+                _record(flat, i)
+                _record(segmented, i)
+            if month < months - 1:
+                close_archive_segment(segmented)
+            invalidate_memory_cache()
+
+        recent = f"S-{months * per_month:03d}"
+        workloads = [
+            ("disk, all files", _disk_bytes),
+            ("disk, archive + sidecar", lambda p: _disk_bytes(p, archive_only=True)),
+            ("cold load (goal)", lambda p: _cold_read(
+                lambda: build_memory_response(p, goal="database cache tier", max_tokens=4000)
+            )),
+            ("cold recent-session lessons", lambda p: _cold_read(lambda: get_backend(p).session_lessons({recent}))),
+            ("cold old-session lessons", lambda p: _cold_read(lambda: get_backend(p).session_lessons({"S-005"}))),
+            ("cold full lesson scan", lambda p: _cold_read(lambda: load_lessons(p))),
+        ]
+        print(f"{months} months x {per_month} consultations")
+        print(f"{'workload':<30} {'flat':>12} {'segmented':>12} {'ratio':>6}")
+        for name, measure in workloads:
+            a, b = measure(flat), measure(segmented)
+            print(f"{name:<30} {a:>12,} {b:>12,} {b / a:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
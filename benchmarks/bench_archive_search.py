@@ -0,0 +1,87 @@
+"""Benchmark: council_memory_search page cost vs reading the archive files whole.
+
+Records consultations over several months (closing a segment per month, as
+the first record of a new month would) and compares what an agent gets:
+the bytes of decisions.md plus the role logs it used to read in full, against
+one search page. Search latency is reported cold (parse caches empty), warm
+(every file already parsed and indexed), right after one more record (only
+the appended sections are parsed) and, for a topic filter, cold and warm
+(records tagged once), plus a cold search of the last ten sessions (read at
+the offset indexes, other segments left closed). Run with
+``python benchmarks/bench_archive_search.py [months] [consultations per month]``.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import close_archive_segment, invalidate_memory_cache, load_segment_manifest, search_archive
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_archive import _record
+
+
+def _timed(run) -> tuple[float, dict]:
+    start = time.perf_counter()
+    result = run()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    per_month = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    with tempfile.TemporaryDirectory() as project:
+        memory_dir = Path(project) / ".council" / "memory"
+        memory_dir.mkdir(parents=True)
+        for month in range(months):
+            for i in range(month * per_month, (month + 1) * per_month):
+                _record(project, i)
+            if month < months - 1:
+                close_archive_segment(project)
+            invalidate_memory_cache()
+
+        full_read = sum(p.stat().st_size for p in memory_dir.glob("*.md")) + sum(
+            info["bytes"]
+            for segment in load_segment_manifest(project)["segments"]
+            for name, info in segment["files"].items()
+            if name.endswith(".md")
+        )
+
+        def search():
+            return search_archive(project, query="jwt secret rotation rollback")
+
+        def topic_search():
+            return search_archive(project, query="rollback", topic="security")
+
+        invalidate_memory_cache()
+        memory._segment_member.cache_clear()
+        cold, page = _timed(search)
+        warm, _ = _timed(search)
+        _record(project, months * per_month)
+        appended, _ = _timed(search)
+        invalidate_memory_cache()
+        topic_cold, _ = _timed(topic_search)
+        topic_warm, _ = _timed(topic_search)
+        invalidate_memory_cache()
+        last = months * per_month + 1
+        recent, _ = _timed(lambda: search_archive(project, query="rollback", sessions=(f"S-{last - 9:03d}", "")))
+        page_bytes = sum(len(str(hit)) for hit in page["hits"])
+
+        print(f"{months} months x {per_month} consultations, {page['total']} matching records")
+        print(f"{'read whole logs + decisions':<32} {full_read:>10,} bytes")
+        print(f"{'one search page (10 hits)':<32} {page_bytes:>10,} bytes")
+        print(f"{'search, cold':<32} {cold * 1000:>8.1f}ms")
+        print(f"{'search, warm':<32} {warm * 1000:>8.1f}ms")
+        print(f"{'search, after one record':<32} {appended * 1000:>8.1f}ms")
+        print(f"{'topic search, cold':<32} {topic_cold * 1000:>8.1f}ms")
+        print(f"{'topic search, warm':<32} {topic_warm * 1000:>8.1f}ms")
+        print(f"{'last 10 sessions, cold':<32} {recent * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: server-side auto-compaction time and entries kept per role size.
+
+Seeds each role with recorded entries (features stored) of which about half
+reword an earlier one (a word swapped, added or dropped, as lessons restated
+across sessions tend to be) and times council_memory_autocompact's engine end to end:
+load, cluster, apply the detail-level rules and write atomically. Run with
+``python benchmarks/bench_autocompact.py [sizes...]``.
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import _with_features, auto_compact, invalidate_memory_cache
+
+SUBJECTS = ["pgbouncer", "the JWT keys", "the Redis cache", "the deploy probes", "the Kafka consumers", "the CDN"]
+ACTIONS = ["monitor", "rotate", "load-test", "document", "version", "rate-limit", "shard", "pin"]
+WHEN = ["before every release", "weekly", "after each incident", "during onboarding", "per environment"]
+FILLERS = ["always", "carefully", "in production", "for every service", "with an owner"]
+
+
+def _reword(text: str, rng: random.Random) -> str:
+    words = text.rstrip(".").split()
+    k = rng.randrange(len(words))
+    edit = rng.choice(["swap", "add", "drop"])
+    if edit == "swap":
+        words[k] = rng.choice(FILLERS).split()[0]
+    elif edit == "add":
+        words.insert(k, rng.choice(FILLERS))
+    elif len(words) > 4:
+        del words[k]
+    return " ".join(words) + "."
+
+
+def _entries(role: str, n: int, rng: random.Random) -> list[dict]:
+    texts: list[str] = []
+    entries = []
+    for i in range(1, n + 1):
+        if texts and rng.random() < 0.5:
+            text = _reword(rng.choice(texts), rng)
+        else:
+            text = f"{rng.choice(ACTIONS).capitalize()} {rng.choice(SUBJECTS)} {rng.choice(WHEN)} ({i})."
+            texts.append(text)
+        entries.append(_with_features({
+            "id": f"M-{role}-{i:03d}",
+            "topics": ["infrastructure"],
+            "text": text,
+            "importance": rng.randint(1, 10),
+            "pinned": rng.random() < 0.05,
+            "created": "2026-01-01T00:00:00+00:00",
+            "last_validated": "2026-01-01T00:00:00+00:00",
+            "referenced_count": rng.randint(0, 3),
+            "source_sessions": [f"S-{i:03d}"],
+            "supersedes": [],
+        }))
+    return entries
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [20, 100, 500]
+    rng = random.Random(21)
+    print(f"{'entries/role':>12} {'kept/role':>10} {'lowered':>8} {'time':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as project:
+            memory_dir = Path(project) / ".council" / "memory"
+            memory_dir.mkdir(parents=True)
+            for role in ("strategist", "critic", "hub"):
+                data = {"version": 2, "role": role, "entries": _entries(role, n, rng)}
+                (memory_dir / f"{role}-active.json").write_text(json.dumps(data), encoding="utf-8")
+            invalidate_memory_cache()
+            start = time.perf_counter()
+            report = auto_compact(project)
+            elapsed = time.perf_counter() - start
+            kept = sum(info["after"] for info in report.values()) / 3
+            lowered = sum(len(info["downgraded"]) for info in report.values()) / 3
+            print(f"{n:>12} {kept:>10.0f} {lowered:>8.0f} {elapsed * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
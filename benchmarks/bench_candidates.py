@@ -0,0 +1,51 @@
+"""Benchmark: curator input, every active entry vs compaction candidate groups.
+
+Seeds each role as bench_autocompact does (about half the entries reword an
+earlier one), runs auto-compaction first as /council:maintain does, then
+compares what the curator reads: the role's entries (without features) as
+before, against the compaction_candidates report. Run with
+``python benchmarks/bench_candidates.py [sizes...]``.
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import auto_compact, compaction_candidates, invalidate_memory_cache, load_active
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_autocompact import _entries
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [20, 100, 500]
+    rng = random.Random(25)
+    print(f"{'entries':>8} {'after auto':>10} {'entries bytes':>14} {'groups':>7} {'groups bytes':>13} {'time':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as project:
+            memory_dir = Path(project) / ".council" / "memory"
+            memory_dir.mkdir(parents=True)
+            data = {"version": 2, "role": "strategist", "entries": _entries("strategist", n, rng)}
+            (memory_dir / "strategist-active.json").write_text(json.dumps(data), encoding="utf-8")
+            invalidate_memory_cache()
+            auto_compact(project, ["strategist"])
+
+            entries = load_active(project, "strategist")["entries"]
+            full = json.dumps([{k: v for k, v in e.items() if k != "features"} for e in entries])
+            start = time.perf_counter()
+            report = compaction_candidates(project, "strategist")
+            elapsed = time.perf_counter() - start
+            print(
+                f"{n:>8} {len(entries):>10} {len(full):>14,} {len(report['groups']):>7} "
+                f"{len(json.dumps(report)):>13,} {elapsed * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
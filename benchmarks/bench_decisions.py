@@ -0,0 +1,70 @@
+"""Benchmark: fetching decisions by session, whole-file parse vs the offset index.
+
+Records a growing number of consultations and fetches one decision, and the
+latest decisions of one topic, twice: by reading and splitting all of
+decisions.md (what an agent or a full scan had to do) and through
+decisions-index.json with fetch_decisions. Reports bytes read and time. Run
+with ``python benchmarks/bench_decisions.py [sizes...]``.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import _decision_spans, fetch_decisions, invalidate_memory_cache, load_decisions_index, record_consultation
+
+TOPICS = ["database cache tier", "kubernetes deploy probes", "jwt secret rotation", "queue backpressure"]
+
+
+def _record(project: str, i: int) -> None:
+    topic = TOPICS[i % len(TOPICS)]
+    record_consultation(
+        project_dir=project,
+        session_id=None,
+        goal=f"{topic} for service {i}",
+        strategist_summary=f"Roll out the {topic} change behind a flag, one service at a time.",
+        critic_summary=f"The {topic} change needs a rollback path and an owner on call.",
+        decision=f"Ship the {topic} change for service {i} behind a flag.",
+    )
+
+
+def _best_of(run, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 1000, 2000]
+    print(f"{'decisions':>10} {'file bytes':>11} {'read bytes':>11} {'full parse':>11} {'one session':>12} {'topic':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as project:
+            (Path(project) / ".council" / "memory").mkdir(parents=True)
+            for i in range(n):
+                _record(project, i)
+            invalidate_memory_cache()
+            path = Path(project) / ".council" / "memory" / "decisions.md"
+            session = f"S-{n // 2:03d}"
+
+            def full_parse():
+                _, spans = _decision_spans(path.read_text(encoding="utf-8"))
+                return [span for span in spans if span[0] == session]
+
+            offset, length, _, topics = load_decisions_index(project)["sessions"][session][0]
+            full = _best_of(full_parse)
+            one = _best_of(lambda: fetch_decisions(project, [session]))
+            topic = _best_of(lambda: fetch_decisions(project, topic=topics[0], limit=5))
+            print(
+                f"{n:>10} {path.stat().st_size:>11,} {length:>11,} "
+                f"{full * 1000:>9.1f}ms {one * 1000:>10.2f}ms {topic * 1000:>8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
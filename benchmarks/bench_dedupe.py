@@ -0,0 +1,77 @@
+"""Benchmark: active-entry growth and record latency with near-duplicate merging on and off.
+
+Replays consultations whose lessons are often restatements of earlier ones
+(case, punctuation and a leading "Always"/"Remember:" changed) and reports
+the active entries left and the record latency, with the merge threshold at
+its default and disabled. Run with ``python benchmarks/bench_dedupe.py [consultations]``.
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import load_active, record_consultation
+
+SUBJECTS = ["pgbouncer", "the JWT keys", "the Redis cache", "the deploy probes", "the Kafka consumers", "the CDN"]
+ACTIONS = ["monitor", "rotate", "load-test", "document", "version", "rate-limit", "shard", "pin"]
+WHEN = ["before every release", "weekly", "after each incident", "during onboarding", "per environment"]
+
+
+def _restate(lesson: str, rng: random.Random) -> str:
+    variant = rng.choice([str.lower, str.upper, str.strip])(lesson).rstrip(".")
+    return rng.choice(["", "Always ", "Remember: "]) + variant + rng.choice([".", "!", ""])
+
+
+def _lessons(n: int, rng: random.Random) -> list[str]:
+    seen: list[str] = []
+    lessons = []
+    for _ in range(n):
+        if seen and rng.random() < 0.6:
+            lessons.append(_restate(rng.choice(seen), rng))
+        else:
+            lesson = f"{rng.choice(ACTIONS).capitalize()} {rng.choice(SUBJECTS)} {rng.choice(WHEN)}."
+            seen.append(lesson)
+            lessons.append(lesson)
+    return lessons
+
+
+def _replay(lessons: list[str]) -> tuple[int, float]:
+    latencies = []
+    with tempfile.TemporaryDirectory() as project:
+        (Path(project) / ".council" / "memory").mkdir(parents=True)
+        for i, lesson in enumerate(lessons):
+            start = time.perf_counter()
+            record_consultation(
+                project_dir=project,
+                session_id=None,
+                goal=f"operations review {i}",
+                strategist_summary="s",
+                critic_summary="c",
+                decision="d",
+                strategist_lesson=lesson,
+            )
+            latencies.append(time.perf_counter() - start)
+        return len(load_active(project, "strategist")["entries"]), statistics.median(latencies)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    lessons = _lessons(n, random.Random(20))
+    print(f"{n} consultations, {len(set(l.lower().strip('.!') for l in lessons))} distinct lesson strings")
+    print(f"{'merging':<10} {'active entries':>15} {'record p50':>12}")
+    threshold = memory.DEDUPE_THRESHOLD
+    for name, value in (("off", 1.01), ("on", threshold)):
+        memory.DEDUPE_THRESHOLD = value
+        entries, p50 = _replay(lessons)
+        print(f"{name:<10} {entries:>15} {p50 * 1000:>10.2f}ms")
+    memory.DEDUPE_THRESHOLD = threshold
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: newest-200 session lessons without a sidecar, full rebuild vs backwards scan.
+
+Before the backwards reader, a lessons.jsonl not covered by lessons-index.json
+(legacy archives, hand edits) was re-indexed from the first byte on every load.
+The scan reads from the end and stops at the cap, so its cost follows recent
+history. Run with ``python benchmarks/bench_lessons_tail.py [sizes...]``.
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import load_lessons_index, read_session_lessons
+
+WORDS = "cache schema index deploy rollback token latency queue replica shard probe budget pool".split()
+
+
+def _write(project: str, n: int, rng: random.Random) -> set[str]:
+    memory_dir = Path(project) / ".council" / "memory"
+    memory_dir.mkdir(parents=True, exist_ok=True)
+    sessions = n // 3
+    with open(memory_dir / "lessons.jsonl", "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "ts": "2026-01-01T00:00:00+00:00",
+                "lesson": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))) + ".",
+                "source": rng.choice(["strategist", "critic", "hub"]),
+                "session": f"S-{i * sessions // n + 1:03d}",
+            }) + "\n")
+    # A goal's topic sessions: mostly recent, one from the start of the archive.
+    return {f"S-{sessions - k:03d}" for k in range(0, 240, 3)} | {"S-001"}
+
+
+def _best(run, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 500_000]
+    rng = random.Random(18)
+    print(f"{'lessons':>8} {'rebuild':>10} {'scan':>10} {'ratio':>6}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as project:
+            sessions = _write(project, n, rng)
+            rebuild = _best(lambda: read_session_lessons(project, sessions, lidx=load_lessons_index(project)))
+            scan = _best(lambda: read_session_lessons(project, sessions))
+            assert read_session_lessons(project, sessions) == read_session_lessons(
+                project, sessions, lidx=load_lessons_index(project)
+            )
+            print(f"{n:>8} {rebuild * 1000:>8.1f}ms {scan * 1000:>8.1f}ms {scan / rebuild:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: value captured per token, greedy three-branch packer vs optimal packer.
+
+Value is score x level value (PACKING_LEVELS) summed over the packed lines,
+the objective the optimal packer maximizes. Run with
+``python benchmarks/bench_packing.py [entries per role]``.
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    MemoryEntry,
+    _entry_choices,
+    _pack_entries,
+    _pack_entries_optimal,
+    _Retrieval,
+    estimate_tokens,
+    save_active,
+)
+
+TOPICS = ["database", "infrastructure", "performance", "security", "frontend", "testing"]
+WORDS = "cache schema index deploy rollback token latency queue replica shard probe budget".split()
+GOALS = ["database schema rollback", "cache latency for the api", "deploy probes on kubernetes", ""]
+BUDGETS = [1500, 2500, 4000, 8000]
+
+
+def _entries(role: str, n: int, rng: random.Random) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(1, n + 1):
+        # Mostly short lessons, with the occasional long write-up.
+        length = rng.choice([12, 20, 30, 45]) if rng.random() < 0.85 else rng.randint(250, 700)
+        first = f"{role.title()} lesson {i} on {rng.choice(WORDS)} {rng.choice(WORDS)}."
+        body = " ".join(rng.choice(WORDS) for _ in range(length))
+        created = (now - timedelta(days=rng.randint(0, 150))).isoformat()
+        entries.append({
+            "id": f"M-{role}-{i:03d}",
+            "topics": rng.sample(TOPICS, 2),
+            "text": f"{first} {body}.",
+            "headline": first,
+            "importance": rng.randint(1, 10),
+            "created": created,
+            "last_validated": created,
+        })
+    return entries
+
+
+def _value(sections: list[str], all_entries: list[tuple[float, MemoryEntry]], now: datetime) -> float:
+    values = {}
+    for score, entry in all_entries:
+        for line, _, level in _entry_choices(entry, now):
+            values[line] = score * level
+    return sum(values.get(line, 0.0) for line in sections)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as project:
+        (Path(project) / ".council" / "memory").mkdir(parents=True)
+        for role in ("strategist", "critic", "hub"):
+            save_active(project, role, {"version": 1, "role": role, "entries": _entries(role, n, rng)})
+
+        retrieval = _Retrieval(project)
+        now = retrieval.now
+        print(f"{3 * n} entries, {len(GOALS)} goals")
+        print(f"{'budget':>7} {'packer':>8} {'value':>8} {'tokens':>7} {'value/1k tok':>13} {'entries':>8} {'ms':>7}")
+        for budget in BUDGETS:
+            rows = {"greedy": [], "optimal": []}
+            for goal in GOALS:
+                scored = retrieval.score(retrieval.query(goal), "overlap")
+                all_entries = sorted(((s, e) for s, _, e in scored), key=lambda x: x[0], reverse=True)
+                tier0 = f"## Your Memory (0 consultations, budget: {budget} tokens)\n"
+                remaining = budget - estimate_tokens(tier0)
+                for name, pack in (("greedy", _pack_entries), ("optimal", _pack_entries_optimal)):
+                    start = time.perf_counter()
+                    sections, _, packed = pack(tier0, all_entries, remaining, goal, now)
+                    elapsed = time.perf_counter() - start
+                    tokens = estimate_tokens("\n".join(sections[1:]))
+                    rows[name].append((_value(sections, all_entries, now), tokens, len(packed), elapsed))
+            for name, results in rows.items():
+                value = statistics.mean(r[0] for r in results)
+                tokens = statistics.mean(r[1] for r in results)
+                print(
+                    f"{budget:>7} {name:>8} {value:>8.2f} {tokens:>7.0f} {value / tokens * 1000:>13.2f}"
+                    f" {statistics.mean(r[2] for r in results):>8.1f} {max(r[3] for r in results) * 1000:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
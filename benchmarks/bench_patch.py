@@ -0,0 +1,91 @@
+"""Benchmark: curator payload and write time, full-array compact vs patch operations.
+
+Makes the same curator edit (delete 3 entries, lower 5, merge 2 pairs)
+to roles of growing size, once as the full ``compacted_entries`` array
+council_memory_compact needs and once as council_memory_patch operations,
+and reports the JSON each call carries and the server-side time. Run with
+``python benchmarks/bench_patch.py [sizes...]``.
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    _with_features,
+    apply_compaction,
+    apply_patch_ops,
+    invalidate_memory_cache,
+    load_active,
+    patch_entries,
+)
+
+
+def _seed(project: str, n: int) -> None:
+    memory_dir = Path(project) / ".council" / "memory"
+    memory_dir.mkdir(parents=True)
+    entries = [
+        _with_features({
+            "id": f"M-strategist-{i:03d}",
+            "topics": ["infrastructure"],
+            "detail_level": 3,
+            "text": f"Lesson {i}: stage the rollout of service {i} behind a flag and keep a rollback path ready.",
+            "headline": f"Stage the rollout of service {i}.",
+            "importance": 1 + i % 10,
+            "pinned": False,
+            "created": "2026-01-01T00:00:00+00:00",
+            "last_validated": "2026-01-01T00:00:00+00:00",
+            "last_referenced": "2026-01-01T00:00:00+00:00",
+            "referenced_count": i % 4,
+            "source_sessions": [f"S-{i:03d}"],
+            "supersedes": [],
+        })
+        for i in range(1, n + 1)
+    ]
+    data = {"version": 2, "role": "strategist", "entries": entries}
+    (memory_dir / "strategist-active.json").write_text(json.dumps(data), encoding="utf-8")
+    invalidate_memory_cache()
+
+
+def _ops() -> list[dict]:
+    ops: list[dict] = [{"op": "delete", "ids": ["M-strategist-001", "M-strategist-002", "M-strategist-003"]}]
+    ops += [{"op": "update", "id": f"M-strategist-{i:03d}", "importance": 2, "detail_level": 1} for i in range(4, 9)]
+    ops += [
+        {"op": "merge", "ids": [f"M-strategist-{i:03d}", f"M-strategist-{i + 1:03d}"],
+         "entry": {"text": f"Stage the rollouts of services {i} and {i + 1} behind one flag."}}
+        for i in (9, 11)
+    ]
+    return ops
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [20, 100, 500]
+    print(f"{'entries':>8} {'compact bytes':>14} {'patch bytes':>12} {'compact':>10} {'patch':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as full, tempfile.TemporaryDirectory() as patched:
+            _seed(full, n)
+            _seed(patched, n)
+            ops = _ops()
+            # What the curator would have to send back through the LLM for the same edit.
+            entries = apply_patch_ops("strategist", load_active(full, "strategist")["entries"], ops)
+            payload = json.dumps([{k: v for k, v in e.items() if k != "features"} for e in entries])
+
+            start = time.perf_counter()
+            apply_compaction(full, "strategist", json.loads(payload))
+            compact_time = time.perf_counter() - start
+            start = time.perf_counter()
+            patch_entries(patched, "strategist", json.loads(json.dumps(ops)), 0)
+            patch_time = time.perf_counter() - start
+
+            print(
+                f"{n:>8} {len(payload):>14,} {len(json.dumps(ops)):>12,} "
+                f"{compact_time * 1000:>8.1f}ms {patch_time * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
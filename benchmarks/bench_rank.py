@@ -0,0 +1,76 @@
+"""Benchmark: ranking active entries for a load, every entry vs the budget-bounded set.
+
+Seeds the strategist role with a growing number of entries, 1% of which
+mention the goal, and times _Retrieval.score with and without the view's
+token budget, plus the whole load, on a warm parse cache with the retrieval
+index in place (as in a running server). Reports how many entries each mode
+scores. Run with ``python benchmarks/bench_rank.py [sizes...]``.
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import _Retrieval, build_memory_response, save_active
+
+GOAL = "pgbouncer connection pooling"
+BUDGET = 4000
+
+
+def _entries(n: int, rng: random.Random) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(1, n + 1):
+        stamp = (now - timedelta(days=rng.randint(0, 120))).isoformat()
+        subject = "pgbouncer connection pooling" if i % 100 == 0 else f"service {i} rollout window"
+        entries.append({
+            "id": f"M-strategist-{i:05d}",
+            "topics": [],
+            "text": f"Note {i}: keep the {subject} documented and reviewed each quarter.",
+            "importance": rng.randint(1, 9),
+            "created": stamp,
+            "last_validated": stamp,
+        })
+    return entries
+
+
+def _best_of(run, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 5000, 20000]
+    rng = random.Random(3)
+    print(f"{'entries':>8} {'scored all':>11} {'scored':>7} {'score all':>10} {'budgeted':>9} {'load':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as project:
+            memory_dir = Path(project) / ".council" / "memory"
+            memory_dir.mkdir(parents=True)
+            save_active(project, "strategist", {"version": 2, "role": "strategist", "entries": _entries(n, rng)})
+            build_memory_response(project, goal=GOAL, max_tokens=BUDGET)  # warm the parse cache
+
+            retrieval = _Retrieval(project, "strategist")
+            query = retrieval.query(GOAL)
+            full = retrieval.score(query, "overlap")
+            budgeted = retrieval.score(query, "overlap", BUDGET)
+            all_time = _best_of(lambda: retrieval.score(query, "overlap"))
+            budget_time = _best_of(lambda: retrieval.score(query, "overlap", BUDGET))
+            load_time = _best_of(lambda: build_memory_response(project, goal=GOAL, max_tokens=BUDGET))
+            print(
+                f"{n:>8} {len(full):>11} {len(budgeted):>7} {all_time * 1000:>8.1f}ms "
+                f"{budget_time * 1000:>7.1f}ms {load_time * 1000:>7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
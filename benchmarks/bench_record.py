@@ -0,0 +1,61 @@
+"""Benchmark: latency and bytes written per recorded consultation.
+
+Run with ``python benchmarks/bench_record.py [consultations]``.
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import _MemoryTransaction, record_consultation
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_file: Counter = Counter()
+    totals: list[int] = []
+    original = _MemoryTransaction.commit
+
+    def counting_commit(self):
+        written = original(self)
+        per_file.update(self.bytes_written)
+        totals.append(written)
+        return written
+
+    _MemoryTransaction.commit = counting_commit
+    latencies = []
+    with tempfile.TemporaryDirectory() as project:
+        (Path(project) / ".council" / "memory").mkdir(parents=True)
+        for i in range(n):
+            start = time.perf_counter()
+            record_consultation(
+                project_dir=project,
+                session_id=None,
+                goal=f"scale the database cache tier for service {i}",
+                strategist_summary="Add a read-through cache in front of the primary.",
+                critic_summary="Invalidation is the risk; keep TTLs short.",
+                decision=f"Ship the cache behind a flag (iteration {i}).",
+                strategist_lesson=f"Cache warmup matters for service {i}.",
+                critic_lesson=f"Short TTLs bounded staleness for service {i}.",
+                hub_lesson=f"Flagged rollouts kept service {i} reversible.",
+            )
+            latencies.append(time.perf_counter() - start)
+            memory.invalidate_memory_cache()
+    _MemoryTransaction.commit = original
+
+    latencies.sort()
+    print(f"{n} consultations")
+    print(f"  latency  p50 {statistics.median(latencies) * 1000:.2f} ms   p95 {latencies[int(n * 0.95) - 1] * 1000:.2f} ms")
+    print(f"  bytes    {sum(totals) / n:,.0f} per consultation")
+    for name, size in per_file.most_common():
+        print(f"    {name:24s} {size / n:10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
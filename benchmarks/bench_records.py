@@ -0,0 +1,158 @@
+"""Benchmark: memory and scoring latency, raw dicts vs slotted MemoryEntry/Lesson records.
+
+The dict side re-implements the pre-record scorers (dict lookups, one regex
+tokenization per lesson per goal, a features-signature check per entry per
+load); the record side calls the engine. Run with
+``python benchmarks/bench_records.py [lessons] [entries]``.
+"""
+
+import json
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    GoalQuery,
+    Lesson,
+    MemoryEntry,
+    _derive_features,
+    _entry_features,
+    _feature_relevance,
+    _features_sig,
+    _score_lesson,
+)
+
+WORDS = "cache schema index deploy rollback token latency queue replica shard probe budget pool".split()
+TOPICS = ["database", "infrastructure", "performance", "security", "frontend", "testing"]
+GOALS = ["database schema rollback", "cache latency for the api", "deploy probes on kubernetes", "pool the replica"]
+
+
+def _lesson_lines(n: int, rng: random.Random) -> list[bytes]:
+    return [
+        json.dumps({
+            "ts": "2026-01-01T00:00:00+00:00",
+            "lesson": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))) + ".",
+            "source": rng.choice(["strategist", "critic", "hub"]),
+            "session": f"S-{rng.randint(1, n // 5 + 1):03d}",
+        }).encode("utf-8")
+        for _ in range(n)
+    ]
+
+
+def _entry_lines(n: int, rng: random.Random) -> list[bytes]:
+    now = datetime.now(timezone.utc)
+    lines = []
+    for i in range(1, n + 1):
+        created = (now - timedelta(days=rng.randint(0, 150))).isoformat()
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 60))) + "."
+        entry = {
+            "id": f"M-hub-{i:05d}",
+            "topics": rng.sample(TOPICS, 2),
+            "detail_level": 3,
+            "text": text,
+            "headline": text[:60],
+            "importance": rng.randint(1, 10),
+            "pinned": False,
+            "created": created,
+            "last_validated": created,
+            "last_referenced": created,
+            "referenced_count": 0,
+            "source_sessions": [f"S-{i:03d}"],
+            "supersedes": [],
+        }
+        entry["features"] = _derive_features(entry)
+        lines.append(json.dumps(entry).encode("utf-8"))
+    return lines
+
+
+# --- Dict reference (the scorers as they were before the record types) ---
+def _dict_score_lesson(lesson: dict, query: GoalQuery) -> float:
+    if not query.filtered_words:
+        return 0.0
+    lesson_words = set(re.findall(r"[a-z0-9-]+", lesson.get("lesson", "").lower()))
+    return len(query.filtered_words & lesson_words) / max(len(query.filtered_words), 1)
+
+
+def _dict_entry_features(entry: dict, now: datetime) -> tuple:
+    features = entry["features"]
+    assert features["sig"] == _features_sig(MemoryEntry.from_dict(entry))
+    now_ts = now.timestamp()
+    days_old, stale_days = (int((now_ts - ts) // 86400) for ts in (features["created"], features["validated"]))
+    recency = max(0.0, 0.3 - days_old * 0.01)
+    staleness = 1.0 if entry.get("pinned") or stale_days <= 90 else 0.7
+    return frozenset(features["terms"].split()), set(features["topics"]), recency, staleness
+
+
+def _retained(build) -> tuple[object, int]:
+    """(result, bytes still allocated once ``build`` returns)."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _best(run, records: list = (), repeat: int = 5) -> float:
+    """Best process time of ``run``; the memoized word sets of ``records`` are reset first."""
+    timings = []
+    for _ in range(repeat):
+        for record in records:
+            record._words = None
+        start = time.process_time()
+        run()
+        timings.append(time.process_time() - start)
+    return min(timings)
+
+
+def main() -> None:
+    n_lessons = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(5)
+    now = datetime.now(timezone.utc)
+    queries = [GoalQuery.from_goal(goal, now=now) for goal in GOALS]
+
+    print(f"{'workload':<34} {'dicts':>10} {'records':>10} {'ratio':>6}")
+
+    def row(name: str, dicts: float, records: float, unit: str) -> None:
+        print(f"{name:<34} {dicts:>8.1f}{unit} {records:>8.1f}{unit} {records / dicts:>6.2f}")
+
+    lines = _lesson_lines(n_lessons, rng)
+    dict_lessons, dict_bytes = _retained(lambda: [json.loads(line) for line in lines])
+    lessons, record_bytes = _retained(lambda: [Lesson.from_json(line) for line in lines])
+    row(f"{n_lessons} lessons, resident", dict_bytes / 2**20, record_bytes / 2**20, "MB")
+    row(
+        f"score {len(GOALS)} goals",
+        _best(lambda: [_dict_score_lesson(l, q) for q in queries for l in dict_lessons]) * 1000,
+        _best(lambda: [_score_lesson(l, q) for q in queries for l in lessons], lessons) * 1000,
+        "ms",
+    )
+
+    lines = _entry_lines(n_entries, rng)
+    dict_entries, dict_bytes = _retained(lambda: [json.loads(line) for line in lines])
+    entries, record_bytes = _retained(lambda: [MemoryEntry.from_json(line) for line in lines])
+    row(f"{n_entries} entries, resident", dict_bytes / 2**20, record_bytes / 2**20, "MB")
+
+    # One load per goal; records live in the parse cache across loads, dicts are re-checked.
+    def score_dicts() -> None:
+        for query in queries:
+            for entry in dict_entries:
+                relevance = _feature_relevance(_dict_entry_features(entry, now), query)
+                relevance * 0.6 + entry.get("importance", 5) / 10.0 * 0.4
+
+    def score_records() -> None:
+        for query in queries:
+            for entry in entries:
+                relevance = _feature_relevance(_entry_features(entry, now), query)
+                relevance * 0.6 + (5 if entry.importance is None else entry.importance) / 10.0 * 0.4
+
+    row(f"score {len(GOALS)} loads", _best(score_dicts) * 1000, _best(score_records, entries) * 1000, "ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: topic-keyword quality, arbitrary set truncation vs counted keywords.
+
+Simulates consultations whose goals name a seed topic plus topic-specific and
+generic (shared) vocabulary, both Zipf-distributed, and grows the topic index
+both ways: the old ``list(existing | words)[:30]`` and the counted model in the
+engine. Held-out goals carry no seed keyword, so only dynamic keywords can
+tag them; precision and recall are measured against the topic they were drawn
+from. Run with ``python benchmarks/bench_topic_keywords.py [consultations] [seed]``.
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import _STOPWORDS, TOPIC_KEYWORDS, _grow_topic_keywords, extract_topics
+
+TOPICS = ["database", "security", "infrastructure", "frontend", "testing", "performance"]
+
+
+def _vocabulary(rng: random.Random, n: int, taken: set[str]) -> list[str]:
+    """Made-up words that match no seed keyword (so only dynamic keywords can tag them)."""
+    words: list[str] = []
+    while len(words) < n:
+        word = "".join(rng.choice("bfghklmnprstvwz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+        if word not in taken and not extract_topics(word):
+            taken.add(word)
+            words.append(word)
+    return words
+
+
+def _zipf(rng: random.Random, words: list[str], k: int) -> list[str]:
+    return rng.choices(words, weights=[1 / (rank + 1) for rank in range(len(words))], k=k)
+
+
+def _grow(topic_index: dict, text: str, topics: list[str], consultation: int, counted: bool) -> None:
+    words = {w for w in re.findall(r"[a-z0-9-]+", text.lower()) if len(w) >= 4} - _STOPWORDS
+    for topic in topics:
+        entry = topic_index.setdefault(topic, {"keywords": []})
+        if counted:
+            _grow_topic_keywords(entry, words, consultation)
+        else:
+            entry["keywords"] = list(set(entry["keywords"]) | words)[:30]
+
+
+def main() -> None:
+    consultations = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 19)
+    taken: set[str] = set()
+    specific = {topic: _vocabulary(rng, 40, taken) for topic in TOPICS}
+    generic = _vocabulary(rng, 60, taken)
+
+    indexes = {"truncated": {}, "counted": {}}
+    for n in range(1, consultations + 1):
+        topics = rng.sample(TOPICS, rng.choice([1, 1, 2]))
+        words = [rng.choice(TOPIC_KEYWORDS[t][:3]) for t in topics]
+        for topic in topics:
+            words += _zipf(rng, specific[topic], 4)
+        words += _zipf(rng, generic, 5)
+        text = " ".join(words)
+        goal_topics = sorted(extract_topics(text) & set(TOPICS))
+        for name, topic_index in indexes.items():
+            _grow(topic_index, text, goal_topics, n, counted=name == "counted")
+
+    held_out = []
+    for _ in range(2000):
+        topic = rng.choice(TOPICS)
+        held_out.append((topic, " ".join(_zipf(rng, specific[topic], 3) + _zipf(rng, generic, 3))))
+
+    print(f"{consultations} consultations, {len(held_out)} held-out goals")
+    print(f"{'model':<10} {'keywords':>9} {'precision':>10} {'recall':>8}")
+    for name, topic_index in indexes.items():
+        tagged = hits = 0
+        for topic, goal in held_out:
+            found = extract_topics(goal, topic_index) & set(TOPICS)
+            tagged += len(found)
+            hits += topic in found
+        keywords = sum(len(info["keywords"]) for info in topic_index.values())
+        print(f"{name:<10} {keywords:>9} {hits / max(tagged, 1):>10.3f} {hits / len(held_out):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: compiled topic matcher vs the original nested substring loop.
+
+Run with ``python benchmarks/bench_topic_matcher.py [topics] [keywords]``.
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import SYNONYM_MAP, TOPIC_KEYWORDS, extract_topics
+
+
+def legacy_extract_topics(text: str, topic_index: dict | None = None) -> set[str]:
+    raw_words = set(re.findall(r"[a-z0-9-]+", text.lower()))
+    expanded = {SYNONYM_MAP[w] for w in raw_words if w in SYNONYM_MAP}
+    word_seq = re.findall(r"[a-z0-9]+", text.lower())
+    bigrams = {f"{word_seq[i]}-{word_seq[i+1]}" for i in range(len(word_seq) - 1)}
+    words = raw_words | expanded | bigrams
+    keyword_map = {t: list(kws) for t, kws in TOPIC_KEYWORDS.items()}
+    if topic_index:
+        for topic, info in topic_index.items():
+            dynamic_kws = info.get("keywords", [])
+            if topic in keyword_map:
+                keyword_map[topic] = list(set(keyword_map[topic] + dynamic_kws))
+            else:
+                keyword_map[topic] = dynamic_kws
+    topics = set()
+    for topic, keywords in keyword_map.items():
+        if keywords and any(kw in words or any(kw in w for w in words) for kw in keywords):
+            topics.add(topic)
+    return topics
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+
+
+def main(n_topics: int = 120, n_keywords: int = 30, n_goals: int = 300) -> None:
+    rng = random.Random(42)
+    topic_index = {
+        f"topic{t}": {"keywords": [_word(rng) for _ in range(n_keywords)], "decision_ids": []}
+        for t in range(n_topics)
+    }
+    vocab = [kw for info in topic_index.values() for kw in info["keywords"]]
+    goals = [
+        " ".join(rng.choice(vocab) if rng.random() < 0.2 else _word(rng) for _ in range(20))
+        for _ in range(n_goals)
+    ]
+
+    for goal in goals:
+        assert extract_topics(goal, topic_index) == legacy_extract_topics(goal, topic_index)
+
+    start = time.perf_counter()
+    for goal in goals:
+        legacy_extract_topics(goal, topic_index)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for goal in goals:
+        extract_topics(goal, topic_index)
+    compiled = time.perf_counter() - start
+
+    print(f"topics={n_topics} keywords/topic={n_keywords} goals={n_goals}")
+    print(f"legacy substring loop: {legacy / n_goals * 1e6:9.1f} us/call")
+    print(f"compiled matcher:      {compiled / n_goals * 1e6:9.1f} us/call")
+    print(f"speedup:               {legacy / compiled:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
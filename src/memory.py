@@ -1,10 +1,30 @@
 """Three-tier, budget-aware, goal-filtered memory engine for The Council."""
 
+import bisect
+import copy
+import gzip
+import hashlib
+import heapq
 import json
+import math
+import os
 import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache, wraps
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: locking degrades to a no-op
+    fcntl = None
+
 # ---------------------------------------------------------------------------
 # Topic extraction (zero-dependency, keyword-based)
 # ---------------------------------------------------------------------------
@@ -56,6 +76,166 @@ SYNONYM_MAP: dict[str, str] = {
 }
 
 
+# Dynamic keywords: kept per topic, with counts for a wider candidate pool
+KEYWORD_CAP = 30
+KEYWORD_POOL = 90
+KEYWORD_HALF_LIFE = 20  # consultations for an unseen keyword's count to halve
+SPECIFIC_TOPICS = 2  # a dynamic keyword kept by more topics than this needs corroboration
+
+
+class _TopicMatcher:
+    """Aho-Corasick automaton over every topic keyword.
+
+    Reports each topic whose keywords occurring as a substring of a scanned
+    word (``any(kw in w for w in words)``) weigh at least 1 in total, in a
+    single pass over the characters of the words. Seed keywords weigh 1, so
+    one occurrence is enough; see ``_compile_topic_matcher`` for dynamic ones.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out", "_partial", "_weights", "_empty_topics")
+
+    def __init__(self, keyword_map: dict[str, dict[str, float]]):
+        goto: list[dict[str, int]] = [{}]
+        out: list[set[str]] = [set()]  # topics of full-weight keywords ending here
+        partial: list[set[int]] = [set()]  # ids of lighter keywords ending here
+        weights: list[tuple[str, float]] = []
+        empty_topics: set[str] = set()
+        for topic, keywords in keyword_map.items():
+            for kw, weight in keywords.items():
+                if not kw:
+                    # "" is a substring of every word
+                    empty_topics.add(topic)
+                    continue
+                node = 0
+                for ch in kw:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[node][ch] = nxt
+                        goto.append({})
+                        out.append(set())
+                        partial.append(set())
+                    node = nxt
+                if weight >= 1.0:
+                    out[node].add(topic)
+                else:
+                    partial[node].add(len(weights))
+                    weights.append((topic, weight))
+
+        # Failure links (BFS so shallower nodes are resolved first)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] |= out[fail[child]]
+                partial[child] |= partial[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [frozenset(o) for o in out]
+        self._partial = [frozenset(p) for p in partial]
+        self._weights = weights
+        self._empty_topics = frozenset(empty_topics)
+
+    def match(self, words) -> set[str]:
+        """Return the topics whose keywords occurring in ``words`` weigh at least 1."""
+        goto, fail, out, partial = self._goto, self._fail, self._out, self._partial
+        found: set[str] = set()
+        hits: set[int] = set()
+        for w in words:
+            found |= self._empty_topics
+            node = 0
+            for ch in w:
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                if out[node]:
+                    found |= out[node]
+                if partial[node]:
+                    hits |= partial[node]
+        if hits:
+            totals: dict[str, float] = {}
+            for i in hits:
+                topic, weight = self._weights[i]
+                totals[topic] = totals.get(topic, 0.0) + weight
+            found.update(topic for topic, total in totals.items() if total >= 1.0 - 1e-9)
+        return found
+
+
+def _topic_matcher_key(topic_index: dict | None) -> tuple:
+    """Hashable snapshot of the dynamic keywords; changes whenever they change."""
+    if not topic_index:
+        return ()
+    return tuple(
+        (topic, tuple(info.get("keywords", [])), "keyword_stats" in info) for topic, info in topic_index.items()
+    )
+
+
+@lru_cache(maxsize=16)
+def _compile_topic_matcher(key: tuple) -> _TopicMatcher:
+    """Merge dynamic keywords with the seed keywords (which weigh 1) into one matcher.
+
+    A dynamic keyword of a topic with ``keyword_stats`` weighs its inverse
+    topic frequency, ``log(topics / topics keeping it)``, relative to that of a
+    word kept by SPECIFIC_TOPICS topics (capped at 1). A word most topics
+    picked up from their goals says little about any one of them, so it only
+    counts together with other keywords of the topic; one kept by every topic
+    never counts. Keywords of topics grown before counts were kept weigh 1.
+    """
+    spread = Counter(kw for _, dynamic_kws, _ in key for kw in set(dynamic_kws))
+    n_topics = len(key)
+    keyword_map: dict[str, dict[str, float]] = {t: dict.fromkeys(kws, 1.0) for t, kws in TOPIC_KEYWORDS.items()}
+    for topic, dynamic_kws, counted in key:
+        weights = keyword_map.setdefault(topic, {})
+        for kw in dynamic_kws:
+            weight = 1.0
+            if counted and n_topics > SPECIFIC_TOPICS:
+                weight = min(1.0, math.log(n_topics / spread[kw]) / math.log(n_topics / SPECIFIC_TOPICS))
+            if weight > 0:
+                weights[kw] = max(weights.get(kw, 0.0), weight)
+    return _TopicMatcher(keyword_map)
+
+
+def get_topic_matcher(topic_index: dict | None = None) -> _TopicMatcher:
+    """Return the compiled matcher for seed + dynamic keywords.
+
+    Compiled matchers are cached, so the automaton is only rebuilt when the
+    topic_index keywords change.
+    """
+    return _compile_topic_matcher(_topic_matcher_key(topic_index))
+
+
+def _keyword_score(stat: list[int], consultation: int) -> float:
+    count, seen = stat
+    return count * 0.5 ** ((consultation - seen) / KEYWORD_HALF_LIFE)
+
+
+def _grow_topic_keywords(entry: dict, words: set[str], consultation: int) -> None:
+    """Count ``words`` for one topic entry and re-rank its dynamic keywords.
+
+    ``keyword_stats`` maps keyword -> [occurrences, consultation number last
+    seen]. Keywords rank by count halved every KEYWORD_HALF_LIFE consultations
+    without them, ties by the keyword itself, so eviction is deterministic: the
+    best KEYWORD_POOL keep their counts and the best KEYWORD_CAP match.
+    """
+    stats = entry.get("keyword_stats")
+    if stats is None:
+        # Grown before counts were kept: one occurrence each, last seen long ago
+        stats = {kw: [1, 0] for kw in entry.get("keywords", [])}
+    stats = dict(stats)
+    for w in words:
+        stats[w] = [stats[w][0] + 1 if w in stats else 1, consultation]
+    ranked = sorted(stats, key=lambda kw: (-_keyword_score(stats[kw], consultation), kw))
+    entry["keyword_stats"] = {kw: stats[kw] for kw in ranked[:KEYWORD_POOL]}
+    entry["keywords"] = ranked[:KEYWORD_CAP]
+
+
 def extract_topics(text: str, topic_index: dict | None = None) -> set[str]:
     """Extract topic tags from text. Checks dynamic keywords from topic_index first,
     falls back to TOPIC_KEYWORDS seed."""
@@ -69,301 +249,3316 @@ def extract_topics(text: str, topic_index: dict | None = None) -> set[str]:
     bigrams: set[str] = {f"{word_seq[i]}-{word_seq[i+1]}" for i in range(len(word_seq) - 1)}
 
     words = raw_words | expanded_synonyms | bigrams
-    topics = set()
-
-    # Merge dynamic keywords from topic_index with seed keywords
-    keyword_map: dict[str, list[str]] = {t: list(kws) for t, kws in TOPIC_KEYWORDS.items()}
-    if topic_index:
-        for topic, info in topic_index.items():
-            dynamic_kws = info.get("keywords", [])
-            if topic in keyword_map:
-                keyword_map[topic] = list(set(keyword_map[topic] + dynamic_kws))
-            else:
-                keyword_map[topic] = dynamic_kws
+    return get_topic_matcher(topic_index).match(words)
+
+
+# ---------------------------------------------------------------------------
+# Goal analysis (computed once per retrieval, shared by every scorer)
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class GoalQuery:
+    """Pre-analyzed goal: topics, word sets and a fixed "now" for one retrieval."""
+
+    goal: str
+    topics: frozenset[str]
+    raw_words: frozenset[str]
+    synonym_words: frozenset[str]
+    filtered_words: frozenset[str]
+    now: datetime
+
+    @classmethod
+    def from_goal(
+        cls, goal: str, topic_index: dict | None = None, now: datetime | None = None
+    ) -> "GoalQuery":
+        raw_words = frozenset(re.findall(r"[a-z0-9-]+", goal.lower()))
+        return cls(
+            goal=goal,
+            topics=frozenset(extract_topics(goal, topic_index)),
+            raw_words=raw_words,
+            synonym_words=frozenset(SYNONYM_MAP[w] for w in raw_words if w in SYNONYM_MAP),
+            filtered_words=raw_words - _STOPWORDS,
+            now=now or datetime.now(timezone.utc),
+        )
+
+
+def _days_since(timestamp: str, now: datetime) -> int | None:
+    """Whole days between an ISO timestamp and now; None if unparseable."""
+    try:
+        return (now - datetime.fromisoformat(timestamp)).days
+    except (ValueError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Record types (the slotted form retrieval works on)
+# ---------------------------------------------------------------------------
+# Stored order of the entry keys _stage_consultation writes.
+_ENTRY_FIELDS = (
+    "id",
+    "topics",
+    "detail_level",
+    "text",
+    "headline",
+    "importance",
+    "pinned",
+    "created",
+    "last_validated",
+    "last_referenced",
+    "referenced_count",
+    "source_sessions",
+    "supersedes",
+    "features",
+)
+_ENTRY_FIELD_SET = frozenset(_ENTRY_FIELDS)
+_LESSON_FIELDS = ("ts", "lesson", "source", "session")
+
+
+@dataclass(slots=True)
+class MemoryEntry:
+    """A Tier 1 entry as a slotted record.
+
+    Known keys are fields (None when absent); any other key, and any known
+    key stored as null, is kept in ``extra``, so to_dict() returns exactly the
+    mapping from_dict() was given. ``stored`` is the features block when it is
+    current, checked once at load.
+    """
 
-    for topic, keywords in keyword_map.items():
-        if keywords and any(kw in words or any(kw in w for w in words) for kw in keywords):
-            topics.add(topic)
-    return topics
+    id: str | None = None
+    topics: list | None = None
+    detail_level: int | None = None
+    text: str | None = None
+    headline: str | None = None
+    importance: int | None = None
+    pinned: bool | None = None
+    created: str | None = None
+    last_validated: str | None = None
+    last_referenced: str | None = None
+    referenced_count: int | None = None
+    source_sessions: list | None = None
+    supersedes: list | None = None
+    features: dict | None = None
+    extra: dict | None = None
+    stored: dict | None = field(default=None, repr=False, compare=False)
+    _words: frozenset | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MemoryEntry":
+        known = {k: v for k, v in data.items() if k in _ENTRY_FIELD_SET and v is not None}
+        extra = {k: v for k, v in data.items() if k not in known} if len(known) != len(data) else None
+        entry = cls(**known, extra=extra)
+        entry.stored = _stored_features(entry)
+        return entry
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "MemoryEntry":
+        return cls.from_dict(json.loads(raw))
+
+    def to_dict(self) -> dict:
+        data = {k: v for k in _ENTRY_FIELDS if (v := getattr(self, k)) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def tokens(self) -> list[str]:
+        """Words of the entry, tokenized exactly as compute_relevance does."""
+        return re.findall(r"[a-z0-9-]+", f"{self.text or ''} {self.headline or ''}".lower())
+
+    def words(self) -> frozenset[str]:
+        """Distinct tokens, from the stored features when current (memoized)."""
+        if self._words is None:
+            self._words = frozenset(self.stored["terms"].split() if self.stored else self.tokens())
+        return self._words
+
+
+@dataclass(slots=True)
+class Lesson:
+    """One lessons.jsonl record as a slotted object; same round-trip rules as MemoryEntry."""
+
+    ts: str | None = None
+    lesson: str | None = None
+    source: str | None = None
+    session: str | None = None
+    extra: dict | None = None
+    _words: frozenset | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Lesson":
+        get = data.get
+        lesson = cls(get("ts"), get("lesson"), get("source"), get("session"))
+        if len(data) != sum(v is not None for v in (lesson.ts, lesson.lesson, lesson.source, lesson.session)):
+            lesson.extra = {k: v for k, v in data.items() if k not in _LESSON_FIELDS or v is None}
+        return lesson
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "Lesson":
+        return cls.from_dict(json.loads(raw))
+
+    def to_dict(self) -> dict:
+        data = {k: v for k in _LESSON_FIELDS if (v := getattr(self, k)) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def words(self) -> frozenset[str]:
+        """Distinct words of the lesson text (memoized)."""
+        if self._words is None:
+            self._words = frozenset(re.findall(r"[a-z0-9-]+", (self.lesson or "").lower()))
+        return self._words
 
 
 # ---------------------------------------------------------------------------
 # Relevance scoring (goal-aware retrieval)
 # ---------------------------------------------------------------------------
-def compute_relevance(entry: dict, goal: str, topic_index: dict | None = None) -> float:
-    """Score how relevant a memory entry is to the current goal."""
-    entry_topics = set(entry.get("topics", []))
-    goal_topics = extract_topics(goal, topic_index)
+def compute_relevance(
+    entry: "dict | MemoryEntry", goal: "str | GoalQuery", topic_index: dict | None = None
+) -> float:
+    """Score how relevant a memory entry is to the current goal.
 
-    # Topic overlap
-    if entry_topics:
-        topic_score = len(entry_topics & goal_topics) / max(len(entry_topics), 1)
-    else:
-        topic_score = 0.0
+    ``goal`` may be a raw string or a prebuilt GoalQuery; pass a GoalQuery when
+    scoring many entries against the same goal.
+    """
+    query = goal if isinstance(goal, GoalQuery) else GoalQuery.from_goal(goal, topic_index)
+    if isinstance(entry, dict):
+        entry = MemoryEntry.from_dict(entry)
 
     # Keyword overlap (split direct vs synonym scoring)
-    goal_words_raw = set(re.findall(r"[a-z0-9-]+", goal.lower()))
-    goal_words_expanded = {SYNONYM_MAP[w] for w in goal_words_raw if w in SYNONYM_MAP}
-    entry_text = entry.get("text", "") + " " + entry.get("headline", "")
-    entry_words = set(re.findall(r"[a-z0-9-]+", entry_text.lower()))
-    direct_overlap = len(goal_words_raw & entry_words) / max(len(goal_words_raw), 1)
+    entry_words = set(entry.tokens())
+    direct_overlap = len(query.raw_words & entry_words) / max(len(query.raw_words), 1)
     synonym_overlap = (
-        len(goal_words_expanded & entry_words) / max(len(goal_words_expanded), 1)
-        if goal_words_expanded else 0.0
+        len(query.synonym_words & entry_words) / max(len(query.synonym_words), 1)
+        if query.synonym_words else 0.0
     )
     keyword_overlap = direct_overlap + synonym_overlap * 0.5
+    return _combine_relevance(entry, query, keyword_overlap)
 
-    # Recency factor
-    try:
-        created = datetime.fromisoformat(entry.get("created", ""))
-        days_old = (datetime.now(timezone.utc) - created).days
-    except (ValueError, TypeError):
-        days_old = 0
-    recency = max(0.0, 0.3 - (days_old * 0.01))
 
-    base_score = topic_score * 0.5 + keyword_overlap * 0.3 + recency * 0.2
+def _combine_relevance(entry: MemoryEntry, query: GoalQuery, keyword_score: float) -> float:
+    """Blend topic overlap, a keyword score, recency and staleness."""
+    entry_topics = set(entry.topics or ())
+
+    # Topic overlap
+    if entry_topics:
+        topic_score = len(entry_topics & query.topics) / max(len(entry_topics), 1)
+    else:
+        topic_score = 0.0
+
+    base_score = topic_score * 0.5 + keyword_score * 0.3 + _recency(entry, query.now) * 0.2
+    return base_score * _staleness_factor(entry, query.now)
+
+
+RECENCY_DAYS = 30  # age from which _recency is zero
+
+
+def _recency(entry: MemoryEntry, now: datetime, ages: tuple | None = None) -> float:
+    days_old = (ages or _entry_ages(entry, now))[0] or 0
+    return max(0.0, 0.3 - (days_old * 0.01))
+
 
+def _staleness_factor(entry: MemoryEntry, now: datetime, ages: tuple | None = None) -> float:
     # Staleness penalty — pinned entries are ALWAYS exempt
-    if entry.get("pinned"):
-        return base_score
+    if entry.pinned:
+        return 1.0
+    stale_days = (ages or _entry_ages(entry, now))[1] or 0  # non-stale on parse failure
+    return 0.7 if stale_days > 90 else 1.0
+
+
+def _unmatched_relevance(entry: MemoryEntry, now: datetime) -> float:
+    """compute_relevance for an entry sharing no topic or word with the goal.
+
+    Only the recency term survives, so no text tokenization is needed.
+    """
+    ages = _entry_ages(entry, now)
+    return _recency(entry, now, ages) * 0.2 * _staleness_factor(entry, now, ages)
+
+
+def _score_lesson(lesson: "dict | Lesson", query: GoalQuery) -> float:
+    """Lightweight relevance score for archive lessons."""
+    if not query.filtered_words:
+        return 0.0
+    if isinstance(lesson, dict):
+        lesson = Lesson.from_dict(lesson)
+    return len(query.filtered_words & lesson.words()) / max(len(query.filtered_words), 1)
+
+
+# ---------------------------------------------------------------------------
+# BM25 ranking (optional; stats maintained in the retrieval index)
+# ---------------------------------------------------------------------------
+RANKING_MODES = ("overlap", "bm25")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _bm25_query_terms(query: GoalQuery, words: frozenset[str] | None = None) -> dict[str, float]:
+    """Query term weights: direct words at 1.0, synonym expansions at 0.5."""
+    weights = {w: 1.0 for w in (query.raw_words if words is None else words)}
+    if words is None:
+        for w in query.synonym_words:
+            weights.setdefault(w, 0.5)
+    return weights
+
+
+def _bm25(
+    tf: dict[str, int],
+    doc_len: int,
+    query_terms: dict[str, float],
+    df: dict[str, int],
+    n_docs: int,
+    avg_len: float,
+) -> float:
+    """BM25 score of one document, normalized to [0, 1) by the query's upper bound.
+
+    The upper bound is the score of a document with infinite term frequency for
+    every query term, so the result is comparable across queries.
+    """
+    score = 0.0
+    bound = 0.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len) if avg_len else BM25_K1
+    for term, weight in query_terms.items():
+        n_t = df.get(term, 0)
+        idf = math.log(1 + (n_docs - n_t + 0.5) / (n_t + 0.5))
+        bound += weight * idf * (BM25_K1 + 1)
+        f = tf.get(term, 0)
+        if f:
+            score += weight * idf * f * (BM25_K1 + 1) / (f + norm)
+    return score / bound if bound else 0.0
 
-    last_validated_str = entry.get("last_validated") or entry.get("created", "")
+
+def _bm25_lesson_scores(lessons: list[Lesson], query: GoalQuery) -> list[float]:
+    """BM25 over a bounded batch of archive lessons (stats computed on the fly)."""
+    docs = [re.findall(r"[a-z0-9-]+", (l.lesson or "").lower()) for l in lessons]
+    tfs = [Counter(words) for words in docs]
+    df: Counter = Counter()
+    for tf in tfs:
+        df.update(tf.keys())
+    avg_len = sum(len(d) for d in docs) / max(len(docs), 1)
+    query_terms = _bm25_query_terms(query, query.filtered_words)
+    return [_bm25(tf, len(d), query_terms, df, len(docs), avg_len) for tf, d in zip(tfs, docs)]
+
+
+# ---------------------------------------------------------------------------
+# Stale marker for output formatting
+# ---------------------------------------------------------------------------
+def _stale_marker(entry: "dict | MemoryEntry", now: datetime | None = None, ages: tuple | None = None) -> str:
+    if isinstance(entry, dict):
+        entry = MemoryEntry.from_dict(entry)
+    if entry.pinned:
+        return ""
+    days = (ages or _entry_ages(entry, now or datetime.now(timezone.utc)))[1]
+    return f" [stale: {days}d]" if days is not None and days > 90 else ""
+
+
+# ---------------------------------------------------------------------------
+# Token estimation (simple word-based heuristic)
+# ---------------------------------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~0.75 words per token for English."""
+    return _tokens_for_words(len(text.split()))
+
+
+def _tokens_for_words(words: int) -> int:
+    return max(1, int(words * 1.33))
+
+
+# ---------------------------------------------------------------------------
+# Derived entry features (stored on each entry at record and compaction time)
+# ---------------------------------------------------------------------------
+_FEATURES_VERSION = 2
+DETAIL_LEVELS = ("headline", "summary", "full")
+SUMMARY_MAX_WORDS = 40
+
+
+def _features_sig(entry: MemoryEntry) -> int:
+    """Fingerprint of the fields the features derive from (cheap enough for every read)."""
+    fields = [
+        entry.text or "",
+        entry.headline or "",
+        entry.created or "",
+        entry.last_validated or "",
+        entry.detail_level or "",
+        *(entry.topics or ()),
+    ]
+    return zlib.crc32("\x1f".join(map(str, fields)).encode("utf-8"))
+
+
+def _epoch(timestamp: str) -> float | None:
+    """POSIX time of an ISO timestamp; None where _days_since would give None."""
     try:
-        val_dt = datetime.fromisoformat(last_validated_str)
-        stale_days = (datetime.now(timezone.utc) - val_dt).days
+        parsed = datetime.fromisoformat(timestamp)
     except (ValueError, TypeError):
-        stale_days = 0  # default: non-stale on parse failure
+        return None
+    return parsed.timestamp() if parsed.tzinfo is not None else None
+
+
+def _derive_features(entry: dict, minhash: list[int] | None = None) -> dict:
+    """Goal-independent facts about an entry that every load would otherwise re-derive.
+
+    ``terms`` are the entry's distinct words (space-joined, tokenized as
+    compute_relevance does), ``words`` the word counts of its headline,
+    summary and full text, the timestamps are epoch seconds and ``minhash`` is
+    the text's near-duplicate signature (passed in when already known for
+    the same text).
+    """
+    record = MemoryEntry.from_dict(entry)
+    created = record.created or ""
+    return {
+        "v": _FEATURES_VERSION,
+        "sig": _features_sig(record),
+        "terms": " ".join(sorted(set(record.tokens()))),
+        "topics": sorted(set(record.topics or ())),
+        "created": _epoch(created),
+        "validated": _epoch(record.last_validated or created),
+        "words": [len(str(_level_text(record, level)).split()) for level in DETAIL_LEVELS],
+        "minhash": _minhash(_shingles(record.text or "")) if minhash is None else minhash,
+    }
+
+
+def _stored_features(entry: MemoryEntry) -> dict | None:
+    """The entry's stored features block, or None if missing or out of date.
+
+    Readers fall back to deriving what they need from the entry itself; they
+    never write features back (the next record or compaction does).
+    """
+    features = entry.features
+    if (
+        isinstance(features, dict)
+        and features.get("v") == _FEATURES_VERSION
+        and features.get("sig") == _features_sig(entry)
+    ):
+        return features
+    return None
+
+
+def _with_features(entry: dict) -> dict:
+    """``entry`` carrying a current features block (a copy if one had to be derived)."""
+    if MemoryEntry.from_dict(entry).stored is not None:
+        return entry
+    return {**entry, "features": _derive_features(entry)}
+
+
+def _entry_ages(entry: MemoryEntry, now: datetime) -> tuple[int | None, int | None]:
+    """Whole days since the entry was created and since it was last validated."""
+    features = entry.stored
+    if features is None:
+        created = entry.created or ""
+        return _days_since(created, now), _days_since(entry.last_validated or created, now)
+    now_ts = now.timestamp()
+    return tuple(
+        None if ts is None else int((now_ts - ts) // 86400) for ts in (features["created"], features["validated"])
+    )
+
+
+def _entry_tokens_full(entry: MemoryEntry) -> int:
+    """estimate_tokens of the entry's full text."""
+    if entry.stored is None:
+        return estimate_tokens(entry.text or "")
+    return _tokens_for_words(entry.stored["words"][-1])
+
+
+def _level_text(entry: MemoryEntry, level: str) -> str:
+    """The entry's text at ``level``, no longer than its stored ``detail_level`` allows."""
+    cap = entry.detail_level
+    if isinstance(cap, int) and 0 < cap < len(DETAIL_LEVELS) and DETAIL_LEVELS.index(level) >= cap:
+        level = DETAIL_LEVELS[cap - 1]
+    text = entry.text or ""
+    if level == "headline":
+        return text[:80] if entry.headline is None else entry.headline
+    if level == "summary":
+        return _entry_summary(text)
+    return text
+
+
+def _entry_summary(text: str) -> str:
+    """First two sentences of ``text``, capped at SUMMARY_MAX_WORDS words."""
+    words = text.split(maxsplit=SUMMARY_MAX_WORDS)
+    ends = [n for n, w in enumerate(words[:SUMMARY_MAX_WORDS]) if w.endswith((".", "!", "?"))]
+    if len(ends) >= 2:
+        return " ".join(words[: ends[1] + 1])
+    if len(words) > SUMMARY_MAX_WORDS:
+        return " ".join(words[:SUMMARY_MAX_WORDS]) + "..."
+    return " ".join(words)
+
+
+def _entry_line(entry: MemoryEntry, level: str, now: datetime) -> tuple[str, int]:
+    """An entry's packed line at ``level`` (one of DETAIL_LEVELS) and its word count."""
+    entry_id = "?" if entry.id is None else entry.id
+    importance = 0 if entry.importance is None else entry.importance
+    prefix = f"- {entry_id} [imp:{importance}]{_stale_marker(entry, now)}: "
+    line = f"{prefix}{_level_text(entry, level)}"
+    if entry.stored is None:
+        return line, len(line.split())
+    return line, len(prefix.split()) + entry.stored["words"][DETAIL_LEVELS.index(level)]
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection (MinHash signatures, LSH buckets per role)
+# ---------------------------------------------------------------------------
+DEDUPE_THRESHOLD = 0.8  # shingle Jaccard at which a recorded lesson merges into an entry
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+_MINHASH_PRIME = (1 << 31) - 1
+_MINHASH_SEEDS = [
+    (zlib.crc32(f"a{i}".encode()) % (_MINHASH_PRIME - 1) + 1, zlib.crc32(f"b{i}".encode()) % _MINHASH_PRIME)
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+
+def _shingles(text: str) -> frozenset[str]:
+    """The word unigrams and bigrams of ``text`` (lowercased)."""
+    words = re.findall(r"[a-z0-9-]+", text.lower())
+    return frozenset(words) | frozenset(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def _minhash(shingles: frozenset[str]) -> list[int]:
+    """MinHash signature of a shingle set (empty for an empty set)."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in _MINHASH_SEEDS]
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class _NearDuplicates:
+    """LSH buckets over one role's active entries, keyed by band of their MinHash signature.
+
+    Entries are positions in ``entries``. A lesson's candidates are the entries
+    sharing at least one band with it; the candidate with the highest exact
+    shingle Jaccard, if it reaches DEDUPE_THRESHOLD, is its duplicate. Entries
+    without an id, or whose id is not unique, are never merged into.
+    """
+
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        self._buckets: dict[tuple, list[int]] = {}
+        ids = Counter(e.get("id") for e in entries)
+        for pos, entry in enumerate(entries):
+            if entry.get("id") and ids[entry["id"]] == 1:
+                self.add(pos)
+
+    @staticmethod
+    def _bands(signature: list[int]) -> list[tuple]:
+        rows = MINHASH_ROWS
+        return [(band, *signature[band * rows:(band + 1) * rows]) for band in range(len(signature) // rows)]
+
+    def add(self, pos: int) -> None:
+        record = MemoryEntry.from_dict(self.entries[pos])
+        features = record.stored
+        signature = features["minhash"] if features is not None else _minhash(_shingles(record.text or ""))
+        for key in self._bands(signature):
+            self._buckets.setdefault(key, []).append(pos)
+
+    def find(self, text: str) -> int | None:
+        """Position of the entry ``text`` restates, or None."""
+        shingles = _shingles(text)
+        candidates = {pos for key in self._bands(_minhash(shingles)) for pos in self._buckets.get(key, ())}
+        similarity, neg_pos = max(
+            ((_jaccard(shingles, _shingles(self.entries[pos].get("text") or "")), -pos) for pos in candidates),
+            default=(0.0, 0),
+        )
+        return -neg_pos if similarity >= DEDUPE_THRESHOLD else None
+
+
+def _merge_duplicate(entry: dict, session_id: str, now_iso: str, importance: int, pin: bool) -> dict:
+    """``entry`` with a restatement from ``session_id`` folded in (a new dict).
+
+    The restatement's ``importance`` and ``pin`` raise the entry's, never lower them.
+    """
+    sessions = list(entry.get("source_sessions") or [])
+    if session_id not in sessions:
+        sessions.append(session_id)
+    merged = {
+        **entry,
+        "source_sessions": sessions,
+        "referenced_count": (entry.get("referenced_count") or 0) + 1,
+        "last_validated": now_iso,
+        "importance": max(_importance(entry), importance),
+        "pinned": bool(entry.get("pinned")) or pin,
+    }
+    merged["features"] = _derive_features(merged)
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Memory file I/O
+# ---------------------------------------------------------------------------
+def _memory_dir(project_dir: str) -> Path:
+    return Path(project_dir) / ".council" / "memory"
+
+
+# In-process parse cache, one slot table per memory directory. The MCP server
+# is a long-lived process, so repeated loads of an unchanged file reuse the
+# parsed object. Cached objects are shared: callers that mutate one must save
+# it back (which refreshes the slot) or call invalidate_memory_cache().
+# Each slot also keeps a digest of the raw bytes, used to tie sidecar indexes
+# to the exact content they were built from, and a dict of objects derived
+# from the parse (see _cached_derived) that is dropped along with it.
+_PARSE_CACHE: dict[Path, dict[str, tuple[tuple[int, int, int], object, str, dict]]] = {}
+
+
+def _stat_key(path: Path) -> tuple[int, int, int]:
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _serialize_json(data, indent: int | None = None) -> bytes:
+    return json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+
+
+def _read_json(path: Path):
+    """json.loads(path.read_text()), skipped while (mtime, size, inode) are unchanged."""
+    key = _stat_key(path)
+    slots = _PARSE_CACHE.setdefault(path.parent, {})
+    hit = slots.get(path.name)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    raw = path.read_bytes()
+    data = json.loads(raw.decode("utf-8"))
+    slots[path.name] = (key, data, _digest(raw), {})
+    return data
+
+
+def _content_digest(path: Path) -> str | None:
+    """Digest of a JSON file's current content (parsing it through the cache)."""
+    try:
+        _read_json(path)
+    except (OSError, ValueError):
+        return None
+    return _PARSE_CACHE[path.parent][path.name][2]
+
+
+def _cached_derived(path: Path, data) -> dict | None:
+    """The derived-object dict of ``path``'s cache slot, if ``data`` is its cached parse.
+
+    None means ``data`` did not come from the cache, so nothing derived from it may be kept.
+    """
+    hit = _PARSE_CACHE.get(path.parent, {}).get(path.name)
+    return hit[3] if hit is not None and hit[1] is data else None
+
+
+def _prime_cache(path: Path, data, raw: bytes) -> None:
+    _PARSE_CACHE.setdefault(path.parent, {})[path.name] = (_stat_key(path), data, _digest(raw), {})
+
+
+def _write_json(path: Path, data, indent: int | None = None) -> None:
+    """Atomically replace a JSON file and prime the parse cache with ``data``.
+
+    The temporary file gets a unique name, so concurrent writers never replace
+    each other's half-written copy.
+    """
+    raw = _serialize_json(data, indent)
+    fd, tmp = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _prime_cache(path, data, raw)
+
+
+def invalidate_memory_cache(project_dir: str | None = None) -> None:
+    """Drop cached parses for one project, or for every project."""
+    if project_dir is None:
+        _PARSE_CACHE.clear()
+        _ARCHIVE_CACHE.clear()
+    else:
+        _PARSE_CACHE.pop(_memory_dir(project_dir), None)
+        _ARCHIVE_CACHE.pop(_memory_dir(project_dir), None)
+
+
+def load_index(project_dir: str) -> dict:
+    """Load Tier 0 index. Returns empty structure if missing."""
+    index_path = _memory_dir(project_dir) / "index.json"
+    if index_path.exists():
+        try:
+            data = _read_json(index_path)
+            # v1 files read as v2 (the formats only differ in the number); the
+            # next save writes it, so readers under a shared lock never write.
+            if data.get("version", 1) < 2:
+                data["version"] = 2
+            return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return _empty_index()
+
+
+def _empty_index() -> dict:
+    return {
+        "version": 2,
+        "consultation_count": 0,
+        "last_updated": "",
+        "compaction_watermark": "",
+        "recent_decisions": [],
+        "pinned": [],
+        "topic_index": {},
+        "original_prompt": "",
+    }
+
+
+def save_index(project_dir: str, index: dict) -> None:
+    """Write Tier 0 index."""
+    index_path = _memory_dir(project_dir) / "index.json"
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_json(index_path, index, indent=2)
+
+
+def load_active(project_dir: str, role: str) -> dict:
+    """Load Tier 1 active memory for a role."""
+    active_path = _memory_dir(project_dir) / f"{role}-active.json"
+    if active_path.exists():
+        try:
+            data = _read_json(active_path)
+            # v1 files read as v2 (the formats only differ in the number); the
+            # next save writes it, so readers under a shared lock never write.
+            if data.get("version", 1) < 2:
+                data["version"] = 2
+            return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {"version": 2, "role": role, "entries": []}
+
+
+def save_active(project_dir: str, role: str, data: dict) -> None:
+    """Write Tier 1 active memory for a role and refresh its retrieval index."""
+    active_path = _memory_dir(project_dir) / f"{role}-active.json"
+    active_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_json(active_path, data, indent=2)
+    update_retrieval_index(project_dir, role, data)
+
+
+# ---------------------------------------------------------------------------
+# Per-project reader/writer lock (.council/memory/.lock)
+# ---------------------------------------------------------------------------
+_LOCAL = threading.local()
+
+
+class MemoryLock:
+    """Shared (read) or exclusive (write) lock on one project's memory.
+
+    Backed by flock(2) on .council/memory/.lock, so it serializes writers across
+    processes and threads while readers run in parallel. Re-entrant within a
+    thread: an inner acquisition is a no-op, except that an exclusive one
+    inside a shared hold raises RuntimeError (flock cannot upgrade without
+    letting another writer in). Without fcntl (Windows) it is a no-op.
+    Nothing is locked for a project whose memory does not exist yet.
+    """
+
+    def __init__(self, project_dir: str, exclusive: bool = False):
+        self.memory = _memory_dir(project_dir)
+        self.exclusive = exclusive
+        self._file = None
+
+    def __enter__(self) -> "MemoryLock":
+        held = getattr(_LOCAL, "held", None)
+        if held is None:
+            held = _LOCAL.held = {}  # memory dir -> whether held exclusively
+        key = str(self.memory)
+        if key in held:
+            if self.exclusive and not held[key]:
+                raise RuntimeError(f"Exclusive memory lock requested while holding a shared one on {key}.")
+            return self
+        if fcntl is None or not self.memory.is_dir():
+            return self
+        self._file = open(self.memory / ".lock", "a+b")
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+        held[key] = self.exclusive
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._file is None:
+            return
+        _LOCAL.held.pop(str(self.memory), None)
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def _locked(exclusive: bool):
+    """Run a ``(project_dir, ...)`` entry point under the project's memory lock."""
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(project_dir: str, *args, **kwargs):
+            with MemoryLock(project_dir, exclusive=exclusive):
+                return func(project_dir, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ---------------------------------------------------------------------------
+# Inverted index over Tier 1 (sidecar: retrieval-index.json)
+# ---------------------------------------------------------------------------
+_RETRIEVAL_INDEX_VERSION = 2
+RETRIEVAL_INDEX_EVERY = 16  # records between rewrites of retrieval-index.json; loads catch up in between
+
+
+def _entry_tokens(entry: dict) -> list[str]:
+    """Words of an entry, tokenized exactly as compute_relevance does."""
+    entry_text = entry.get("text", "") + " " + entry.get("headline", "")
+    return re.findall(r"[a-z0-9-]+", entry_text.lower())
+
+
+def _entry_keys(ids: list) -> list[str]:
+    """Stable per-role keys from the entry ids, disambiguated when missing or repeated."""
+    keys: list[str] = []
+    seen: set[str] = set()
+    for position, entry_id in enumerate(ids):
+        key = str(entry_id or f"#{position}")
+        if key in seen:
+            key = f"{key}#{position}"
+        seen.add(key)
+        keys.append(key)
+    return keys
+
+
+def _entry_signature(entry: dict) -> str:
+    payload = json.dumps(
+        [entry.get("text", ""), entry.get("headline", ""), sorted(set(entry.get("topics", [])))],
+        ensure_ascii=False,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _doc_stats(entry: dict) -> dict:
+    tokens = _entry_tokens(entry)
+    return {
+        "sig": _entry_signature(entry),
+        "len": len(tokens),
+        "tf": dict(Counter(tokens)),
+        "topics": sorted(set(entry.get("topics", []))),
+    }
+
+
+def _index_role(previous: dict | None, entries: list[dict]) -> dict:
+    """Bring a role's postings and BM25 stats in line with ``entries``.
+
+    Unchanged entries (same key and signature) are reused; only added, removed
+    or edited entries touch the postings, document frequencies and lengths.
+    ``previous`` is never mutated (it may be a shared cached object): touched
+    posting lists are copied on write.
+    """
+    if previous is None:
+        previous = {"docs": {}, "terms": {}, "topics": {}, "df": {}, "total_len": 0}
+    old_docs: dict = previous["docs"]
+    terms: dict[str, list[str]] = dict(previous["terms"])
+    topics: dict[str, list[str]] = dict(previous["topics"])
+    df: dict[str, int] = dict(previous["df"])
+    total_len: int = previous["total_len"]
+    copied: set[tuple[int, str]] = set()
+
+    def postings(table: dict[str, list[str]], name: str) -> list[str]:
+        slot = (id(table), name)
+        if slot not in copied or name not in table:
+            copied.add(slot)
+            table[name] = list(table.get(name, ()))
+        return table[name]
+
+    docs: dict[str, dict] = {}
+    for key, entry in zip(_entry_keys([e.get("id") for e in entries]), entries):
+        old = old_docs.get(key)
+        docs[key] = old if old is not None and old["sig"] == _entry_signature(entry) else _doc_stats(entry)
+
+    for key, doc in old_docs.items():
+        if docs.get(key) is doc:
+            continue
+        for term in doc["tf"]:
+            postings(terms, term).remove(key)
+            if not terms[term]:
+                del terms[term]
+            df[term] -= 1
+            if not df[term]:
+                del df[term]
+        for topic in doc["topics"]:
+            postings(topics, topic).remove(key)
+            if not topics[topic]:
+                del topics[topic]
+        total_len -= doc["len"]
+
+    for key, doc in docs.items():
+        if old_docs.get(key) is doc:
+            continue
+        for term in doc["tf"]:
+            postings(terms, term).append(key)
+            df[term] = df.get(term, 0) + 1
+        for topic in doc["topics"]:
+            postings(topics, topic).append(key)
+        total_len += doc["len"]
+
+    return {"docs": docs, "terms": terms, "topics": topics, "df": df, "total_len": total_len}
+
+
+def load_retrieval_index(project_dir: str) -> dict:
+    """Load the retrieval index sidecar. Returns empty structure if missing."""
+    index_path = _memory_dir(project_dir) / "retrieval-index.json"
+    if index_path.exists():
+        try:
+            data = _read_json(index_path)
+            if data.get("version") == _RETRIEVAL_INDEX_VERSION:
+                return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {"version": _RETRIEVAL_INDEX_VERSION, "roles": {}}
+
+
+def _with_role_indexed(ridx: dict, role: str, entries: list[dict], source: str | None) -> dict:
+    """A new retrieval index with ``role`` re-indexed; ``ridx`` is left untouched.
+
+    ``source`` is the digest of the active file content the postings describe,
+    so readers can detect edits made behind the engine's back.
+    """
+    previous = ridx.get("roles", {}).get(role)
+    if previous is not None and "docs" not in previous:
+        previous = None
+    postings = _index_role(previous, entries)
+    postings["source"] = source
+    return {**ridx, "roles": {**ridx.get("roles", {}), role: postings}}
+
+
+def update_retrieval_index(project_dir: str, role: str, data: dict) -> None:
+    """Re-index a role after its active file was written."""
+    memory = _memory_dir(project_dir)
+    ridx = _with_role_indexed(
+        load_retrieval_index(project_dir),
+        role,
+        data.get("entries", []),
+        _content_digest(memory / f"{role}-active.json"),
+    )
+    _write_json(memory / "retrieval-index.json", ridx)
+
+
+def _role_postings(project_dir: str, role: str, entries: list[dict], ridx: dict) -> dict:
+    """Postings for a role, caught up in memory if the sidecar is missing or trails the active file.
+
+    Catching up re-indexes only the entries that changed since the stored
+    postings, and is kept with the active file's cached parse.
+    """
+    postings = ridx.get("roles", {}).get(role)
+    path = _memory_dir(project_dir) / f"{role}-active.json"
+    source = _content_digest(path)
+    if postings is not None and source is not None and postings.get("source") == source:
+        return postings
+    derived = _cached_derived(path, load_active(project_dir, role)) if source is not None else None
+    hit = derived.get("postings") if derived is not None else None
+    if hit is not None and hit[0] is postings:
+        return hit[1]
+    current = _index_role(postings if postings is not None and "docs" in postings else None, entries)
+    if derived is not None:
+        derived["postings"] = (postings, current)
+    return current
+
+
+def _candidate_keys(postings: dict, query: GoalQuery) -> set[str]:
+    """Entry ids sharing at least one word or topic with the goal."""
+    candidates: set[str] = set()
+    terms = postings.get("terms", {})
+    for word in query.raw_words | query.synonym_words:
+        candidates.update(terms.get(word, ()))
+    topics = postings.get("topics", {})
+    for topic in query.topics:
+        candidates.update(topics.get(topic, ()))
+    return candidates
+
+
+def _entry_order(records: "list[MemoryEntry]") -> dict:
+    """Lookups that let retrieval score a role without visiting every entry.
+
+    ``keys`` and ``positions`` map between _entry_keys and stored positions;
+    ``levels`` lists (importance, positions in stored order, positions newest
+    first) from most to least important, undated entries counting as newest
+    as _recency does; ``pinned`` and ``topics`` (raw topic -> positions) find
+    the entries a lens may boost.
+    """
+    keys = _entry_keys([e.id for e in records])
+    levels: dict = {}
+    created: list[float] = []
+    pinned: list[int] = []
+    topics: dict[str, list[int]] = {}
+    for pos, entry in enumerate(records):
+        levels.setdefault(5 if entry.importance is None else entry.importance, []).append(pos)
+        stamp = entry.stored["created"] if entry.stored is not None else _epoch(entry.created or "")
+        created.append(math.inf if stamp is None else stamp)
+        if entry.pinned:
+            pinned.append(pos)
+        for topic in set(entry.topics or ()):
+            topics.setdefault(topic, []).append(pos)
+    return {
+        "keys": keys,
+        "positions": {key: pos for pos, key in enumerate(keys)},
+        "levels": [
+            (importance, level, sorted(level, key=lambda pos: -created[pos]))
+            for importance, level in sorted(levels.items(), key=lambda level: level[0], reverse=True)
+        ],
+        "pinned": pinned,
+        "topics": topics,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Session-offset index over lessons.jsonl (sidecar: lessons-index.json)
+# ---------------------------------------------------------------------------
+ARCHIVE_LESSON_CAP = 200
+SIDECAR_LAG = 64 * 1024  # appended bytes an offset index may trail its file by before a record rewrites it
+TAIL_BLOCK = 64 * 1024  # bytes per backwards read when no sidecar covers lessons.jsonl
+_SESSION_FIELD = re.compile(rb'"session"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _empty_lessons_index() -> dict:
+    return {"version": 1, "size": 0, "tail": _digest(b""), "count": 0, "sessions": {}}
+
+
+def _tail_bytes(f, size: int) -> bytes:
+    """The last bytes before ``size`` — their digest detects rewrites of the indexed prefix."""
+    start = max(0, size - 64)
+    f.seek(start)
+    return f.read(size - start)
+
+
+def _file_tail(path: Path, size: int) -> bytes:
+    """_tail_bytes of the file at ``path`` (nothing before offset 0)."""
+    if not size:
+        return b""
+    with open(path, "rb") as f:
+        return _tail_bytes(f, size)
+
+
+def _with_lesson_lines(lidx: dict, offset: int, lines, tail: bytes) -> dict:
+    """A new lessons index extended with ``lines`` starting at byte ``offset``.
+
+    ``tail`` holds the bytes just before ``offset``. Only complete
+    (newline-terminated) lines are indexed, so a half-written append is picked
+    up once it is finished. ``lidx`` is left untouched.
+    """
+    sessions = dict(lidx["sessions"])
+    copied: set[str] = set()
+    count = lidx["count"]
+    for raw in lines:
+        if not raw.endswith(b"\n"):
+            break
+        if raw.strip():
+            count += 1
+            try:
+                lesson = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                lesson = None
+            if isinstance(lesson, dict) and isinstance(lesson.get("session"), str):
+                session = lesson["session"]
+                if session not in copied:
+                    copied.add(session)
+                    sessions[session] = list(sessions.get(session, ()))
+                sessions[session].append(offset)
+        offset += len(raw)
+        tail = (tail + raw)[-64:]
+    return {**lidx, "size": offset, "tail": _digest(tail), "count": count, "sessions": sessions}
+
+
+def _sidecar_covers(path: Path, sidecar: dict) -> bool:
+    """Whether an offset index still covers a prefix of the file (appends since are fine)."""
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return sidecar["size"] == 0
+    if size < sidecar["size"]:
+        return False
+    with open(path, "rb") as f:
+        return _digest(_tail_bytes(f, sidecar["size"])) == sidecar["tail"]
+
+
+def _catch_up_lessons_index(lessons_path: Path, lidx: dict) -> dict:
+    """Index lines appended since ``lidx`` was written; rebuild if the prefix changed."""
+    if not lessons_path.exists():
+        return _empty_lessons_index()
+    if not _sidecar_covers(lessons_path, lidx):
+        lidx = _empty_lessons_index()
+    if lessons_path.stat().st_size == lidx["size"]:
+        return lidx
+    with open(lessons_path, "rb") as f:
+        tail = _tail_bytes(f, lidx["size"])
+        f.seek(lidx["size"])
+        return _with_lesson_lines(lidx, lidx["size"], f, tail)
+
+
+def _stored_sidecar(project_dir: str, name: str) -> dict | None:
+    """An offset index (lessons-index.json, decisions-index.json) as written, or None if missing or unreadable."""
+    index_path = _memory_dir(project_dir) / name
+    if index_path.exists():
+        try:
+            data = _read_json(index_path)
+            if data.get("version") == 1:
+                return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return None
+
+
+def _caught_up_sidecar(project_dir: str, name: str, path: Path, empty, catch_up) -> dict:
+    """The stored offset index ``name`` over ``path``, caught up with appends since it was written.
+
+    The caught-up index is kept with the sidecar's cached parse for as long as
+    ``path`` is unchanged, so the lag is read once, not on every load.
+    """
+    stored = _stored_sidecar(project_dir, name)
+    if stored is None:
+        return catch_up(path, empty())
+    derived = _cached_derived(_memory_dir(project_dir) / name, stored)
+    try:
+        key = _stat_key(path)
+    except OSError:
+        key = None
+    hit = derived.get("caught_up") if derived is not None else None
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    current = catch_up(path, stored)
+    if derived is not None:
+        derived["caught_up"] = (key, current)
+    return current
+
+
+def _sidecar_due(project_dir: str, name: str, path: Path, size: int) -> bool:
+    """Whether a record should rewrite offset index ``name``: it is missing, no longer
+    covers ``path``, or at least SIDECAR_LAG bytes behind ``size``."""
+    stored = _stored_sidecar(project_dir, name)
+    return stored is None or size - stored["size"] >= SIDECAR_LAG or not _sidecar_covers(path, stored)
+
+
+def load_lessons_index(project_dir: str) -> dict:
+    """Session -> byte offsets for lessons.jsonl, current with the file on disk.
+
+    Read-only: lines appended behind the sidecar's back (by hand, or by records
+    since it was last written) are indexed in memory; ``refresh_lessons_index``
+    persists them.
+    """
+    lessons_path = _memory_dir(project_dir) / "lessons.jsonl"
+    return _caught_up_sidecar(
+        project_dir, "lessons-index.json", lessons_path, _empty_lessons_index, _catch_up_lessons_index
+    )
+
+
+def refresh_lessons_index(project_dir: str) -> dict:
+    """Bring lessons-index.json up to date with lessons.jsonl and write it."""
+    lidx = load_lessons_index(project_dir)
+    index_path = _memory_dir(project_dir) / "lessons-index.json"
+    _write_json(index_path, lidx)
+    return lidx
+
+
+def _reverse_lines(f, block: int = TAIL_BLOCK):
+    """The complete lines of binary file ``f``, last to first, read in ``block``-byte chunks from the end.
+
+    A trailing line without its newline (an append in progress) is skipped.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    carry = b""
+    partial = True  # carry still holds the bytes after the last newline
+    while pos > 0:
+        step = min(block, pos)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + carry).split(b"\n")
+        carry = lines.pop(0)
+        if partial and lines:
+            lines.pop()
+            partial = False
+        yield from reversed(lines)
+    if carry and not partial:
+        yield carry
+
+
+def _tail_session_lessons(lessons_path: Path, sessions: set[str], limit: int) -> list[dict]:
+    """The newest ``limit`` lessons of ``sessions``, found by reading lessons.jsonl backwards.
+
+    Used when no sidecar covers the file: reading stops at the ``limit``-th
+    match, so the cost follows recent history rather than the archive's size.
+    """
+    lessons: list[dict] = []
+    if limit <= 0 or not sessions or not lessons_path.exists():
+        return lessons
+    with open(lessons_path, "rb") as f:
+        for raw in _reverse_lines(f):
+            # Only lines whose session field names a wanted session are parsed.
+            match = _SESSION_FIELD.search(raw)
+            try:
+                if match is None or json.loads(match.group(1)) not in sessions:
+                    continue
+                lesson = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(lesson, dict) and lesson.get("session") in sessions:
+                lessons.append(lesson)
+                if len(lessons) == limit:
+                    break
+    lessons.reverse()
+    return lessons
+
+
+def read_session_lessons(
+    project_dir: str, sessions: set[str], lidx: dict | None = None, limit: int = ARCHIVE_LESSON_CAP
+) -> list[dict]:
+    """The most recent ``limit`` lessons of the given sessions, oldest first.
+
+    Seeks straight to the indexed offsets of the open lessons.jsonl, so only the
+    returned lines are parsed; without a sidecar that covers the file it is read
+    backwards until ``limit`` matches. Closed segments are opened newest first,
+    and only while the limit is not reached and their session range overlaps
+    ``sessions``; there too only the indexed lines are read.
+    """
+    lessons_path = _memory_dir(project_dir) / "lessons.jsonl"
+    if lidx is None:
+        stored = _stored_sidecar(project_dir, "lessons-index.json")
+        if stored is not None and _sidecar_covers(lessons_path, stored):
+            lidx = load_lessons_index(project_dir)
+    if lidx is None:
+        lessons = _tail_session_lessons(lessons_path, sessions, limit)
+    else:
+        offsets: list[int] = []
+        for session in sessions:
+            offsets.extend(lidx["sessions"].get(session, ()))
+        offsets.sort()
+        lessons = []
+        if offsets:
+            with open(lessons_path, "rb") as f:
+                for offset in offsets[-limit:]:
+                    f.seek(offset)
+                    lessons.append(json.loads(f.readline()))
+    for segment in reversed(load_segment_manifest(project_dir)["segments"]):
+        if len(lessons) >= limit:
+            break
+        if _segment_may_hold(segment, sessions):
+            lessons[:0] = _closed_session_lessons(project_dir, segment, sessions, limit - len(lessons))
+    return lessons
+
+
+# ---------------------------------------------------------------------------
+# Original prompt storage (for feature-tracking in build pipeline)
+# ---------------------------------------------------------------------------
+@_locked(exclusive=True)
+def store_original_prompt(project_dir: str, prompt: str) -> None:
+    """Store the original user prompt for feature-tracking throughout the pipeline."""
+    backend = get_backend(project_dir)
+    index = dict(backend.load_index())
+    index["original_prompt"] = prompt
+    backend.save_index(index)
+
+
+@_locked(exclusive=False)
+def get_original_prompt(project_dir: str) -> str:
+    """Retrieve the stored original user prompt."""
+    return get_backend(project_dir).load_index().get("original_prompt", "")
+
+
+# ---------------------------------------------------------------------------
+# Archive counters (kept in index.json, validated by file size)
+# ---------------------------------------------------------------------------
+ARCHIVE_FILES = ("decisions.md", "lessons.jsonl", "strategist-log.md", "critic-log.md")
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _count_archive_chunk(name: str, text: str) -> int:
+    """What one archive file contributes to its counter.
+
+    decisions.md counts "## " decision headers, lessons.jsonl non-blank lines
+    and role logs newline-terminated lines. Counts are additive over appends.
+    """
+    if name == "decisions.md":
+        return text.count("\n## ")
+    if name == "lessons.jsonl":
+        return sum(1 for line in text.split("\n") if line.strip())
+    return text.count("\n")
+
+
+def _recount_archive_file(path: Path) -> int:
+    """Stream a whole archive file through _count_archive_chunk."""
+    if not path.exists():
+        return 0
+    if path.name == "lessons.jsonl":
+        with open(path, "rb") as f:
+            return sum(1 for line in f if line.strip())
+    needle = b"\n## " if path.name == "decisions.md" else b"\n"
+    total = 0
+    carry = b""
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            data = carry + block
+            total += data.count(needle)
+            # Keep a tail short enough to never re-count a whole needle
+            carry = data[-(len(needle) - 1):] if len(needle) > 1 else b""
+    return total
+
+
+def _empty_archive_stats() -> dict:
+    return {"counts": {name: 0 for name in ARCHIVE_FILES}, "bytes": {name: 0 for name in ARCHIVE_FILES}}
+
+
+def current_archive_stats(project_dir: str, index: dict | None = None) -> dict:
+    """Archive counters valid for the files on disk.
+
+    Stored counters are trusted while the file size matches the size recorded
+    with them (one stat per file); a file changed behind the engine's back is
+    recounted. Nothing is written here.
+    """
+    if index is None:
+        index = load_index(project_dir)
+    stored = index.get("archive_stats") or {}
+    stats = _empty_archive_stats()
+    memory = _memory_dir(project_dir)
+    for name in ARCHIVE_FILES:
+        size = _file_size(memory / name)
+        if stored.get("bytes", {}).get(name) == size and name in stored.get("counts", {}):
+            stats["counts"][name] = stored["counts"][name]
+        else:
+            stats["counts"][name] = _recount_archive_file(memory / name)
+        stats["bytes"][name] = size
+    return stats
+
+
+def _stage_archive_append(txn: "_MemoryTransaction", name: str, chunk: str, stats: dict) -> int:
+    """Stage an archive append and advance its counter and expected size.
+
+    Returns the byte offset at which the chunk will land.
+    """
+    offset = stats["bytes"][name]
+    if chunk:
+        txn.append(name, chunk)
+        stats["counts"][name] += _count_archive_chunk(name, chunk)
+        stats["bytes"][name] = offset + len(chunk.encode("utf-8"))
+    return offset
+
+
+def rebuild_archive_stats(project_dir: str) -> dict:
+    """Recount every archive file from disk and store the counters in index.json.
+
+    Returns {"before": stored counters, "after": recomputed counters}.
+    """
+    index = load_index(project_dir)
+    before = index.get("archive_stats") or _empty_archive_stats()
+    memory = _memory_dir(project_dir)
+    after = _empty_archive_stats()
+    for name in ARCHIVE_FILES:
+        after["counts"][name] = _recount_archive_file(memory / name)
+        after["bytes"][name] = _file_size(memory / name)
+    index["archive_stats"] = after
+    save_index(project_dir, index)
+    return {"before": before, "after": after}
+
+
+@_locked(exclusive=True)
+def verify_memory(project_dir: str) -> dict:
+    """Recompute all derived state from the stored memory and report drift.
+
+    For the file layout this rebuilds the archive counters, the lessons and
+    decisions offset indexes and the retrieval index. Returns {"archive": {name: (stored, actual)}
+    for drifted counters, "counts": archive counts}.
+    """
+    return get_backend(project_dir).verify()
+
+
+# ---------------------------------------------------------------------------
+# Archive segments (closed months gzipped under archive/, listed in manifest.json)
+# ---------------------------------------------------------------------------
+# The archive files in .council/memory/ are the open segment. On the first
+# record of a new month they are compressed into archive/<stem>-<YYYY-MM>.<ext>.gz
+# and emptied; the manifest keeps each segment's time range, session range,
+# per-file counts and sizes, so readers open a closed segment only when it can
+# hold what they are looking for.
+SEGMENT_DIR = "archive"
+SEGMENT_MEMBER = 64 * 1024  # uncompressed bytes per gzip member of a closed lessons segment
+
+
+def _empty_segment_manifest() -> dict:
+    return {"version": 1, "open_since": None, "segments": []}
+
+
+def load_segment_manifest(project_dir: str) -> dict:
+    """The project's closed archive segments, oldest first. Empty if none were closed."""
+    manifest_path = _memory_dir(project_dir) / SEGMENT_DIR / "manifest.json"
+    if manifest_path.exists():
+        try:
+            data = _read_json(manifest_path)
+            if data.get("version") == 1:
+                return data
+        except (json.JSONDecodeError, OSError):
+            pass
+    return _empty_segment_manifest()
+
+
+def _segment_path(name: str, label: str) -> str:
+    stem, ext = name.split(".", 1)
+    return f"{SEGMENT_DIR}/{stem}-{label}.{ext}.gz"
+
+
+def _session_order(session: str) -> tuple[int, str]:
+    """Sort key for session ids ("S-999" before "S-1000")."""
+    return len(session), session
+
+
+def _segment_may_hold(segment: dict, sessions: set[str]) -> bool:
+    """Whether any of ``sessions`` falls inside the segment's session range."""
+    bounds = segment.get("sessions")
+    if not bounds:
+        return False
+    low, high = map(_session_order, bounds)
+    return any(low <= _session_order(s) <= high for s in sessions)
+
+
+def _in_sessions(session: str, bounds: tuple[str, str]) -> bool:
+    """Whether ``session`` lies within inclusive (first, last) bounds, either end "" for open."""
+    order = _session_order(session)
+    return (not bounds[0] or order >= _session_order(bounds[0])) and (
+        not bounds[1] or order <= _session_order(bounds[1])
+    )
+
+
+def _segment_overlaps(segment: dict, bounds: tuple[str, str]) -> bool:
+    """Whether the segment's session range meets the (first, last) bounds; a segment without one may."""
+    span = segment.get("sessions")
+    if not span:
+        return True
+    return (not bounds[1] or _session_order(span[0]) <= _session_order(bounds[1])) and (
+        not bounds[0] or _session_order(span[1]) >= _session_order(bounds[0])
+    )
+
+
+def _gzip_members(raw: bytes, size: int) -> tuple[bytes, list[list[int]]]:
+    """``raw`` gzipped as consecutive members of about ``size`` bytes, cut at line ends.
+
+    The result is still one valid gzip file. Also returns [raw offset, stored
+    offset] of each member, so a reader can inflate only the member holding a line.
+    """
+    packed = []
+    members = []
+    start = stored = 0
+    while start < len(raw):
+        end = raw.find(b"\n", start + size - 1) + 1 or len(raw)
+        member = gzip.compress(raw[start:end], mtime=0)
+        members.append([start, stored])
+        packed.append(member)
+        start = end
+        stored += len(member)
+    return b"".join(packed), members
+
+
+def _read_segment(project_dir: str, path: str) -> bytes:
+    """The decompressed content of one closed segment file."""
+    with gzip.open(_memory_dir(project_dir) / path, "rb") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=16)
+def _segment_lessons(path: Path, key: tuple[int, int, int]) -> tuple[dict, ...]:
+    """Every lesson of a closed lessons segment, parsed once per file version (``key``)."""
+    with gzip.open(path, "rb") as f:
+        return tuple(json.loads(line) for line in f if line.strip())
+
+
+@lru_cache(maxsize=64)
+def _segment_member(path: Path, key: tuple[int, int, int], start: int, end: int) -> bytes:
+    """One inflated gzip member (stored bytes [start, end)) of a closed segment file."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return gzip.decompress(f.read(end - start))
+
+
+def _segment_lessons_index(project_dir: str, info: dict) -> dict | None:
+    """The session index of a closed lessons segment, or None if it was closed without one."""
+    try:
+        sidecar = _read_json(_memory_dir(project_dir) / info["index"])
+    except (KeyError, json.JSONDecodeError, OSError):
+        return None
+    return sidecar if sidecar.get("version") == 1 else None
+
+
+def _segment_lines(project_dir: str, info: dict, sidecar: dict, offsets: list[int]) -> list[bytes]:
+    """The lines of a closed lessons segment at the raw ``offsets``, inflating only their members."""
+    members = sidecar["members"]
+    starts = [raw_start for raw_start, _ in members]
+    path = _memory_dir(project_dir) / info["path"]
+    key = _stat_key(path)
+    lines = []
+    for offset in offsets:
+        m = bisect.bisect_right(starts, offset) - 1
+        raw_start, start = members[m]
+        end = members[m + 1][1] if m + 1 < len(members) else info["stored"]
+        data = _segment_member(path, key, start, end)
+        line_start = offset - raw_start
+        lines.append(data[line_start:data.index(b"\n", line_start) + 1])
+    return lines
+
+
+def _closed_session_lessons(project_dir: str, segment: dict, sessions: set[str], limit: int) -> list[dict]:
+    """The newest ``limit`` lessons of ``sessions`` in a closed segment, oldest first.
+
+    Reads the segment's index and inflates only the members holding those
+    lines; a segment closed without an index is parsed whole.
+    """
+    info = segment["files"].get("lessons.jsonl")
+    if info is None or limit <= 0:
+        return []
+    sidecar = _segment_lessons_index(project_dir, info)
+    if sidecar is None:
+        older = [l for l in _closed_lessons(project_dir, segment) if l.get("session") in sessions]
+        return older[-limit:]
+    offsets = sorted(offset for session in sessions for offset in sidecar["sessions"].get(session, ()))
+    return [json.loads(line) for line in _segment_lines(project_dir, info, sidecar, offsets[-limit:])]
+
+
+def _closed_lessons(project_dir: str, segment: dict) -> tuple[dict, ...]:
+    info = segment["files"].get("lessons.jsonl")
+    if info is None:
+        return ()
+    path = _memory_dir(project_dir) / info["path"]
+    return _segment_lessons(path, _stat_key(path))
+
+
+def _closed_counts(manifest: dict) -> dict[str, int]:
+    """Archive counts held by the closed segments, per ARCHIVE_FILES name."""
+    counts = {name: 0 for name in ARCHIVE_FILES}
+    for segment in manifest["segments"]:
+        for name, info in segment["files"].items():
+            counts[name] += info["count"]
+    return counts
+
+
+def _open_since(project_dir: str, manifest: dict) -> str | None:
+    """When the open segment started: recorded in the manifest, else its first lesson's time."""
+    if manifest.get("open_since"):
+        return manifest["open_since"]
+    try:
+        with open(_memory_dir(project_dir) / "lessons.jsonl", "rb") as f:
+            for line in f:
+                if line.strip():
+                    return json.loads(line).get("ts") or None
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def _stage_segment_close(
+    txn: "_MemoryTransaction",
+    project_dir: str,
+    index: dict,
+    manifest: dict,
+    stats: dict,
+    lidx: dict,
+    didx: dict,
+) -> dict:
+    """Stage compressing the open archive files into a new closed segment and emptying them.
+
+    ``stats`` (the open files' counters) is reset in place; the lessons and
+    decisions indexes and the manifest are staged. Returns the new manifest.
+    """
+    memory = _memory_dir(project_dir)
+    since = _open_since(project_dir, manifest) or index.get("last_updated", "")
+    label = base = since[:7] or "undated"
+    taken = {segment["label"] for segment in manifest["segments"]}
+    suffix = 1
+    while label in taken:
+        suffix += 1
+        label = f"{base}-{suffix}"
+
+    files = {}
+    for name in ARCHIVE_FILES:
+        raw = (memory / name).read_bytes() if (memory / name).exists() else b""
+        if not raw:
+            continue
+        path = _segment_path(name, label)
+        if name == "lessons.jsonl":
+            # Lessons keep their session offsets, so loads inflate only the members holding them.
+            packed, members = _gzip_members(raw, SEGMENT_MEMBER)
+            if lidx["size"] != len(raw):
+                lidx = _with_lesson_lines(_empty_lessons_index(), 0, raw.splitlines(keepends=True), b"")
+            index_path = f"{SEGMENT_DIR}/lessons-{label}.index.json"
+            txn.write_json(index_path, {"version": 1, "members": members, "sessions": lidx["sessions"]})
+        else:
+            packed = gzip.compress(raw, mtime=0)
+        txn.write_bytes(path, packed)
+        txn.write_bytes(name, b"")
+        files[name] = {"path": path, "count": stats["counts"][name], "bytes": len(raw), "stored": len(packed)}
+        if name == "lessons.jsonl":
+            files[name]["index"] = index_path
+        stats["counts"][name] = 0
+        stats["bytes"][name] = 0
+
+    sessions = sorted({*lidx["sessions"], *didx["sessions"]}, key=_session_order)
+    segment = {
+        "label": label,
+        "from": since,
+        "to": index.get("last_updated", ""),
+        "sessions": [sessions[0], sessions[-1]] if sessions else None,
+        "files": files,
+    }
+    manifest = {**manifest, "open_since": None, "segments": [*manifest["segments"], segment]}
+    txn.write_json(f"{SEGMENT_DIR}/manifest.json", manifest)
+    txn.write_json("lessons-index.json", _empty_lessons_index())
+    txn.write_json("decisions-index.json", _empty_decisions_index())
+    return manifest
+
+
+@_locked(exclusive=True)
+def close_archive_segment(project_dir: str) -> dict | None:
+    """Close the open archive segment now, whatever the month. Returns the new segment.
+
+    Recording does this by itself on the first consultation of a new month.
+    None when there is nothing to close, or the project is stored in SQLite.
+    """
+    backend = get_backend(project_dir)
+    if not isinstance(backend, FileBackend):
+        return None
+    index = dict(backend.load_index())
+    stats = current_archive_stats(project_dir, index)
+    if not any(stats["bytes"].values()):
+        return None
+    txn = _MemoryTransaction(project_dir)
+    manifest = _stage_segment_close(
+        txn,
+        project_dir,
+        index,
+        load_segment_manifest(project_dir),
+        stats,
+        load_lessons_index(project_dir),
+        load_decisions_index(project_dir),
+    )
+    index["archive_stats"] = stats
+    txn.write_json("index.json", index, indent=2)
+    txn.commit()
+    return manifest["segments"][-1]
+
+
+# ---------------------------------------------------------------------------
+# Archive records (the Tier 2 files split into searchable sections)
+# ---------------------------------------------------------------------------
+ARCHIVE_KINDS = ("lesson", "decision", "log")
+_DECISION_HEAD = re.compile(r"^## (\S+) — .*\(session ([^()]*)\)[ \t]*$", re.M)
+_LOG_HEAD = re.compile(r"^### Session (\S+) \((\S+)\)[ \t]*$", re.M)
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveRecord:
+    """One lesson, decision section or role log section, tokenized for search."""
+
+    kind: str  # one of ARCHIVE_KINDS
+    session: str
+    date: str  # YYYY-MM-DD
+    source: str  # the role (decisions: "hub")
+    text: str
+    tf: dict = field(repr=False, compare=False)  # term -> count, tokenized as compute_relevance does
+    length: int = field(repr=False, compare=False)
+
+    @classmethod
+    def of(cls, kind: str, session: str, date: str, source: str, text: str) -> "ArchiveRecord":
+        tokens = re.findall(r"[a-z0-9-]+", text.lower())
+        return cls(kind, session, date[:10], source, text, dict(Counter(tokens)), len(tokens))
+
+
+def _archive_kind(name: str) -> str:
+    return {"lessons.jsonl": "lesson", "decisions.md": "decision"}.get(name, "log")
+
+
+def _parse_archive(name: str, text: str) -> list[ArchiveRecord]:
+    """The records of one archive file (or appended chunk) named ``name``, in file order."""
+    if name == "lessons.jsonl":
+        records = []
+        for line in text.splitlines():
+            if line.strip():
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a truncated or corrupt line, skipped as the lesson loaders do
+                records.append(ArchiveRecord.of(
+                    "lesson", data.get("session") or "", data.get("ts") or "", data.get("source") or "",
+                    data.get("lesson") or "",
+                ))
+        return records
+    decisions = name == "decisions.md"
+    heads = list((_DECISION_HEAD if decisions else _LOG_HEAD).finditer(text))
+    records = []
+    for head, following in zip(heads, [*heads[1:], None]):
+        body = text[head.end():following.start() if following else len(text)].strip()
+        if decisions:
+            date, session = head.groups()
+            records.append(ArchiveRecord.of("decision", session, date, "hub", body))
+        else:
+            session, date = head.groups()
+            records.append(ArchiveRecord.of("log", session, date, name.split("-")[0], body))
+    return records
+
+
+def _append_position(table: dict[str, list[int]], key: str, n: int, fresh: set[str]) -> None:
+    """Append ``n`` to table[key], copying a list this pass did not create before it grows."""
+    if key in fresh:
+        table[key].append(n)
+    else:
+        table[key] = [*table.get(key, ()), n]
+        fresh.add(key)
+
+
+@dataclass(slots=True)
+class ArchiveFile:
+    """The records of one archive file or closed segment, indexed for search.
+
+    ``postings`` maps each term, and ``sessions`` each session, to positions in
+    ``records``; ``length`` is their total token count and ``dates`` the
+    (earliest, latest) record date. Cached instances are shared between
+    searches: ``extended`` returns a grown copy, and ``tagged`` only replaces
+    ``tags`` (matcher key, records tagged, topic -> positions) with a new tuple.
+    """
+
+    records: list[ArchiveRecord] = field(default_factory=list)
+    postings: dict[str, list[int]] = field(default_factory=dict)
+    sessions: dict[str, list[int]] = field(default_factory=dict)
+    length: int = 0
+    dates: tuple[str, str] = ("9", "")
+    tags: tuple[tuple, int, dict[str, list[int]]] = ((), 0, {})
+
+    @classmethod
+    def of(cls, records: list[ArchiveRecord]) -> "ArchiveFile":
+        return cls().extended(records)
+
+    def extended(self, records: list[ArchiveRecord]) -> "ArchiveFile":
+        """A copy with ``records`` appended; lists shared with this instance are copied before they grow."""
+        grown = ArchiveFile(
+            list(self.records), dict(self.postings), dict(self.sessions), self.length, self.dates, self.tags
+        )
+        terms: set[str] = set()
+        sessions: set[str] = set()
+        low, high = self.dates
+        for n, record in enumerate(records, len(self.records)):
+            grown.records.append(record)
+            for term in record.tf:
+                _append_position(grown.postings, term, n, terms)
+            _append_position(grown.sessions, record.session, n, sessions)
+            grown.length += record.length
+            low, high = min(low, record.date), max(high, record.date)
+        grown.dates = (low, high)
+        return grown
+
+    def tagged(self, topic: str, topic_index: dict | None) -> list[int]:
+        """Positions of the records the topic matcher tags with ``topic``.
+
+        Each record is run through extract_topics once per matcher version;
+        records appended since the last call are tagged on the next one.
+        """
+        key = _topic_matcher_key(topic_index)
+        tag_key, count, tags = self.tags
+        if tag_key != key:
+            count, tags = 0, {}
+        if count < len(self.records):
+            tags, fresh = dict(tags), set()
+            for n in range(count, len(self.records)):
+                for found in extract_topics(self.records[n].text, topic_index):
+                    _append_position(tags, found, n, fresh)
+            self.tags = (key, len(self.records), tags)
+        return tags.get(topic, [])
+
+
+# memory dir -> {path relative to it: (stat key, ArchiveFile, bytes parsed, digest of the bytes before that)}
+_ARCHIVE_CACHE: dict[Path, dict[str, tuple[tuple[int, int, int], ArchiveFile, int, str]]] = {}
+
+
+def _starts_a_section(name: str, text: str) -> bool:
+    head = (_DECISION_HEAD if name == "decisions.md" else _LOG_HEAD).search(text)
+    return head is not None and not text[:head.start()].strip()
+
+
+def _archive_file(memory: Path, path: str, name: str) -> ArchiveFile:
+    """The ArchiveFile of the archive file ``name`` or its closed segment at ``memory / path``.
+
+    Parsed once per file version. An open file that only grew since is
+    extended with the appended records instead, unless a hand edit ran the
+    last section on into them.
+    """
+    full = memory / path
+    key = _stat_key(full)
+    slots = _ARCHIVE_CACHE.setdefault(memory, {})
+    hit = slots.get(path)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    archive = None
+    if full.suffix == ".gz":
+        with gzip.open(full, "rb") as f:
+            raw = f.read()
+        archive, size, tail = ArchiveFile.of(_parse_archive(name, raw.decode("utf-8"))), 0, ""
+    else:
+        with open(full, "rb") as f:
+            if hit is not None and hit[2] < key[1] and _digest(_tail_bytes(f, hit[2])) == hit[3]:
+                raw = f.read()
+                appended = raw.decode("utf-8")
+                if name == "lessons.jsonl" or _starts_a_section(name, appended):
+                    archive, size = hit[1].extended(_parse_archive(name, appended)), hit[2] + len(raw)
+            if archive is None:
+                f.seek(0)
+                raw = f.read()
+                archive, size = ArchiveFile.of(_parse_archive(name, raw.decode("utf-8"))), len(raw)
+            tail = _digest(_tail_bytes(f, size))
+    slots[path] = (key, archive, size, tail)
+    return archive
+
+
+def _session_range_file(
+    project_dir: str, name: str, segment: dict | None, bounds: tuple[str, str]
+) -> ArchiveFile | None:
+    """An uncached ArchiveFile of only the records of sessions within ``bounds``.
+
+    Reads them at the offsets of the lessons and decisions indexes (a closed
+    lessons segment's own index included); None where no index covers the file.
+    """
+    memory = _memory_dir(project_dir)
+    if name == "lessons.jsonl" and segment is not None:
+        info = segment["files"][name]
+        sidecar = _segment_lessons_index(project_dir, info)
+        if sidecar is None:
+            return None
+        offsets = sorted(o for s, found in sidecar["sessions"].items() if _in_sessions(s, bounds) for o in found)
+        raw = b"".join(_segment_lines(project_dir, info, sidecar, offsets))
+    elif segment is None and name in ("lessons.jsonl", "decisions.md"):
+        sidecar_name = "lessons-index.json" if name == "lessons.jsonl" else "decisions-index.json"
+        stored = _stored_sidecar(project_dir, sidecar_name)
+        if stored is None or not _sidecar_covers(memory / name, stored):
+            return None
+        if name == "lessons.jsonl":
+            index = load_lessons_index(project_dir)["sessions"]
+            spans = [(o, None) for s, found in index.items() if _in_sessions(s, bounds) for o in found]
+        else:
+            index = load_decisions_index(project_dir)["sessions"]
+            spans = [(span[0], span[1]) for s, found in index.items() if _in_sessions(s, bounds) for span in found]
+        chunks = []
+        with open(memory / name, "rb") as f:
+            for offset, length in sorted(spans):
+                f.seek(offset)
+                chunks.append(f.readline() if length is None else f.read(length))
+        raw = b"".join(chunks)
+    else:
+        return None
+    return ArchiveFile.of(_parse_archive(name, raw.decode("utf-8")))
+
+
+# ---------------------------------------------------------------------------
+# Session-offset index over decisions.md (sidecar: decisions-index.json)
+# ---------------------------------------------------------------------------
+DECISION_FETCH_CAP = 20
+_DECISION_GOAL = re.compile(r"^- \*\*Goal:\*\* (.*)$", re.M)
+
+
+def _empty_decisions_index() -> dict:
+    return {"version": 1, "size": 0, "tail": _digest(b""), "sessions": {}}
+
+
+def _decision_spans(text: str) -> tuple[str, list[tuple[str, str, list[str], str]]]:
+    """Split decisions.md text into (prefix, [(session, date, topics, section), ...]).
+
+    A section runs from the newline before its "## " header to the next one, so
+    the prefix (the file header) and the sections concatenate back to ``text``.
+    Topics are the goal's seed topics, the ones record_consultation tags it with.
+    """
+    starts = []
+    for head in _DECISION_HEAD.finditer(text):
+        start = head.start()
+        starts.append((start - 1 if start and text[start - 1] == "\n" else start, head))
+    spans = []
+    for (start, head), end in zip(starts, [*(s for s, _ in starts[1:]), len(text)]):
+        section = text[start:end]
+        date, session = head.groups()
+        goal = _DECISION_GOAL.search(section)
+        spans.append((session, date, sorted(extract_topics(goal.group(1) if goal else head.group(0))), section))
+    return text[:starts[0][0]] if starts else text, spans
+
+
+def _with_decision_sections(didx: dict, offset: int, chunk: bytes, tail: bytes) -> dict:
+    """A new decisions index extended with the sections of ``chunk``, the bytes at ``offset``.
+
+    Each session maps to one [offset, length, date, topics] per decision.
+    ``tail`` holds the bytes just before ``offset``; ``didx`` is left untouched.
+    """
+    prefix, spans = _decision_spans(chunk.decode("utf-8"))
+    sessions = dict(didx["sessions"])
+    at = offset + len(prefix.encode("utf-8"))
+    for session, date, topics, section in spans:
+        length = len(section.encode("utf-8"))
+        sessions[session] = [*sessions.get(session, ()), [at, length, date, topics]]
+        at += length
+    return {**didx, "size": offset + len(chunk), "tail": _digest((tail + chunk)[-64:]), "sessions": sessions}
+
+
+def _catch_up_decisions_index(decisions_path: Path, didx: dict) -> dict:
+    """Index sections appended since ``didx`` was written; rebuild if the prefix changed."""
+    if not decisions_path.exists():
+        return _empty_decisions_index()
+    if not _sidecar_covers(decisions_path, didx):
+        didx = _empty_decisions_index()
+    if decisions_path.stat().st_size == didx["size"]:
+        return didx
+    with open(decisions_path, "rb") as f:
+        tail = _tail_bytes(f, didx["size"])
+        f.seek(didx["size"])
+        return _with_decision_sections(didx, didx["size"], f.read(), tail)
+
+
+def load_decisions_index(project_dir: str) -> dict:
+    """Session -> [offset, length, date, topics] per decision in decisions.md, current with the file.
+
+    Read-only, like load_lessons_index; ``refresh_decisions_index`` persists.
+    """
+    decisions_path = _memory_dir(project_dir) / "decisions.md"
+    return _caught_up_sidecar(
+        project_dir, "decisions-index.json", decisions_path, _empty_decisions_index, _catch_up_decisions_index
+    )
+
+
+def refresh_decisions_index(project_dir: str) -> dict:
+    """Bring decisions-index.json up to date with decisions.md and write it."""
+    didx = load_decisions_index(project_dir)
+    _write_json(_memory_dir(project_dir) / "decisions-index.json", didx)
+    return didx
+
+
+def _fetched_decision(session: str, date: str, topics: list[str], section: str) -> dict:
+    head = _DECISION_HEAD.search(section)
+    return {"session": session, "date": date, "topics": topics, "text": section[head.end():].strip()}
+
+
+@lru_cache(maxsize=16)
+def _segment_decisions(path: Path, key: tuple[int, int, int]) -> tuple[dict, ...]:
+    """Every decision of a closed decisions segment, split once per file version (``key``)."""
+    with gzip.open(path, "rb") as f:
+        _, spans = _decision_spans(f.read().decode("utf-8"))
+    return tuple(_fetched_decision(*span) for span in spans)
+
+
+def read_session_decisions(project_dir: str, sessions: set[str], didx: dict | None = None) -> list[dict]:
+    """The decisions of the given sessions as {"session", "date", "topics", "text"}, oldest first.
+
+    The open decisions.md is read only at the indexed sections; closed segments
+    are opened only when their session range overlaps ``sessions``.
+    """
+    memory = _memory_dir(project_dir)
+    decisions = []
+    for segment in load_segment_manifest(project_dir)["segments"]:
+        info = segment["files"].get("decisions.md")
+        if info is not None and _segment_may_hold(segment, sessions):
+            path = memory / info["path"]
+            decisions.extend(d for d in _segment_decisions(path, _stat_key(path)) if d["session"] in sessions)
+    if didx is None:
+        didx = load_decisions_index(project_dir)
+    spans = sorted((span, session) for session in sessions for span in didx["sessions"].get(session, ()))
+    if spans:
+        with open(memory / "decisions.md", "rb") as f:
+            for (offset, length, date, topics), session in spans:
+                f.seek(offset)
+                decisions.append(_fetched_decision(session, date, topics, f.read(length).decode("utf-8")))
+    return decisions
+
+
+# ---------------------------------------------------------------------------
+# Transactional writes (manifest: commit.json)
+# ---------------------------------------------------------------------------
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_durable(path: Path, raw: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class _MemoryTransaction:
+    """Every file change of one memory write, staged in memory and committed together.
+
+    Each file is written at most once. Commit protocol (manifest: commit.json):
+
+    1. ``prepare``: the manifest records every archive file's size before the appends.
+    2. Archive chunks are appended (one write per file) and JSON files are written
+       to ``*.pending`` next to their targets.
+    3. ``commit``: the manifest lists the pending -> final renames. This is the
+       commit point.
+    4. The renames are applied and the manifest is removed.
+
+    recover_memory() rolls a ``prepare`` manifest back (truncating the appends
+    and dropping pending files) and a ``commit`` manifest forward.
+    """
+
+    def __init__(self, project_dir: str):
+        self.memory = _memory_dir(project_dir)
+        self._appends: dict[str, str] = {}
+        self._files: dict[str, tuple[object, bytes]] = {}  # name -> (parsed JSON or None, bytes)
+        self.bytes_written: dict[str, int] = {}
+
+    def append(self, name: str, chunk: str) -> None:
+        """Stage an append to an archive file (coalesced per file)."""
+        self._appends[name] = self._appends.get(name, "") + chunk
+
+    def write_json(self, name: str, data, indent: int | None = None) -> bytes:
+        """Stage a full JSON file replacement; returns the serialized bytes."""
+        raw = _serialize_json(data, indent)
+        self._files[name] = (data, raw)
+        return raw
+
+    def write_bytes(self, name: str, raw: bytes) -> None:
+        """Stage a full replacement of a non-JSON file (``name`` may be under a subdirectory)."""
+        self._files[name] = (None, raw)
+
+    def _manifest(self, payload: dict) -> None:
+        raw = _serialize_json(payload)
+        tmp = self.memory / "commit.json.tmp"
+        _write_durable(tmp, raw)
+        os.replace(tmp, self.memory / "commit.json")
+        _fsync_dir(self.memory)
+        self.bytes_written["commit.json"] = self.bytes_written.get("commit.json", 0) + len(raw)
+
+    def commit(self) -> int:
+        """Apply every staged change atomically. Returns the total bytes written."""
+        memory = self.memory
+        memory.mkdir(parents=True, exist_ok=True)
+        self._manifest({"phase": "prepare", "sizes": {n: _file_size(memory / n) for n in self._appends}})
+
+        for name, chunk in self._appends.items():
+            raw = chunk.encode("utf-8")
+            with open(memory / name, "ab") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            self.bytes_written[name] = len(raw)
+
+        renames = []
+        for name, (_, raw) in self._files.items():
+            (memory / name).parent.mkdir(exist_ok=True)
+            _write_durable(memory / f"{name}.pending", raw)
+            renames.append([f"{name}.pending", name])
+            self.bytes_written[name] = len(raw)
+
+        self._manifest({"phase": "commit", "renames": renames})
+        for pending, name in renames:
+            os.replace(memory / pending, memory / name)
+            data, raw = self._files[name]
+            if data is not None:
+                _prime_cache(memory / name, data, raw)
+        for directory in {memory, *((memory / name).parent for _, name in renames)}:
+            _fsync_dir(directory)
+        (memory / "commit.json").unlink()
+        return sum(self.bytes_written.values())
+
+
+def recover_memory(project_dir: str) -> str:
+    """Finish or undo a transaction interrupted by a crash. Returns what was done."""
+    memory = _memory_dir(project_dir)
+    manifest_path = memory / "commit.json"
+    if not manifest_path.exists():
+        for orphan in [*memory.glob("*.pending"), *memory.glob(f"{SEGMENT_DIR}/*.pending")]:
+            orphan.unlink()
+        return ""
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        manifest = {"phase": "prepare", "sizes": {}}
+
+    if manifest.get("phase") == "commit":
+        for pending, name in manifest.get("renames", []):
+            if (memory / pending).exists():
+                os.replace(memory / pending, memory / name)
+        action = "rolled forward"
+    else:
+        for name, size in manifest.get("sizes", {}).items():
+            path = memory / name
+            if _file_size(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        for orphan in [*memory.glob("*.pending"), *memory.glob(f"{SEGMENT_DIR}/*.pending")]:
+            orphan.unlink()
+        action = "rolled back"
+    _fsync_dir(memory)
+    manifest_path.unlink()
+    invalidate_memory_cache(project_dir)
+    return f"Interrupted write {action}."
+
+
+# ---------------------------------------------------------------------------
+# Storage backends (flat files by default, SQLite once migrated)
+# ---------------------------------------------------------------------------
+ROLES = ("strategist", "critic", "hub")
+
+
+@dataclass(slots=True)
+class ConsultationChanges:
+    """Everything one recorded consultation adds, independent of storage layout."""
+
+    session_id: str
+    index: dict  # the updated Tier 0 index (owned by the backend from here on)
+    added: dict[str, list[dict]]  # role -> new Tier 1 entries
+    decision: str  # decisions.md section
+    lessons: list[dict]  # lessons.jsonl records
+    logs: dict[str, str]  # role -> role log section
+    merged: dict[str, list[dict]] = field(default_factory=dict)  # role -> existing entries updated (by id)
+
+
+class MemoryBackend:
+    """Storage interface for the three memory tiers.
+
+    build_memory_response, record_consultation and the maintenance helpers only
+    talk to a backend; get_backend() picks the one a project uses.
+    """
+
+    name = ""
+
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+
+    # --- Tier 0 ---
+    def load_index(self) -> dict:
+        raise NotImplementedError
+
+    def save_index(self, index: dict) -> None:
+        raise NotImplementedError
+
+    # --- Tier 1 ---
+    def load_entries(self, role: str) -> list[dict]:
+        raise NotImplementedError
+
+    def load_records(self, role: str) -> list[MemoryEntry]:
+        """load_entries as MemoryEntry records (what retrieval scores and packs)."""
+        return [MemoryEntry.from_dict(e) for e in self.load_entries(role)]
+
+    def top_entries(self, role: str, limit: int) -> list[MemoryEntry]:
+        """The ``limit`` most important entries, ties in stored order."""
+        entries = self.load_records(role)
+        return sorted(entries, key=lambda e: e.importance or 0, reverse=True)[:limit]
+
+    def entry_order(self, role: str) -> dict:
+        """_entry_order of the role's load_records."""
+        return _entry_order(self.load_records(role))
+
+    def candidate_keys(self, role: str, query: GoalQuery) -> set[str]:
+        """Keys (see _entry_keys) of the entries sharing a word or topic with the goal."""
+        raise NotImplementedError
+
+    def bm25_corpus(self, roles: list[str], terms) -> tuple[int, float, dict[str, int]]:
+        """(document count, average length, document frequency per term) over ``roles``."""
+        raise NotImplementedError
+
+    def doc_terms(self, role: str, key: str, entry: MemoryEntry) -> tuple[dict[str, int], int]:
+        """(term frequencies, length) of one entry, tokenized as compute_relevance does."""
+        tokens = entry.tokens()
+        return Counter(tokens), len(tokens)
+
+    def replace_active(self, active: dict[str, list[dict]], index: dict | None = None) -> None:
+        """Replace the entries of each given role (and optionally the index) atomically."""
+        raise NotImplementedError
+
+    # --- Tier 2 ---
+    def archive_counts(self, index: dict) -> dict[str, int]:
+        """Decision, lesson and log-line counts keyed by ARCHIVE_FILES name."""
+        raise NotImplementedError
+
+    def session_lessons(self, sessions: set[str], limit: int = ARCHIVE_LESSON_CAP) -> list[Lesson]:
+        raise NotImplementedError
+
+    def session_decisions(self, sessions: set[str]) -> list[dict]:
+        """The decisions of ``sessions`` (see read_session_decisions), oldest first."""
+        raise NotImplementedError
+
+    def archive_files(
+        self, kinds: set[str], dates: tuple[str, str] | None = None, sessions: tuple[str, str] | None = None
+    ) -> list[ArchiveFile]:
+        """The archive records of ``kinds`` as ArchiveFiles, each oldest first, in archive order.
+
+        ``dates`` (inclusive YYYY-MM-DD bounds) and ``sessions`` (inclusive
+        session bounds, either end "") let a backend skip storage it knows
+        holds nothing in range; callers still filter the records.
+        """
+        raise NotImplementedError
+
+    # --- Writes and maintenance ---
+    def recover(self) -> None:
+        """Finish or undo a write interrupted by a crash."""
+
+    def commit_consultations(self, batch: list[ConsultationChanges]) -> None:
+        """Commit one or more consultations (in order) as a single transaction."""
+        raise NotImplementedError
+
+    def verify(self) -> dict:
+        """Recompute derived state. Returns {"archive": drift, "counts": archive counts}."""
+        raise NotImplementedError
+
+
+class FileBackend(MemoryBackend):
+    """The .council/memory/ file layout: JSON tiers, append-only archives, sidecar indexes."""
+
+    name = "file"
+
+    def __init__(self, project_dir: str):
+        super().__init__(project_dir)
+        self._ridx: dict | None = None
+        self._postings: dict[str, dict] = {}
+
+    def load_index(self) -> dict:
+        return load_index(self.project_dir)
+
+    def save_index(self, index: dict) -> None:
+        save_index(self.project_dir, index)
+
+    def load_entries(self, role: str) -> list[dict]:
+        return load_active(self.project_dir, role).get("entries", [])
+
+    def load_records(self, role: str) -> list[MemoryEntry]:
+        # Built once per version of the active file, alongside its cached parse.
+        active = load_active(self.project_dir, role)
+        derived = _cached_derived(_memory_dir(self.project_dir) / f"{role}-active.json", active)
+        if derived is not None and "records" in derived:
+            return derived["records"]
+        records = [MemoryEntry.from_dict(e) for e in active.get("entries", [])]
+        if derived is not None:
+            derived["records"] = records
+        return records
+
+    def entry_order(self, role: str) -> dict:
+        active = load_active(self.project_dir, role)
+        derived = _cached_derived(_memory_dir(self.project_dir) / f"{role}-active.json", active)
+        if derived is not None and "order" in derived:
+            return derived["order"]
+        order = _entry_order(self.load_records(role))
+        if derived is not None:
+            derived["order"] = order
+        return order
+
+    def _role_postings(self, role: str) -> dict:
+        if role not in self._postings:
+            if self._ridx is None:
+                self._ridx = load_retrieval_index(self.project_dir)
+            self._postings[role] = _role_postings(self.project_dir, role, self.load_entries(role), self._ridx)
+        return self._postings[role]
+
+    def candidate_keys(self, role: str, query: GoalQuery) -> set[str]:
+        return _candidate_keys(self._role_postings(role), query)
+
+    def bm25_corpus(self, roles: list[str], terms) -> tuple[int, float, dict[str, int]]:
+        postings = [self._role_postings(role) for role in roles]
+        n_docs = sum(len(p["docs"]) for p in postings)
+        avg_len = sum(p["total_len"] for p in postings) / max(n_docs, 1)
+        return n_docs, avg_len, {t: sum(p["df"].get(t, 0) for p in postings) for t in terms}
+
+    def doc_terms(self, role: str, key: str, entry: MemoryEntry) -> tuple[dict[str, int], int]:
+        doc = self._role_postings(role)["docs"][key]
+        return doc["tf"], doc["len"]
+
+    def replace_active(self, active: dict[str, list[dict]], index: dict | None = None) -> None:
+        ridx = load_retrieval_index(self.project_dir)
+        txn = _MemoryTransaction(self.project_dir)
+        for role, entries in active.items():
+            raw = txn.write_json(f"{role}-active.json", {"version": 2, "role": role, "entries": entries}, indent=2)
+            ridx = _with_role_indexed(ridx, role, entries, _digest(raw))
+        txn.write_json("retrieval-index.json", ridx)
+        if index is not None:
+            txn.write_json("index.json", index, indent=2)
+        txn.commit()
+
+    def archive_counts(self, index: dict) -> dict[str, int]:
+        counts = _closed_counts(load_segment_manifest(self.project_dir))
+        for name, count in current_archive_stats(self.project_dir, index)["counts"].items():
+            counts[name] += count
+        return counts
+
+    def session_lessons(self, sessions: set[str], limit: int = ARCHIVE_LESSON_CAP) -> list[Lesson]:
+        return [Lesson.from_dict(l) for l in read_session_lessons(self.project_dir, sessions, limit=limit)]
+
+    def session_decisions(self, sessions: set[str]) -> list[dict]:
+        return read_session_decisions(self.project_dir, sessions)
+
+    def archive_files(
+        self, kinds: set[str], dates: tuple[str, str] | None = None, sessions: tuple[str, str] | None = None
+    ) -> list[ArchiveFile]:
+        memory = _memory_dir(self.project_dir)
+        names = [name for name in ARCHIVE_FILES if _archive_kind(name) in kinds]
+        sources: list[tuple[str, str, dict | None]] = []
+        for segment in load_segment_manifest(self.project_dir)["segments"]:
+            # Closed segments span [from, to] and a session range; ones outside the filters are never opened.
+            if dates and (segment.get("to", "")[:10] < dates[0] or segment.get("from", "")[:10] > dates[1]):
+                continue
+            if sessions and not _segment_overlaps(segment, sessions):
+                continue
+            sources.extend(
+                (segment["files"][name]["path"], name, segment) for name in names if name in segment["files"]
+            )
+        sources.extend((name, name, None) for name in names)
+        cached = _ARCHIVE_CACHE.get(memory, {})
+        files = []
+        for path, name, segment in sources:
+            if not (memory / path).exists():
+                continue
+            archive = None
+            if sessions and path not in cached:
+                # Until a file is parsed whole, a session range is read at the offset indexes.
+                archive = _session_range_file(self.project_dir, name, segment, sessions)
+            files.append(archive if archive is not None else _archive_file(memory, path, name))
+        return files
+
+    def recover(self) -> None:
+        recover_memory(self.project_dir)
+
+    def commit_consultations(self, batch: list[ConsultationChanges]) -> None:
+        project_dir = self.project_dir
+        memory = _memory_dir(project_dir)
+        index = batch[-1].index
+        manifest = load_segment_manifest(project_dir)
+        since = _open_since(project_dir, manifest)
+        if since and since[:7] < index["last_updated"][:7]:
+            # First record of a new month: close the open segment in a transaction of
+            # its own, since the one below appends to the files it empties.
+            previous = dict(self.load_index())
+            stats = current_archive_stats(project_dir, previous)
+            if any(stats["bytes"].values()):
+                txn = _MemoryTransaction(project_dir)
+                lidx = load_lessons_index(project_dir)
+                didx = load_decisions_index(project_dir)
+                manifest = _stage_segment_close(txn, project_dir, previous, manifest, stats, lidx, didx)
+                previous["archive_stats"] = stats
+                txn.write_json("index.json", previous, indent=2)
+                txn.commit()
+            since = None
+        stats = current_archive_stats(project_dir, index)
+        lidx = load_lessons_index(project_dir)
+        didx = load_decisions_index(project_dir)
+        txn = _MemoryTransaction(project_dir)
+        if not manifest.get("open_since"):
+            txn.write_json(f"{SEGMENT_DIR}/manifest.json", {**manifest, "open_since": since or index["last_updated"]})
+
+        # decisions.md (+ its offset index, when the indexed prefix is the whole file). The
+        # offset indexes are rewritten only every SIDECAR_LAG bytes; readers index the lag.
+        chunk = "# Hub Decision Record\n" if stats["bytes"]["decisions.md"] == 0 else ""
+        chunk += "".join(changes.decision for changes in batch)
+        offset = _stage_archive_append(txn, "decisions.md", chunk, stats)
+        path = memory / "decisions.md"
+        due = _sidecar_due(project_dir, "decisions-index.json", path, stats["bytes"]["decisions.md"])
+        if chunk and didx["size"] == offset and due:
+            tail = _file_tail(path, offset)
+            txn.write_json("decisions-index.json", _with_decision_sections(didx, offset, chunk.encode("utf-8"), tail))
+
+        # lessons.jsonl (+ its offset index)
+        chunk = "".join(json.dumps(lesson) + "\n" for changes in batch for lesson in changes.lessons)
+        offset = _stage_archive_append(txn, "lessons.jsonl", chunk, stats)
+        path = memory / "lessons.jsonl"
+        due = _sidecar_due(project_dir, "lessons-index.json", path, stats["bytes"]["lessons.jsonl"])
+        if chunk and lidx["size"] == offset and due:
+            tail = _file_tail(path, offset)
+            lines = chunk.encode("utf-8").splitlines(keepends=True)
+            txn.write_json("lessons-index.json", _with_lesson_lines(lidx, offset, lines, tail))
+
+        # Role logs
+        for role in ("strategist", "critic"):
+            sections = "".join(changes.logs.get(role, "") for changes in batch)
+            if sections:
+                name = f"{role}-log.md"
+                chunk = f"# {role.title()} Memory Log\n" if stats["bytes"][name] == 0 else ""
+                _stage_archive_append(txn, name, chunk + sections, stats)
+
+        # Active files of the roles that changed (+ the retrieval index, every
+        # RETRIEVAL_INDEX_EVERY records or when it lacks a role; loads catch it up)
+        ridx = load_retrieval_index(project_dir)
+        reindex = index["consultation_count"] - ridx.get("count", 0) >= RETRIEVAL_INDEX_EVERY
+        indexed = None
+        for role in ROLES:
+            new_entries = [entry for changes in batch for entry in changes.added.get(role, ())]
+            replaced = {entry["id"]: entry for changes in batch for entry in changes.merged.get(role, ())}
+            if not new_entries and not replaced:
+                continue
+            active = dict(load_active(project_dir, role))
+            # The file is rewritten anyway: give older entries their features block too.
+            active["entries"] = [
+                _with_features(replaced.get(entry.get("id"), entry))
+                for entry in [*active.get("entries", []), *new_entries]
+            ]
+            raw = txn.write_json(f"{role}-active.json", active, indent=2)
+            if reindex or role not in ridx["roles"]:
+                indexed = _with_role_indexed(indexed or ridx, role, active["entries"], _digest(raw))
+        if indexed is not None:
+            count = index["consultation_count"] if reindex else ridx.get("count", 0)
+            txn.write_json("retrieval-index.json", {**indexed, "count": count})
+
+        index["archive_stats"] = stats
+        txn.write_json("index.json", index, indent=2)
+        txn.commit()
+
+    def verify(self) -> dict:
+        project_dir = self.project_dir
+        recover_memory(project_dir)
+        stats = rebuild_archive_stats(project_dir)
+        manifest = load_segment_manifest(project_dir)
+        stored_closed = _closed_counts(manifest)
+        if manifest["segments"]:
+            segments = []
+            for segment in manifest["segments"]:
+                files = {}
+                for name, info in segment["files"].items():
+                    text = _read_segment(project_dir, info["path"]).decode("utf-8")
+                    files[name] = {**info, "count": _count_archive_chunk(name, text)}
+                segments.append({**segment, "files": files})
+            manifest = {**manifest, "segments": segments}
+            _write_json(_memory_dir(project_dir) / SEGMENT_DIR / "manifest.json", manifest)
+        closed = _closed_counts(manifest)
+        drift = {
+            name: (stats["before"]["counts"].get(name, 0) + stored_closed[name], count + closed[name])
+            for name, count in stats["after"]["counts"].items()
+            if stats["before"]["counts"].get(name) != count or stored_closed[name] != closed[name]
+        }
+        (_memory_dir(project_dir) / "lessons-index.json").unlink(missing_ok=True)
+        refresh_lessons_index(project_dir)
+        (_memory_dir(project_dir) / "decisions-index.json").unlink(missing_ok=True)
+        refresh_decisions_index(project_dir)
+        (_memory_dir(project_dir) / "retrieval-index.json").unlink(missing_ok=True)
+        for role in ROLES:
+            update_retrieval_index(project_dir, role, load_active(project_dir, role))
+        return {"archive": drift, "counts": {name: count + closed[name] for name, count in stats["after"]["counts"].items()}}
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    rowid INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    importance REAL,
+    created TEXT,
+    doc_len INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (role, key)
+);
+CREATE INDEX IF NOT EXISTS entries_role_pos ON entries (role, pos);
+CREATE INDEX IF NOT EXISTS entries_role_importance ON entries (role, importance);
+CREATE INDEX IF NOT EXISTS entries_role_created ON entries (role, created);
+CREATE TABLE IF NOT EXISTS entry_topics (
+    entry INTEGER NOT NULL REFERENCES entries (rowid) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    topic TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entry_topics_role_topic ON entry_topics (role, topic);
+CREATE INDEX IF NOT EXISTS entry_topics_entry ON entry_topics (entry);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (tokens, tokenize = "unicode61 tokenchars '-'");
+CREATE TABLE IF NOT EXISTS archive (
+    rowid INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    session TEXT,
+    body TEXT NOT NULL,
+    units INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archive_name ON archive (name);
+CREATE TABLE IF NOT EXISTS lessons (rowid INTEGER PRIMARY KEY, session TEXT, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS lessons_session ON lessons (session);
+"""
+
+_SQLITE_LOCAL = threading.local()
+
+
+def _sqlite_connect(path: Path) -> sqlite3.Connection:
+    """A per-thread connection to ``path``, reopened if the file was replaced."""
+    connections = getattr(_SQLITE_LOCAL, "connections", None)
+    if connections is None:
+        connections = _SQLITE_LOCAL.connections = {}
+    key = (str(path), path.stat().st_ino)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        connections[key] = conn
+    return conn
+
+
+def _fts_phrases(words) -> str:
+    """An FTS5 query matching any of ``words`` (tokens are [a-z0-9-], safe to quote)."""
+    return " OR ".join(f'"{w}"' for w in sorted(words))
+
+
+class SqliteBackend(MemoryBackend):
+    """All three tiers in .council/memory/council.db (WAL mode).
+
+    Entry text is stored pre-tokenized in an FTS5 table, so candidate selection
+    sees exactly the words compute_relevance does. Importance, created time and
+    topics are indexed columns; archives are rows instead of appended files.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, project_dir: str, path: Path | None = None):
+        super().__init__(project_dir)
+        self.path = path or _memory_dir(project_dir) / "council.db"
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = _sqlite_connect(self.path)
+        return self._conn
+
+    def load_index(self) -> dict:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'index'").fetchone()
+        return json.loads(row[0]) if row else _empty_index()
+
+    def _put_index(self, index: dict) -> None:
+        index = {k: v for k, v in index.items() if k != "archive_stats"}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('index', ?)", (json.dumps(index),)
+        )
+
+    def save_index(self, index: dict) -> None:
+        with self.conn:
+            self._put_index(index)
+
+    def load_entries(self, role: str) -> list[dict]:
+        rows = self.conn.execute("SELECT data FROM entries WHERE role = ? ORDER BY pos", (role,))
+        return [json.loads(data) for (data,) in rows]
+
+    def load_records(self, role: str) -> list[MemoryEntry]:
+        rows = self.conn.execute("SELECT data FROM entries WHERE role = ? ORDER BY pos", (role,))
+        return [MemoryEntry.from_json(data) for (data,) in rows]
+
+    def top_entries(self, role: str, limit: int) -> list[MemoryEntry]:
+        rows = self.conn.execute(
+            "SELECT data FROM entries WHERE role = ? ORDER BY COALESCE(importance, 0) DESC, pos LIMIT ?",
+            (role, limit),
+        )
+        return [MemoryEntry.from_json(data) for (data,) in rows]
+
+    def candidate_keys(self, role: str, query: GoalQuery) -> set[str]:
+        candidates: set[str] = set()
+        words = query.raw_words | query.synonym_words
+        if words:
+            rows = self.conn.execute(
+                "SELECT e.key FROM entries_fts JOIN entries e ON e.rowid = entries_fts.rowid "
+                "WHERE entries_fts MATCH ? AND e.role = ?",
+                (_fts_phrases(words), role),
+            )
+            candidates.update(key for (key,) in rows)
+        if query.topics:
+            topics = sorted(query.topics)
+            rows = self.conn.execute(
+                "SELECT e.key FROM entry_topics t JOIN entries e ON e.rowid = t.entry "
+                f"WHERE t.role = ? AND t.topic IN ({', '.join('?' * len(topics))})",
+                (role, *topics),
+            )
+            candidates.update(key for (key,) in rows)
+        return candidates
+
+    def bm25_corpus(self, roles: list[str], terms) -> tuple[int, float, dict[str, int]]:
+        marks = ", ".join("?" * len(roles))
+        n_docs, total_len = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(doc_len), 0) FROM entries WHERE role IN ({marks})", roles
+        ).fetchone()
+        df = {}
+        for term in terms:
+            (df[term],) = self.conn.execute(
+                "SELECT COUNT(*) FROM entries_fts JOIN entries e ON e.rowid = entries_fts.rowid "
+                f"WHERE entries_fts MATCH ? AND e.role IN ({marks})",
+                (_fts_phrases([term]), *roles),
+            ).fetchone()
+        return n_docs, total_len / max(n_docs, 1), df
+
+    def _insert_entry(self, role: str, pos: int, key: str, entry: dict) -> None:
+        tokens = _entry_tokens(entry)
+        cursor = self.conn.execute(
+            "INSERT INTO entries (role, pos, key, importance, created, doc_len, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (role, pos, key, entry.get("importance"), entry.get("created"), len(tokens), json.dumps(entry)),
+        )
+        rowid = cursor.lastrowid
+        self.conn.execute("INSERT INTO entries_fts (rowid, tokens) VALUES (?, ?)", (rowid, " ".join(tokens)))
+        self.conn.executemany(
+            "INSERT INTO entry_topics (entry, role, topic) VALUES (?, ?, ?)",
+            [(rowid, role, topic) for topic in sorted(set(entry.get("topics", [])))],
+        )
+
+    def _replace_entry(self, role: str, entry: dict) -> None:
+        """Swap in a new version of the entry keyed by ``entry["id"]``, keeping its position."""
+        row = self.conn.execute(
+            "SELECT rowid, pos, key FROM entries WHERE role = ? AND key = ?", (role, entry["id"])
+        ).fetchone()
+        if row is None:
+            return
+        rowid, pos, key = row
+        self.conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (rowid,))
+        self.conn.execute("DELETE FROM entries WHERE rowid = ?", (rowid,))
+        self._insert_entry(role, pos, key, entry)
+
+    def _delete_role(self, role: str) -> None:
+        self.conn.execute(
+            "DELETE FROM entries_fts WHERE rowid IN (SELECT rowid FROM entries WHERE role = ?)", (role,)
+        )
+        self.conn.execute("DELETE FROM entries WHERE role = ?", (role,))
+
+    def replace_active(self, active: dict[str, list[dict]], index: dict | None = None) -> None:
+        with self.conn:
+            for role, entries in active.items():
+                self._delete_role(role)
+                for pos, (key, entry) in enumerate(zip(_entry_keys([e.get("id") for e in entries]), entries)):
+                    self._insert_entry(role, pos, key, entry)
+            if index is not None:
+                self._put_index(index)
+
+    def archive_counts(self, index: dict) -> dict[str, int]:
+        counts = {name: 0 for name in ARCHIVE_FILES}
+        for name, units in self.conn.execute("SELECT name, SUM(units) FROM archive GROUP BY name"):
+            counts[name] = units
+        (counts["lessons.jsonl"],) = self.conn.execute("SELECT COUNT(*) FROM lessons").fetchone()
+        return counts
+
+    def session_lessons(self, sessions: set[str], limit: int = ARCHIVE_LESSON_CAP) -> list[Lesson]:
+        if not sessions:
+            return []
+        ordered = sorted(sessions)
+        rows = self.conn.execute(
+            f"SELECT data FROM lessons WHERE session IN ({', '.join('?' * len(ordered))}) "
+            "ORDER BY rowid DESC LIMIT ?",
+            (*ordered, limit),
+        ).fetchall()
+        return [Lesson.from_json(data) for (data,) in reversed(rows)]
+
+    def session_decisions(self, sessions: set[str]) -> list[dict]:
+        if not sessions:
+            return []
+        ordered = sorted(sessions)
+        # Rows without a session hold a whole decisions.md imported by an older migration.
+        rows = self.conn.execute(
+            "SELECT body FROM archive WHERE name = 'decisions.md' "
+            f"AND (session IN ({', '.join('?' * len(ordered))}) OR session IS NULL) ORDER BY rowid",
+            ordered,
+        )
+        return [
+            _fetched_decision(*span)
+            for (body,) in rows
+            for span in _decision_spans(body)[1]
+            if span[0] in sessions
+        ]
+
+    def archive_files(
+        self, kinds: set[str], dates: tuple[str, str] | None = None, sessions: tuple[str, str] | None = None
+    ) -> list[ArchiveFile]:
+        records: list[ArchiveRecord] = []
+        names = [name for name in ARCHIVE_FILES if name != "lessons.jsonl" and _archive_kind(name) in kinds]
+        if names:
+            rows = self.conn.execute(
+                f"SELECT name, body FROM archive WHERE name IN ({', '.join('?' * len(names))}) ORDER BY rowid",
+                names,
+            )
+            for name, body in rows:
+                records.extend(_parse_archive(name, body))
+        if "lesson" in kinds:
+            rows = self.conn.execute("SELECT data FROM lessons ORDER BY rowid")
+            records.extend(_parse_archive("lessons.jsonl", "\n".join(data for (data,) in rows)))
+        return [ArchiveFile.of(records)]
+
+    def _insert_archive(self, name: str, session: str | None, body: str) -> None:
+        if body:
+            self.conn.execute(
+                "INSERT INTO archive (name, session, body, units) VALUES (?, ?, ?, ?)",
+                (name, session, body, _count_archive_chunk(name, body)),
+            )
+
+    def _insert_decisions(self, text: str) -> None:
+        """A decisions.md file as one row per section, keyed by its session."""
+        prefix, spans = _decision_spans(text)
+        self._insert_archive("decisions.md", None, prefix)
+        for session, _, _, section in spans:
+            self._insert_archive("decisions.md", session, section)
+
+    def _insert_lesson(self, line: str) -> None:
+        try:
+            lesson = json.loads(line)
+        except json.JSONDecodeError:
+            lesson = None
+        session = lesson.get("session") if isinstance(lesson, dict) else None
+        self.conn.execute(
+            "INSERT INTO lessons (session, data) VALUES (?, ?)",
+            (session if isinstance(session, str) else None, line),
+        )
+
+    def commit_consultations(self, batch: list[ConsultationChanges]) -> None:
+        with self.conn:
+            for changes in batch:
+                self._insert_archive("decisions.md", changes.session_id, changes.decision)
+                for lesson in changes.lessons:
+                    self._insert_lesson(json.dumps(lesson))
+                for role, section in changes.logs.items():
+                    self._insert_archive(f"{role}-log.md", changes.session_id, section)
+                for role, new_entries in changes.added.items():
+                    (pos,) = self.conn.execute(
+                        "SELECT COALESCE(MAX(pos), -1) + 1 FROM entries WHERE role = ?", (role,)
+                    ).fetchone()
+                    for entry in new_entries:
+                        # Same key _entry_keys would assign at this position
+                        key = str(entry.get("id") or f"#{pos}")
+                        if self.conn.execute(
+                            "SELECT 1 FROM entries WHERE role = ? AND key = ?", (role, key)
+                        ).fetchone():
+                            key = f"{key}#{pos}"
+                        self._insert_entry(role, pos, key, entry)
+                        pos += 1
+                for role, merged in changes.merged.items():
+                    for entry in merged:
+                        self._replace_entry(role, entry)
+            self._put_index(batch[-1].index)
+
+    def verify(self) -> dict:
+        """Re-derive the FTS rows, topics and lengths from the stored entries."""
+        with self.conn:
+            active = {role: self.load_entries(role) for role in ROLES}
+            for role, entries in active.items():
+                self._delete_role(role)
+                for pos, (key, entry) in enumerate(zip(_entry_keys([e.get("id") for e in entries]), entries)):
+                    self._insert_entry(role, pos, key, entry)
+            self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+        return {"archive": {}, "counts": self.archive_counts({})}
+
+    def close(self) -> None:
+        connections = getattr(_SQLITE_LOCAL, "connections", {})
+        for key, conn in list(connections.items()):
+            if conn is self._conn:
+                del connections[key]
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def get_backend(project_dir: str) -> MemoryBackend:
+    """The backend a project uses: SQLite once council.db exists, flat files otherwise."""
+    if (_memory_dir(project_dir) / "council.db").exists():
+        return SqliteBackend(project_dir)
+    return FileBackend(project_dir)
+
+
+def fts5_available() -> bool:
+    """Whether this Python's sqlite3 was built with FTS5."""
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5 (x)")
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+@_locked(exclusive=True)
+def migrate_to_sqlite(project_dir: str) -> dict:
+    """One-shot migration of .council/memory/ into council.db.
+
+    The flat files are left in place as a backup; once council.db exists every
+    engine call uses it. Returns the migrated counts.
+    """
+    memory = _memory_dir(project_dir)
+    target = memory / "council.db"
+    if target.exists():
+        raise ValueError(f"{target} already exists.")
+    if not fts5_available():
+        raise RuntimeError("This Python's sqlite3 was built without FTS5.")
+    recover_memory(project_dir)
+
+    tmp = memory / "council.db.tmp"
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    conn.executescript(_SQLITE_SCHEMA)
+    conn.close()
+
+    backend = SqliteBackend(project_dir, path=tmp)
+    try:
+        active = {role: [_with_features(e) for e in load_active(project_dir, role).get("entries", [])] for role in ROLES}
+        backend.replace_active(active, dict(load_index(project_dir)))
+        with backend.conn:
+            # Closed segments first, oldest to newest, then the open files.
+            for segment in load_segment_manifest(project_dir)["segments"]:
+                for name, info in segment["files"].items():
+                    text = _read_segment(project_dir, info["path"]).decode("utf-8")
+                    if name == "decisions.md":
+                        backend._insert_decisions(text)
+                        continue
+                    if name != "lessons.jsonl":
+                        backend._insert_archive(name, None, text)
+                        continue
+                    for line in text.splitlines():
+                        if line.strip():
+                            backend._insert_lesson(line)
+            for name in ARCHIVE_FILES:
+                path = memory / name
+                if name == "lessons.jsonl" or not path.exists():
+                    continue
+                if name == "decisions.md":
+                    backend._insert_decisions(path.read_text(encoding="utf-8"))
+                else:
+                    backend._insert_archive(name, None, path.read_text(encoding="utf-8"))
+            if (memory / "lessons.jsonl").exists():
+                with open(memory / "lessons.jsonl", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            backend._insert_lesson(line.rstrip("\n"))
+        counts = backend.archive_counts({})
+    finally:
+        backend.close()
+    os.replace(tmp, target)
+    return {"entries": {role: len(entries) for role, entries in active.items()}, "archive": counts}
+
+
+# ---------------------------------------------------------------------------
+# Memory lenses (per-teammate views from one retrieval)
+# ---------------------------------------------------------------------------
+LENS_PROFILES: dict[str, dict] = {
+    "strategist": {
+        "roles": {"strategist": 1.0, "hub": 0.9, "critic": 0.6},
+        "topics": {"architecture": 0.2, "performance": 0.1, "data": 0.1},
+    },
+    "critic": {
+        "roles": {"critic": 1.0, "hub": 0.9, "strategist": 0.6},
+        "topics": {"security": 0.2, "testing": 0.2, "performance": 0.1},
+    },
+    "architect": {
+        "roles": {"strategist": 1.0, "hub": 1.0, "critic": 0.7},
+        "topics": {"architecture": 0.3, "infrastructure": 0.2, "data": 0.2, "api": 0.1},
+    },
+    "security-auditor": {
+        "roles": {"critic": 1.0, "hub": 0.9, "strategist": 0.5},
+        "topics": {"security": 0.4, "authentication": 0.3, "api": 0.1},
+    },
+    "ux-reviewer": {
+        "roles": {"strategist": 0.9, "critic": 0.9, "hub": 0.9},
+        "topics": {"frontend": 0.4, "api": 0.1},
+    },
+    "planner": {
+        "roles": {"hub": 1.0, "strategist": 0.9, "critic": 0.8},
+        "topics": {"infrastructure": 0.2, "testing": 0.2, "architecture": 0.1},
+    },
+}
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryLens:
+    """One packed view: a name, a token budget and how to weight entries.
+
+    An entry's lens score is its shared score times the weight of the role it
+    was recorded by, boosted by the strongest topic weight it carries. The
+    neutral lens (no weights) leaves scores untouched.
+    """
+
+    name: str
+    budget: int
+    role_weights: dict = field(default_factory=dict)
+    topic_weights: dict = field(default_factory=dict)
+
+    @classmethod
+    def resolve(cls, spec: str, default_budget: int) -> "MemoryLens":
+        """Parse "name" or "name:budget". The profile is the one named, or the
+        longest profile name contained in it (so "strategist-alpha" uses the
+        strategist profile); unknown names get neutral weights."""
+        name, _, budget = spec.strip().partition(":")
+        name = name.strip()
+        if not name:
+            raise ValueError(f"Invalid lens: {spec!r}")
+        try:
+            budget_tokens = int(budget) if budget.strip() else default_budget
+        except ValueError:
+            raise ValueError(f"Invalid lens budget in {spec!r}") from None
+        if budget_tokens <= 0:
+            raise ValueError(f"Invalid lens budget in {spec!r}")
+        profile = LENS_PROFILES.get(name)
+        if profile is None:
+            matches = [p for p in LENS_PROFILES if p in name]
+            profile = LENS_PROFILES[max(matches, key=len)] if matches else {}
+        return cls(name, budget_tokens, profile.get("roles", {}), profile.get("topics", {}))
+
+    def weigh(self, score: float, role: str, entry: MemoryEntry) -> float:
+        if not self.role_weights and not self.topic_weights:
+            return score
+        boost = max((self.topic_weights.get(t, 0.0) for t in entry.topics or ()), default=0.0)
+        return score * self.role_weights.get(role, 1.0) * (1.0 + boost)
+
+    def role_order(self, roles: list[str]) -> list[str]:
+        return sorted(roles, key=lambda r: self.role_weights.get(r, 1.0), reverse=True)
+
+
+# ---------------------------------------------------------------------------
+# Budget-aware memory retrieval
+# ---------------------------------------------------------------------------
+@_locked(exclusive=False)
+def build_memory_response(
+    project_dir: str,
+    goal: str = "",
+    max_tokens: int = 4000,
+    role_filter: str = "",
+    ranking: str = "overlap",
+    packing: str = "greedy",
+) -> str:
+    """Build budget-aware memory response. Never exceeds max_tokens.
+
+    ``ranking`` selects the keyword scorer: "overlap" (word-overlap ratio) or
+    "bm25" (rarity-weighted, using the statistics kept in the retrieval index).
+    ``packing`` selects how Tier 1 fills the budget: "greedy" (score order,
+    detail level by fixed thresholds) or "optimal" (knapsack over headline,
+    summary and full text, time-bounded, falling back to greedy).
+
+    Packing order:
+    1. Always: Tier 0 index (~200-500 tokens)
+    2. Goal-relevant Tier 1 entries, sorted by relevance*0.6 + importance*0.4
+    3. If budget remains: top non-relevant entries by importance alone
+    4. If budget tight (< 1000 after index): index + top 3 as 1-line summaries
+    """
+    lens = MemoryLens("", max_tokens)
+    return _build_views(project_dir, goal, [lens], role_filter, ranking, packing)[lens.name]
+
+
+@_locked(exclusive=False)
+def build_memory_views(
+    project_dir: str,
+    goal: str = "",
+    lenses: list[MemoryLens] = (),
+    role_filter: str = "",
+    ranking: str = "overlap",
+    packing: str = "greedy",
+) -> dict[str, str]:
+    """Packed memory views for several lenses from one retrieval.
+
+    Entries are loaded and scored once, archive lessons read and scored once;
+    each lens then re-weights the shared scores and packs its own budget
+    exactly as build_memory_response does. Returns {lens name: view}.
+    """
+    names = [lens.name for lens in lenses]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate lens names: {', '.join(names)}")
+    return _build_views(project_dir, goal, list(lenses), role_filter, ranking, packing)
+
+
+def _build_views(
+    project_dir: str, goal: str, lenses: list[MemoryLens], role_filter: str, ranking: str, packing: str
+) -> dict[str, str]:
+    _check_ranking(ranking)
+    _check_packing(packing)
+    return _Retrieval(project_dir, role_filter).views(goal, lenses, ranking, packing=packing)
+
+
+class _Retrieval:
+    """The tiers of one project, loaded once and shared by every goal and lens of a call.
+
+    Entry features (word set, topics, recency, staleness) are computed on first
+    use and reused across goals; archive lessons are read once per session set.
+    """
+
+    def __init__(self, project_dir: str, role_filter: str = "", now: datetime | None = None):
+        self.backend = get_backend(project_dir)
+        self.index = self.backend.load_index()
+        self.topic_idx = self.index.get("topic_index", {})
+        self.roles = [role_filter] if role_filter else ["strategist", "critic", "hub"]
+        self.now = now or datetime.now(timezone.utc)
+        self.tier0_parts = self._tier0_parts()
+        self._loaded: list[tuple[str, list[MemoryEntry]]] | None = None
+        self._features: dict[int, tuple] = {}
+        self._lessons: dict[frozenset, list[Lesson]] = {}
+
+    def query(self, goal: str) -> GoalQuery | None:
+        return GoalQuery.from_goal(goal, self.topic_idx, now=self.now) if goal else None
+
+    def _tier0_parts(self) -> list[str]:
+        """Tier 0 lines after the header (the header carries the per-view budget)."""
+        index = self.index
+        topic_idx = self.topic_idx
+        tier0_parts = []
+
+        # Pinned items
+        pinned = index.get("pinned", [])
+        if pinned:
+            tier0_parts.append("### Critical (always remember)")
+            for p in pinned:
+                tier0_parts.append(f"- [pinned] {p.get('text', '')}")
+            tier0_parts.append("")
+
+        # Recent decisions
+        recent = index.get("recent_decisions", [])[-3:]
+        if recent:
+            tier0_parts.append("### Recent decisions")
+            for d in recent:
+                tier0_parts.append(f"- {d.get('session_id', '?')}: {d.get('goal_oneliner', '')} -> {d.get('decision_oneliner', '')}")
+            tier0_parts.append("")
+
+        # Archive signpost (~150-200 tokens, always included)
+        archive_counts = self.backend.archive_counts(index)
+        decision_count = archive_counts["decisions.md"]
+        lesson_count = archive_counts["lessons.jsonl"]
+        if decision_count or lesson_count:
+            tier0_parts.append("### Archive")
+            tier0_parts.append(f"- {decision_count} decisions, {lesson_count} lessons archived")
+            if topic_idx:
+                densities = []
+                for topic, info in sorted(
+                    topic_idx.items(),
+                    key=lambda x: len(x[1].get("decision_ids", [])),
+                    reverse=True,
+                )[:5]:
+                    count = len(info.get("decision_ids", []))
+                    if count > 0:
+                        recent_decisions = info.get("decisions", [])
+                        if recent_decisions:
+                            latest = recent_decisions[-1].get("summary", "")[:60]
+                            densities.append(f"{topic}: {count} (latest: {latest})")
+                        else:
+                            densities.append(f"{topic}: {count}")
+                if densities:
+                    tier0_parts.append(f"- Topics: {', '.join(densities)}")
+            tier0_parts.append("")
+        return tier0_parts
+
+    def loaded(self) -> list[tuple[str, list[MemoryEntry]]]:
+        if self._loaded is None:
+            self._loaded = [(role, self.backend.load_records(role)) for role in self.roles]
+        return self._loaded
+
+    def features(self, entry: MemoryEntry) -> tuple:
+        """(word set, topic set, recency, staleness factor) of an entry, cached."""
+        cached = self._features.get(id(entry))
+        if cached is None:
+            cached = self._features[id(entry)] = _entry_features(entry, self.now)
+        return cached
+
+    def score(
+        self,
+        query: GoalQuery | None,
+        ranking: str,
+        budget: int | None = None,
+        exclude: set[str] | None = None,
+        boosted: set[str] | None = None,
+    ) -> list[tuple[float, str, MemoryEntry]]:
+        """(score, role, entry) for the active entries worth ranking, in stored order.
+
+        Without ``budget`` every entry is scored. With it, entries sharing a word
+        or topic with the goal, pinned entries and entries with a ``boosted``
+        (lens) topic are scored, and of the rest only the best until their
+        headlines alone fill ``budget`` tokens: _pack_entries stops before any
+        entry ranked below those, so its output is unchanged. Entries in
+        ``exclude`` do not count towards the budget.
+        """
+        backend = self.backend
+        scored: list[tuple[float, str, MemoryEntry]] = []
+        loaded = self.loaded()
+
+        if query and ranking == "bm25":
+            # Corpus statistics across the retrieved roles, read only for query terms
+            bm25_terms = _bm25_query_terms(query)
+            n_docs, avg_len, bm25_df = backend.bm25_corpus(self.roles, bm25_terms)
+
+        def entry_score(role: str, key: str, entry: MemoryEntry, matched: bool) -> float:
+            if not query:
+                relevance = 0.0
+            elif not matched:
+                relevance = _unmatched_relevance(entry, self.now)
+            elif ranking == "bm25":
+                tf, doc_len = backend.doc_terms(role, key, entry)
+                keyword_score = _bm25(tf, doc_len, bm25_terms, bm25_df, n_docs, avg_len)
+                relevance = _combine_relevance(entry, query, keyword_score)
+            else:
+                relevance = _feature_relevance(self.features(entry), query)
+            importance = (5 if entry.importance is None else entry.importance) / 10.0
+            return relevance * 0.6 + importance * 0.4
+
+        for role, entries in loaded:
+            # Only entries sharing a word or topic with the goal need full scoring;
+            # the rest are ranked by importance plus their (cheap) recency term.
+            candidates = backend.candidate_keys(role, query) if query else set()
+            if budget is None:
+                for key, entry in zip(_entry_keys([e.id for e in entries]), entries):
+                    scored.append((entry_score(role, key, entry, key in candidates), role, entry))
+                continue
+
+            order = backend.entry_order(role)
+            keys = order["keys"]
+            chosen: dict[int, float] = {}
+            for pos in [order["positions"][key] for key in candidates if key in order["positions"]]:
+                chosen[pos] = entry_score(role, keys[pos], entries[pos], True)
+            for pos in [*order["pinned"], *(p for t in boosted or () for p in order["topics"].get(t, ()))]:
+                if pos not in chosen:
+                    chosen[pos] = entry_score(role, keys[pos], entries[pos], keys[pos] in candidates)
+
+            # An unmatched entry scores importance * 0.4 plus its recency share, which
+            # is zero from RECENCY_DAYS on: within an importance level only the
+            # recent entries need scoring, and whole levels drop out once the
+            # budget is filled by better ones.
+            def headline_tokens(pos: int) -> int:
+                return _tokens_for_words(_entry_line(entries[pos], "headline", self.now)[1])
+
+            def trim() -> float | None:
+                """Cut ``filler`` after the entry whose headline overflows the budget."""
+                filler.sort(key=lambda f: (-f[0], f[1]))
+                used = 0
+                for rank, (score, pos) in enumerate(filler):
+                    used += headline_tokens(pos)
+                    if used > budget:
+                        del filler[rank + 1:]
+                        return score
+                return None
+
+            def skip(pos: int) -> bool:
+                return pos in chosen or (exclude is not None and entries[pos].id in exclude)
+
+            filler: list[tuple[float, int]] = []
+            threshold = None
+            for importance, level, newest_first in order["levels"]:
+                base = importance / 10.0 * 0.4
+                if threshold is not None:
+                    # The newest entry of a level bounds its scores (staleness only lowers them).
+                    ceiling = _recency(entries[newest_first[0]], self.now) * 0.2 * 0.6 if query else 0.0
+                    if base + ceiling < threshold:
+                        continue
+                recent = []
+                for pos in newest_first:
+                    days = _entry_ages(entries[pos], self.now)[0] if query else None
+                    if not query or (days is not None and days >= RECENCY_DAYS):
+                        break
+                    recent.append(pos)
+                filler.extend(
+                    (entry_score(role, keys[pos], entries[pos], False), pos) for pos in recent if not skip(pos)
+                )
+                threshold = trim()
+                if threshold is not None and base < threshold:
+                    continue
+                # The rest of the level all score ``base`` and rank in stored order,
+                # after the filler entries scoring higher.
+                used = sum(headline_tokens(pos) for score, pos in filler if score > base)
+                recent_set = set(recent)
+                for pos in level:
+                    if pos in recent_set or skip(pos):
+                        continue
+                    filler.append((entry_score(role, keys[pos], entries[pos], False), pos))
+                    used += headline_tokens(pos)
+                    if used > budget:
+                        break
+                threshold = trim()
+            chosen.update((pos, score) for score, pos in filler)
+            scored.extend((chosen[pos], role, entries[pos]) for pos in sorted(chosen))
+        return scored
+
+    def archive_lessons(self, query: GoalQuery, ranking: str) -> list[Lesson]:
+        """Archived lessons of the goal's topic sessions, best first."""
+        relevant_sessions = set()
+        for t in query.topics:
+            if t in self.topic_idx:
+                relevant_sessions.update(self.topic_idx[t].get("decision_ids", []))
+        if not relevant_sessions:
+            return []
+
+        # A7: Cap at 200 most recent before scoring (only those lines are read)
+        key = frozenset(relevant_sessions)
+        if key not in self._lessons:
+            self._lessons[key] = self.backend.session_lessons(relevant_sessions)
+        archive_lessons = self._lessons[key]
+        if not archive_lessons:
+            return []
+
+        # A8: Relevance-scored selection (top 12 are taken by the caller)
+        if ranking == "bm25":
+            lesson_scores = _bm25_lesson_scores(archive_lessons, query)
+        else:
+            lesson_scores = [_score_lesson(l, query) for l in archive_lessons]
+        return [l for _, l in sorted(zip(lesson_scores, archive_lessons), key=lambda x: x[0], reverse=True)]
+
+    def views(
+        self,
+        goal: str,
+        lenses: list[MemoryLens],
+        ranking: str,
+        exclude: set[str] | None = None,
+        shown: set[str] | None = None,
+        packing: str = "greedy",
+    ) -> dict[str, str]:
+        """Packed views of one goal. Entry ids and lesson keys in ``exclude`` are
+        skipped; those that end up in a view are added to ``shown``."""
+        query = self.query(goal)
+        now = self.now
+        exclude = exclude or set()
+        scored = None
+        lessons = None
+        views: dict[str, str] = {}
+        for lens in lenses:
+            max_tokens = lens.budget
+            header = f"## Your Memory ({self.index.get('consultation_count', 0)} consultations, budget: {max_tokens} tokens)\n"
+            tier0_text = "\n".join([header, *self.tier0_parts])
+            tier0_tokens = estimate_tokens(tier0_text)
+            remaining = max_tokens - tier0_tokens
 
-    staleness_factor = 0.7 if stale_days > 90 else 1.0
-    return base_score * staleness_factor
+            # --- Budget tight? Minimal response ---
+            if remaining < 1000:
+                summaries = []
+                for role in lens.role_order(self.roles):
+                    top = self.backend.top_entries(role, 3 + len(exclude))
+                    for e in [e for e in top if e.id not in exclude][:3]:
+                        summaries.append(_entry_line(e, "headline", now)[0])
+                        if shown is not None:
+                            shown.add(e.id)
+                if summaries:
+                    views[lens.name] = tier0_text + "### Key memories (budget-limited)\n" + "\n".join(summaries)
+                else:
+                    views[lens.name] = tier0_text.strip()
+                continue
 
+            # --- Tier 1: Active memory entries (scored once, weighted per lens) ---
+            if scored is None:
+                # The optimal packer may take any entry, so it gets them all.
+                budget = max(lens.budget for lens in lenses) if packing != "optimal" else None
+                boosted = {topic for lens in lenses for topic in lens.topic_weights}
+                scored = self.score(query, ranking, budget, exclude, boosted)
+            all_entries = [
+                (lens.weigh(score, role, entry), entry)
+                for score, role, entry in scored
+                if entry.id not in exclude
+            ]
+            all_entries.sort(key=lambda x: x[0], reverse=True)
 
-# ---------------------------------------------------------------------------
-# Stale marker for output formatting
-# ---------------------------------------------------------------------------
-def _stale_marker(entry: dict) -> str:
-    if entry.get("pinned"):
-        return ""
-    last_val = entry.get("last_validated") or entry.get("created", "")
-    try:
-        val_dt = datetime.fromisoformat(last_val)
-        days = (datetime.now(timezone.utc) - val_dt).days
-        return f" [stale: {days}d]" if days > 90 else ""
-    except (ValueError, TypeError):
-        return ""
+            pack = _pack_entries_optimal if packing == "optimal" else _pack_entries
+            sections, used_tokens, packed = pack(tier0_text, all_entries, remaining, goal, now)
+            if shown is not None:
+                shown.update(e.id for e in packed)
 
+            # --- Archive excerpts (from lessons.jsonl, pre-filtered by topic) ---
+            if query and remaining - used_tokens > 200:
+                if lessons is None:
+                    lessons = self.archive_lessons(query, ranking)
+                scored_lessons = [l for l in lessons if _lesson_key(l) not in exclude]
 
-# ---------------------------------------------------------------------------
-# Token estimation (simple word-based heuristic)
-# ---------------------------------------------------------------------------
-def estimate_tokens(text: str) -> int:
-    """Rough token count: ~0.75 words per token for English."""
-    return max(1, int(len(text.split()) * 1.33))
+                if scored_lessons:
+                    # A9: Archive token cap
+                    archive_token_cap = min(int((remaining - used_tokens) * 0.3), 600)
+                    archive_used = 0
 
+                    excerpt_parts = ["### Archived Lessons (from past consultations)"]
+                    for lesson in scored_lessons[:12]:
+                        text = (lesson.lesson or "")[:120]
+                        source = "?" if lesson.source is None else lesson.source
+                        session = "?" if lesson.session is None else lesson.session
+                        entry_line = f"- [{source}/{session}] {text}"
+                        line_tokens = estimate_tokens(entry_line)
+                        if archive_used + line_tokens > archive_token_cap:
+                            break
+                        excerpt_parts.append(entry_line)
+                        archive_used += line_tokens
+                        if shown is not None:
+                            shown.add(_lesson_key(lesson))
 
-# ---------------------------------------------------------------------------
-# Memory file I/O
-# ---------------------------------------------------------------------------
-def _memory_dir(project_dir: str) -> Path:
-    return Path(project_dir) / ".council" / "memory"
+                    used_tokens += archive_used
 
+                    if len(excerpt_parts) > 1:
+                        sections.append("\n".join(excerpt_parts))
+                        sections.append("")
 
-def load_index(project_dir: str) -> dict:
-    """Load Tier 0 index. Returns empty structure if missing."""
-    index_path = _memory_dir(project_dir) / "index.json"
-    if index_path.exists():
-        try:
-            data = json.loads(index_path.read_text(encoding="utf-8"))
-            # Auto-migrate v1 -> v2
-            if data.get("version", 1) < 2:
-                data["version"] = 2
-                index_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-            return data
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {
-        "version": 2,
-        "consultation_count": 0,
-        "last_updated": "",
-        "compaction_watermark": "",
-        "recent_decisions": [],
-        "pinned": [],
-        "topic_index": {},
-        "original_prompt": "",
-    }
+            views[lens.name] = "\n".join(sections).strip()
+        return views
 
 
-def save_index(project_dir: str, index: dict) -> None:
-    """Write Tier 0 index."""
-    index_path = _memory_dir(project_dir) / "index.json"
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    index_path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+def _lesson_key(lesson: Lesson) -> str:
+    return f"lesson:{lesson.session or ''}:{lesson.source or ''}:{lesson.lesson or ''}"
 
 
-def load_active(project_dir: str, role: str) -> dict:
-    """Load Tier 1 active memory for a role."""
-    active_path = _memory_dir(project_dir) / f"{role}-active.json"
-    if active_path.exists():
-        try:
-            data = json.loads(active_path.read_text(encoding="utf-8"))
-            # Auto-migrate v1 -> v2
-            if data.get("version", 1) < 2:
-                data["version"] = 2
-                active_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-            return data
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {"version": 2, "role": role, "entries": []}
+def _entry_features(entry: MemoryEntry, now: datetime) -> tuple:
+    """The goal-independent inputs of compute_relevance for one entry."""
+    topics = set(entry.topics or ()) if entry.stored is None else set(entry.stored["topics"])
+    ages = _entry_ages(entry, now)
+    return entry.words(), topics, _recency(entry, now, ages), _staleness_factor(entry, now, ages)
 
 
-def save_active(project_dir: str, role: str, data: dict) -> None:
-    """Write Tier 1 active memory for a role."""
-    active_path = _memory_dir(project_dir) / f"{role}-active.json"
-    active_path.parent.mkdir(parents=True, exist_ok=True)
-    active_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+def _feature_relevance(features: tuple, query: GoalQuery) -> float:
+    """compute_relevance from precomputed entry features (identical result)."""
+    entry_words, entry_topics, recency, staleness = features
+    direct_overlap = len(query.raw_words & entry_words) / max(len(query.raw_words), 1)
+    synonym_overlap = (
+        len(query.synonym_words & entry_words) / max(len(query.synonym_words), 1)
+        if query.synonym_words else 0.0
+    )
+    keyword_overlap = direct_overlap + synonym_overlap * 0.5
+    if entry_topics:
+        topic_score = len(entry_topics & query.topics) / max(len(entry_topics), 1)
+    else:
+        topic_score = 0.0
+    base_score = topic_score * 0.5 + keyword_overlap * 0.3 + recency * 0.2
+    return base_score * staleness
 
 
-# ---------------------------------------------------------------------------
-# Original prompt storage (for feature-tracking in build pipeline)
-# ---------------------------------------------------------------------------
-def store_original_prompt(project_dir: str, prompt: str) -> None:
-    """Store the original user prompt for feature-tracking throughout the pipeline."""
-    index = load_index(project_dir)
-    index["original_prompt"] = prompt
-    save_index(project_dir, index)
+def _check_ranking(ranking: str) -> None:
+    if ranking not in RANKING_MODES:
+        raise ValueError(f"Unknown ranking: {ranking}. Must be one of {', '.join(RANKING_MODES)}.")
 
 
-def get_original_prompt(project_dir: str) -> str:
-    """Retrieve the stored original user prompt."""
-    index = load_index(project_dir)
-    return index.get("original_prompt", "")
+def _check_packing(packing: str) -> None:
+    if packing not in PACKING_MODES:
+        raise ValueError(f"Unknown packing: {packing}. Must be one of {', '.join(PACKING_MODES)}.")
 
 
-# ---------------------------------------------------------------------------
-# Budget-aware memory retrieval
-# ---------------------------------------------------------------------------
-def build_memory_response(
+@_locked(exclusive=False)
+def build_memory_batch(
     project_dir: str,
-    goal: str = "",
+    goals: list[str],
     max_tokens: int = 4000,
-    role_filter: str = "",
-) -> str:
-    """Build budget-aware memory response. Never exceeds max_tokens.
+    ranking: str = "overlap",
+    dedupe: bool = False,
+    packing: str = "greedy",
+) -> list[str]:
+    """One packed memory block per goal, from a single load of the tiers.
 
-    Packing order:
-    1. Always: Tier 0 index (~200-500 tokens)
-    2. Goal-relevant Tier 1 entries, sorted by relevance*0.6 + importance*0.4
-    3. If budget remains: top non-relevant entries by importance alone
-    4. If budget tight (< 1000 after index): index + top 3 as 1-line summaries
+    Entry features are computed once and shared by every goal. With ``dedupe``,
+    entries and archived lessons already shown for an earlier goal are left out
+    of later blocks (Tier 0 is repeated in each). Without it, each block equals
+    build_memory_response for that goal.
     """
-    index = load_index(project_dir)
-    topic_idx = index.get("topic_index", {})
-
-    # --- Tier 0: Index section (always included) ---
-    tier0_parts = []
-    tier0_parts.append(f"## Your Memory ({index.get('consultation_count', 0)} consultations, budget: {max_tokens} tokens)\n")
-
-    # Pinned items
-    pinned = index.get("pinned", [])
-    if pinned:
-        tier0_parts.append("### Critical (always remember)")
-        for p in pinned:
-            tier0_parts.append(f"- [pinned] {p.get('text', '')}")
-        tier0_parts.append("")
-
-    # Recent decisions
-    recent = index.get("recent_decisions", [])[-3:]
-    if recent:
-        tier0_parts.append("### Recent decisions")
-        for d in recent:
-            tier0_parts.append(f"- {d.get('session_id', '?')}: {d.get('goal_oneliner', '')} -> {d.get('decision_oneliner', '')}")
-        tier0_parts.append("")
-
-    # Archive signpost (~150-200 tokens, always included)
-    memory_path = _memory_dir(project_dir)
-    decisions_path = memory_path / "decisions.md"
-    lessons_path = memory_path / "lessons.jsonl"
-    decision_count = 0
-    lesson_count = 0
-    if decisions_path.exists():
-        decision_count = decisions_path.read_text(encoding="utf-8").count("\n## ")
-    if lessons_path.exists():
-        content = lessons_path.read_text(encoding="utf-8").strip()
-        lesson_count = sum(1 for line in content.split("\n") if line.strip()) if content else 0
-    if decision_count or lesson_count:
-        tier0_parts.append("### Archive")
-        tier0_parts.append(f"- {decision_count} decisions, {lesson_count} lessons archived")
-        if topic_idx:
-            densities = []
-            for topic, info in sorted(
-                topic_idx.items(),
-                key=lambda x: len(x[1].get("decision_ids", [])),
-                reverse=True,
-            )[:5]:
-                count = len(info.get("decision_ids", []))
-                if count > 0:
-                    recent_decisions = info.get("decisions", [])
-                    if recent_decisions:
-                        latest = recent_decisions[-1].get("summary", "")[:60]
-                        densities.append(f"{topic}: {count} (latest: {latest})")
-                    else:
-                        densities.append(f"{topic}: {count}")
-            if densities:
-                tier0_parts.append(f"- Topics: {', '.join(densities)}")
-        tier0_parts.append("")
-
-    tier0_text = "\n".join(tier0_parts)
-    tier0_tokens = estimate_tokens(tier0_text)
-    remaining = max_tokens - tier0_tokens
-
-    # --- Budget tight? Minimal response ---
-    if remaining < 1000:
-        roles = [role_filter] if role_filter else ["strategist", "critic", "hub"]
-        summaries = []
-        for role in roles:
-            active = load_active(project_dir, role)
-            entries = active.get("entries", [])
-            top3 = sorted(entries, key=lambda e: e.get("importance", 0), reverse=True)[:3]
-            for e in top3:
-                summaries.append(f"- {e.get('id', '?')} [imp:{e.get('importance', 0)}]{_stale_marker(e)}: {e.get('headline', e.get('text', '')[:80])}")
-        if summaries:
-            return tier0_text + "### Key memories (budget-limited)\n" + "\n".join(summaries)
-        return tier0_text.strip()
-
-    # --- Tier 1: Active memory entries ---
-    roles = [role_filter] if role_filter else ["strategist", "critic", "hub"]
-    all_entries: list[tuple[float, dict]] = []
+    _check_ranking(ranking)
+    _check_packing(packing)
+    retrieval = _Retrieval(project_dir)
+    lens = MemoryLens("", max_tokens)
+    shown: set[str] = set()
+    blocks = []
+    for goal in goals:
+        exclude = set(shown) if dedupe else None
+        blocks.append(retrieval.views(goal, [lens], ranking, exclude=exclude, shown=shown, packing=packing)[lens.name])
+    return blocks
 
-    for role in roles:
-        active = load_active(project_dir, role)
-        for entry in active.get("entries", []):
-            if goal:
-                relevance = compute_relevance(entry, goal, topic_idx)
-            else:
-                relevance = 0.0
-            importance = entry.get("importance", 5) / 10.0
-            score = relevance * 0.6 + importance * 0.4
-            all_entries.append((score, entry))
 
-    # Sort by combined score descending
-    all_entries.sort(key=lambda x: x[0], reverse=True)
+def _pack_entries(
+    tier0_text: str, all_entries: list[tuple[float, MemoryEntry]], remaining: int, goal: str, now: datetime
+) -> tuple[list[str], int, list[MemoryEntry]]:
+    """Pack scored entries into ``remaining`` tokens.
 
-    # Pack entries within budget — 3-tier strategy
+    Returns (sections, tokens used, entries packed).
+    """
     used_tokens = 0
     relevance_threshold = 0.2
+    packed_entries: list[MemoryEntry] = []
 
     if remaining >= 2500:
         # --- Generous budget: full text when possible ---
         relevant_parts = []
         other_parts = []
         for score, entry in all_entries:
-            if remaining - used_tokens > 2000:
-                text = entry.get("text", "")
-            else:
-                text = entry.get("headline", entry.get("text", "")[:80])
-
-            line = f"- {entry.get('id', '?')} [imp:{entry.get('importance', 0)}]{_stale_marker(entry)}: {text}"
-            line_tokens = estimate_tokens(line)
+            level = "full" if remaining - used_tokens > 2000 else "headline"
+            line, words = _entry_line(entry, level, now)
+            line_tokens = _tokens_for_words(words)
 
             if used_tokens + line_tokens > remaining:
                 break
@@ -373,6 +3568,7 @@ def build_memory_response(
             else:
                 other_parts.append(line)
             used_tokens += line_tokens
+            packed_entries.append(entry)
 
         sections = [tier0_text]
         if relevant_parts:
@@ -387,23 +3583,22 @@ def build_memory_response(
     elif remaining >= 800:
         # --- Normal budget: two-pass (oneliners, then upgrade top entries) ---
         # Pass 1: emit all entries as one-liners, track metadata
-        packed: list[tuple[float, dict, str, int]] = []  # (score, entry, oneliner, oneliner_tokens)
+        packed: list[tuple[float, MemoryEntry, str, int]] = []  # (score, entry, oneliner, oneliner_tokens)
         for score, entry in all_entries:
-            headline = entry.get("headline", entry.get("text", "")[:80])
-            oneliner = f"- {entry.get('id', '?')} [imp:{entry.get('importance', 0)}]{_stale_marker(entry)}: {headline}"
-            oneliner_tokens = estimate_tokens(oneliner)
+            oneliner, words = _entry_line(entry, "headline", now)
+            oneliner_tokens = _tokens_for_words(words)
             if used_tokens + oneliner_tokens > remaining:
                 break
             packed.append((score, entry, oneliner, oneliner_tokens))
+            packed_entries.append(entry)
             used_tokens += oneliner_tokens
 
         # Pass 2: upgrade highest-scored entries to full text if budget allows
         output_lines = [p[2] for p in packed]  # start with all oneliners
         packed_by_score = sorted(enumerate(packed), key=lambda x: x[1][0], reverse=True)
         for idx, (score, entry, oneliner, oneliner_tokens) in packed_by_score:
-            full_text = entry.get("text", "")
-            full_line = f"- {entry.get('id', '?')} [imp:{entry.get('importance', 0)}]{_stale_marker(entry)}: {full_text}"
-            full_tokens = estimate_tokens(full_line)
+            full_line, words = _entry_line(entry, "full", now)
+            full_tokens = _tokens_for_words(words)
             extra_tokens = full_tokens - oneliner_tokens
             if extra_tokens > 0 and used_tokens + extra_tokens <= remaining:
                 output_lines[idx] = full_line
@@ -419,9 +3614,8 @@ def build_memory_response(
         relevant_parts = []
         other_parts = []
         for score, entry in all_entries:
-            text = entry.get("headline", entry.get("text", "")[:80])
-            line = f"- {entry.get('id', '?')} [imp:{entry.get('importance', 0)}]{_stale_marker(entry)}: {text}"
-            line_tokens = estimate_tokens(line)
+            line, words = _entry_line(entry, "headline", now)
+            line_tokens = _tokens_for_words(words)
 
             if used_tokens + line_tokens > remaining:
                 break
@@ -431,6 +3625,7 @@ def build_memory_response(
             else:
                 other_parts.append(line)
             used_tokens += line_tokens
+            packed_entries.append(entry)
 
         sections = [tier0_text]
         if relevant_parts:
@@ -442,68 +3637,215 @@ def build_memory_response(
             sections.extend(other_parts)
             sections.append("")
 
-    # --- Archive excerpts (from lessons.jsonl, pre-filtered by topic) ---
-    def _score_lesson(lesson: dict, goal: str) -> float:
-        """Lightweight relevance score for archive lessons."""
-        lesson_words = set(re.findall(r"[a-z0-9-]+", lesson.get("lesson", "").lower()))
-        goal_words = set(re.findall(r"[a-z0-9-]+", goal.lower())) - _STOPWORDS
-        return len(goal_words & lesson_words) / max(len(goal_words), 1) if goal_words else 0.0
+    return sections, used_tokens, packed_entries
 
-    if goal and remaining - used_tokens > 200:
-        goal_topics_set = extract_topics(goal, topic_idx)
-        relevant_sessions = set()
-        for t in goal_topics_set:
-            if t in topic_idx:
-                relevant_sessions.update(topic_idx[t].get("decision_ids", []))
-
-        if relevant_sessions:
-            archive_lessons = []
-            if lessons_path.exists():
-                for line in lessons_path.read_text(encoding="utf-8").strip().split("\n"):
-                    if not line.strip():
-                        continue
-                    try:
-                        lesson = json.loads(line)
-                        if lesson.get("session") in relevant_sessions:
-                            archive_lessons.append(lesson)
-                    except json.JSONDecodeError:
-                        continue
 
-            # A7: Cap at 200 most recent before scoring
-            archive_lessons = archive_lessons[-200:]
-
-            if archive_lessons:
-                # A8: Relevance-scored selection (top 12)
-                scored_lessons = sorted(archive_lessons, key=lambda l: _score_lesson(l, goal), reverse=True)
-
-                # A9: Archive token cap
-                archive_token_cap = min(int((remaining - used_tokens) * 0.3), 600)
-                archive_used = 0
-
-                excerpt_parts = ["### Archived Lessons (from past consultations)"]
-                for lesson in scored_lessons[:12]:
-                    text = lesson.get("lesson", "")[:120]
-                    source = lesson.get("source", "?")
-                    session = lesson.get("session", "?")
-                    entry_line = f"- [{source}/{session}] {text}"
-                    line_tokens = estimate_tokens(entry_line)
-                    if archive_used + line_tokens > archive_token_cap:
-                        break
-                    excerpt_parts.append(entry_line)
-                    archive_used += line_tokens
+# ---------------------------------------------------------------------------
+# Optimal packing (multiple-choice knapsack over detail levels)
+# ---------------------------------------------------------------------------
+PACKING_MODES = ("greedy", "optimal")
+PACKING_TIME_LIMIT = 0.1  # seconds before the solver gives up and packs greedily
+PACKING_MAX_CELLS = 1024  # capacity resolution of the DP table
+PACKING_CORE = 40  # LP steps on each side of the break point left to the DP
+PACKING_LEVELS = {"headline": 0.5, "summary": 0.75, "full": 1.0}  # share of an entry's value
+
+
+def _entry_choices(entry: MemoryEntry, now: datetime) -> list[tuple[str, int, float]]:
+    """(line, words, level value) for each distinct detail level of an entry, shortest first."""
+    choices: list[tuple[str, int, float]] = []
+    for level in DETAIL_LEVELS:
+        line, words = _entry_line(entry, level, now)
+        value = PACKING_LEVELS[level]
+        # A longer level is only a choice if it actually says more.
+        if choices and words <= choices[-1][1]:
+            line, shorter, level = choices[-1]
+            choices[-1] = (line, shorter, max(level, value))
+            continue
+        choices.append((line, words, value))
+    return choices
+
+
+def _option_hull(options: list[tuple[int, float, str]]) -> list[tuple[int, float, int]]:
+    """(words, value, option index) on the upper convex hull of an entry's levels.
+
+    Levels below the hull are never worth taking in the LP relaxation; the
+    value per extra word falls from each hull step to the next.
+    """
+    hull: list[tuple[int, float, int]] = []
+    for k, (w, v, _) in enumerate(options):
+        if v <= (hull[-1][1] if hull else 0.0):
+            continue
+        while hull:
+            w1, v1, _ = hull[-1]
+            w0, v0, _ = hull[-2] if len(hull) > 1 else (0, 0.0, -1)
+            if (v1 - v0) * (w - w0) > (v - v0) * (w1 - w0):
+                break
+            hull.pop()
+        hull.append((w, v, k))
+    return hull
+
+
+def _pack_entries_optimal(
+    tier0_text: str,
+    all_entries: list[tuple[float, MemoryEntry]],
+    remaining: int,
+    goal: str,
+    now: datetime,
+    time_limit: float | None = None,
+) -> tuple[list[str], int, list[MemoryEntry]]:
+    """Pack entries to maximize captured value within ``remaining`` tokens.
+
+    Each entry is a multiple-choice knapsack item: skip it, or show its
+    headline, summary or full text, worth score x PACKING_LEVELS. Costs are
+    counted in words, which estimate_tokens scales linearly, so the packed
+    output stays within budget however the lines are joined. The LP
+    relaxation settles the clear-cut entries and a DP decides the core near
+    its break point, under a wall-clock bound; past it, packing falls back
+    to _pack_entries.
+    """
+    limit = PACKING_TIME_LIMIT if time_limit is None else time_limit
+    deadline = time.perf_counter() + limit
+    headers = ("### Relevant to this goal", "### Other important context")
+
+    # Word capacity such that tier 0 + headers + packed lines stay under max_tokens.
+    max_tokens = remaining + estimate_tokens(tier0_text)
+    capacity = int(max_tokens / 1.33) - len(tier0_text.split()) - sum(len(h.split()) for h in headers)
 
-                used_tokens += archive_used
+    items = []  # (entry index, [(words, value, line)] shortest first)
+    for i, (score, entry) in enumerate(all_entries):
+        options = [
+            (words, max(score, 0.0) * level, line)
+            for line, words, level in _entry_choices(entry, now)
+            if words <= capacity
+        ]
+        if options:
+            items.append((i, options))
 
-                if len(excerpt_parts) > 1:
-                    sections.append("\n".join(excerpt_parts))
-                    sections.append("")
+    chosen: dict[int, int] = {}  # entry index -> option index
+    if sum(options[-1][0] for _, options in items) <= capacity:
+        # Everything fits at full detail; nothing to trade off.
+        chosen = {i: len(options) - 1 for i, options in items}
+    elif items:
+        # LP relaxation: take hull steps by value per word until the budget breaks.
+        hulls = [_option_hull(options) for _, options in items]
+        steps = sorted(
+            (
+                ((v - v0) / (w - w0), n, t)
+                for n, hull in enumerate(hulls)
+                for t, ((w0, v0, _), (w, v, _)) in enumerate(zip([(0, 0.0, -1), *hull], hull), start=1)
+            ),
+            key=lambda step: -step[0],
+        )
+        used = 0
+        brk = len(steps)
+        for rank, (_, n, t) in enumerate(steps):
+            hull = hulls[n]
+            step_words = hull[t - 1][0] - (hull[t - 2][0] if t > 1 else 0)
+            if used + step_words > capacity:
+                brk = rank
+                break
+            used += step_words
+
+        # Steps well before the break are kept, well after it dropped; only the
+        # entries with a step in between (the core) are decided by the DP.
+        base = [0] * len(items)
+        core: set[int] = set()
+        for rank, (_, n, t) in enumerate(steps):
+            if rank < brk - PACKING_CORE:
+                base[n] = max(base[n], t)
+            elif rank < brk + PACKING_CORE:
+                core.add(n)
+        for n, t in enumerate(base):
+            if t:
+                chosen[items[n][0]] = hulls[n][t - 1][2]
+        core_items = sorted(core)
+        residual = capacity - sum(hulls[n][t - 1][0] for n, t in enumerate(base) if t)
+
+        # Exact DP over the core: each core entry stays at its base level or climbs its hull.
+        cells = min(residual, PACKING_MAX_CELLS)
+        unit = max(1, -(-residual // max(cells, 1)))
+        cells = residual // unit
+        rows = [[0.0] * (cells + 1)]
+        moves = []  # per core entry: [(cost in cells, value gained, option index)]
+        for n in core_items:
+            if time.perf_counter() > deadline:
+                return _pack_entries(tier0_text, all_entries, remaining, goal, now)
+            hull = hulls[n]
+            w0, v0 = (hull[base[n] - 1][0], hull[base[n] - 1][1]) if base[n] else (0, 0.0)
+            options = [(-(-(w - w0) // unit), v - v0, k) for w, v, k in hull[base[n]:]]
+            prev = rows[-1]
+            best = prev[:]
+            for cost, value, _ in options:
+                if cost <= cells:
+                    best[cost:] = [b if b >= p + value else p + value for b, p in zip(best[cost:], prev)]
+            rows.append(best)
+            moves.append(options)
+
+        # Walk the choices back from full capacity.
+        c = cells
+        for m in range(len(core_items), 0, -1):
+            best, prev = rows[m], rows[m - 1]
+            if best[c] == prev[c]:
+                continue
+            for cost, value, k in moves[m - 1]:
+                if cost <= c and prev[c - cost] + value == best[c]:
+                    chosen[items[core_items[m - 1]][0]] = k
+                    c -= cost
+                    break
+
+        # Rounding costs up to whole cells leaves slack; spend it in score order.
+        spare = capacity - sum(options[chosen[i]][0] for i, options in items if i in chosen)
+        for i, options in items:
+            current = options[chosen[i]][0] if i in chosen else 0
+            for k in range(len(options) - 1, chosen.get(i, -1), -1):
+                if options[k][0] - current <= spare:
+                    spare -= options[k][0] - current
+                    chosen[i] = k
+                    break
+    lines = {i: options[chosen[i]][2] for i, options in items if i in chosen}
+
+    relevance_threshold = 0.2
+    relevant_parts = []
+    other_parts = []
+    packed_entries: list[MemoryEntry] = []
+    used_tokens = 0
+    for i, (score, entry) in enumerate(all_entries):
+        if i not in lines:
+            continue
+        line = lines[i]
+        if score >= relevance_threshold and goal:
+            relevant_parts.append(line)
+        else:
+            other_parts.append(line)
+        used_tokens += estimate_tokens(line)
+        packed_entries.append(entry)
 
-    return "\n".join(sections).strip()
+    sections = [tier0_text]
+    for header, parts in zip(headers, (relevant_parts, other_parts)):
+        if parts:
+            sections.append(header)
+            sections.extend(parts)
+            sections.append("")
+            used_tokens += estimate_tokens(header)
+    return sections, used_tokens, packed_entries
 
 
 # ---------------------------------------------------------------------------
 # Recording: update all three tiers
 # ---------------------------------------------------------------------------
+def role_generation(index: dict, role: str) -> int:
+    """How many writes a role's active entries have seen (0 for a fresh index)."""
+    return (index.get("generations") or {}).get(role, 0)
+
+
+def _bump_generations(index: dict, roles) -> None:
+    """Advance the generation of each role in ``roles`` (called for every write to its entries)."""
+    generations = dict(index.get("generations") or {})
+    for role in roles:
+        generations[role] = generations.get(role, 0) + 1
+    index["generations"] = generations
+
+
 def _next_id(role: str, active: dict) -> str:
     """Generate next memory entry ID."""
     entries = active.get("entries", [])
@@ -519,9 +3861,24 @@ def _next_id(role: str, active: dict) -> str:
     return f"M-{role}-{max_num + 1:03d}"
 
 
+@dataclass(slots=True)
+class _RecordRequest:
+    """One queued record_consultation call, answered by the group-commit leader."""
+
+    kwargs: dict
+    done: threading.Event
+    result: str = ""
+    error: Exception | None = None
+
+
+_RECORD_QUEUES: dict[str, deque[_RecordRequest]] = {}
+_RECORD_LEADERS: set[str] = set()
+_RECORD_MUTEX = threading.Lock()
+
+
 def record_consultation(
     project_dir: str,
-    session_id: str,
+    session_id: str | None,
     goal: str,
     strategist_summary: str,
     critic_summary: str,
@@ -537,48 +3894,176 @@ def record_consultation(
     Tier 0: Update index (consultation count, recent decisions, topic index)
     Tier 1: Add entries to active memory files
     Tier 2: Append to archive logs
+
+    Changes are committed by the project's backend in one transaction under the
+    exclusive memory lock, so a crash leaves either the old or the new state.
+    A falsy ``session_id`` is allocated from the consultation count inside the
+    lock. Calls from other threads that queue up while a writer holds the lock
+    are merged into one group commit.
+    """
+    _memory_dir(project_dir).mkdir(parents=True, exist_ok=True)
+    request = _RecordRequest(
+        kwargs=dict(
+            session_id=session_id,
+            goal=goal,
+            strategist_summary=strategist_summary,
+            critic_summary=critic_summary,
+            decision=decision,
+            strategist_lesson=strategist_lesson,
+            critic_lesson=critic_lesson,
+            hub_lesson=hub_lesson,
+            importance=importance,
+            pin=pin,
+        ),
+        done=threading.Event(),
+    )
+    key = str(_memory_dir(project_dir))
+    with _RECORD_MUTEX:
+        _RECORD_QUEUES.setdefault(key, deque()).append(request)
+        leader = key not in _RECORD_LEADERS
+        _RECORD_LEADERS.add(key)
+    if leader:
+        _drain_record_queue(project_dir, key)
+    request.done.wait()
+    if request.error is not None:
+        raise request.error
+    return request.result
+
+
+def _drain_record_queue(project_dir: str, key: str) -> None:
+    """Leader loop: take the lock, commit everything queued meanwhile, repeat until idle.
+
+    If the loop itself fails (the lock cannot be taken, or a BaseException
+    escapes a commit), leadership is given up and every request still waiting
+    is failed with the same error before it propagates, so no caller blocks.
+    """
+    batch: list[_RecordRequest] = []
+    try:
+        while True:
+            with MemoryLock(project_dir, exclusive=True):
+                with _RECORD_MUTEX:
+                    queue = _RECORD_QUEUES[key]
+                    batch = list(queue)
+                    queue.clear()
+                    if not batch:
+                        _RECORD_LEADERS.discard(key)
+                        return
+                try:
+                    _commit_record_batch(project_dir, batch)
+                except Exception as e:
+                    for request in batch:
+                        if request.error is None:
+                            request.error = e
+                for request in batch:
+                    request.done.set()
+                batch = []
+    except BaseException as e:
+        with _RECORD_MUTEX:
+            _RECORD_LEADERS.discard(key)
+            pending = [*batch, *_RECORD_QUEUES[key]]
+            _RECORD_QUEUES[key].clear()
+        for request in pending:
+            if not request.done.is_set():
+                request.error = e
+                request.done.set()
+        raise
+
+
+def _commit_record_batch(project_dir: str, batch: list[_RecordRequest]) -> None:
+    """Stage and commit a group of records.
+
+    A request whose staging raises fails alone: its error is set and the rest
+    are staged again from the stored state, since staging updates the shared
+    index and entries in place. Only a failing commit fails them all.
+    """
+    backend = get_backend(project_dir)
+    backend.recover()
+    while True:
+        index = copy.deepcopy(backend.load_index())
+        entries: dict[str, _NearDuplicates] = {}
+        staged = []
+        for request in batch:
+            try:
+                staged.append(_stage_consultation(backend, index, entries, **request.kwargs))
+            except Exception as e:
+                request.error = e
+                break
+        else:
+            break
+        batch = [request for request in batch if request.error is None]
+    if not staged:
+        return
+    backend.commit_consultations(staged)
+    for request, changes in zip(batch, staged):
+        request.result = f"Recorded consultation {changes.session_id}. Memory updated across all tiers."
+        merged = [entry["id"] for role_entries in changes.merged.values() for entry in role_entries]
+        if merged:
+            request.result += f" Merged near-duplicate lessons into {', '.join(merged)}."
+
+
+def _stage_consultation(
+    backend: MemoryBackend,
+    index: dict,
+    entries: dict[str, _NearDuplicates],
+    session_id: str | None,
+    goal: str,
+    strategist_summary: str,
+    critic_summary: str,
+    decision: str,
+    strategist_lesson: str,
+    critic_lesson: str,
+    hub_lesson: str,
+    importance: int,
+    pin: bool,
+) -> ConsultationChanges:
+    """Build one consultation's changes, updating ``index`` and ``entries`` in place.
+
+    ``entries`` holds each role's entries including those staged earlier in the
+    same group commit, so ids stay unique across the batch. A lesson that
+    restates an entry (see _NearDuplicates) is merged into it instead of added.
     """
     now = datetime.now(timezone.utc)
     now_iso = now.isoformat()
     date_str = now.strftime("%Y-%m-%d")
-    memory = _memory_dir(project_dir)
-    memory.mkdir(parents=True, exist_ok=True)
 
     goal_topics = list(extract_topics(goal))
 
-    # --- Tier 2: Append to archive (never modified, always grows) ---
-    # decisions.md
-    decisions_path = memory / "decisions.md"
-    with open(decisions_path, "a", encoding="utf-8") as f:
-        if decisions_path.stat().st_size == 0:
-            f.write("# Hub Decision Record\n")
-        f.write(f"\n## {date_str} — {goal[:80]} (session {session_id})\n\n")
-        f.write(f"- **Goal:** {goal}\n")
-        f.write(f"- **Strategist:** {strategist_summary}\n")
-        f.write(f"- **Critic:** {critic_summary}\n")
-        f.write(f"- **Decision:** {decision}\n\n")
-
-    # lessons.jsonl
-    lessons_path = memory / "lessons.jsonl"
-    with open(lessons_path, "a", encoding="utf-8") as f:
-        for source, lesson in [("strategist", strategist_lesson), ("critic", critic_lesson), ("hub", hub_lesson)]:
-            if lesson:
-                f.write(json.dumps({"ts": now_iso, "lesson": lesson, "source": source, "session": session_id}) + "\n")
-
-    # Role logs
-    for role, lesson in [("strategist", strategist_lesson), ("critic", critic_lesson)]:
-        if lesson:
-            log_path = memory / f"{role}-log.md"
-            with open(log_path, "a", encoding="utf-8") as f:
-                if log_path.stat().st_size == 0:
-                    f.write(f"# {role.title()} Memory Log\n")
-                f.write(f"\n### Session {session_id} ({date_str})\n\n{lesson}\n")
+    if not session_id:
+        session_id = f"S-{index.get('consultation_count', 0) + 1:03d}"
+
+    # --- Tier 2: Archive (never modified, always grows) ---
+    decision_section = (
+        f"\n## {date_str} — {goal[:80]} (session {session_id})\n\n"
+        f"- **Goal:** {goal}\n"
+        f"- **Strategist:** {strategist_summary}\n"
+        f"- **Critic:** {critic_summary}\n"
+        f"- **Decision:** {decision}\n\n"
+    )
+    lessons = [
+        {"ts": now_iso, "lesson": lesson, "source": source, "session": session_id}
+        for source, lesson in [("strategist", strategist_lesson), ("critic", critic_lesson), ("hub", hub_lesson)]
+        if lesson
+    ]
+    logs = {
+        role: f"\n### Session {session_id} ({date_str})\n\n{lesson}\n"
+        for role, lesson in [("strategist", strategist_lesson), ("critic", critic_lesson)]
+        if lesson
+    }
 
     # --- Tier 1: Add to active memory ---
+    added: dict[str, list[dict]] = {}
+    merged: dict[str, list[dict]] = {}
     for role, lesson in [("strategist", strategist_lesson), ("critic", critic_lesson), ("hub", hub_lesson)]:
         if lesson:
-            active = load_active(project_dir, role)
-            entry_id = _next_id(role, active)
+            if role not in entries:
+                entries[role] = _NearDuplicates(list(backend.load_entries(role)))
+            role_entries = entries[role].entries
+            pos = entries[role].find(lesson)
+            if pos is not None:
+                role_entries[pos] = _merge_duplicate(role_entries[pos], session_id, now_iso, importance, pin)
+                merged[role] = [role_entries[pos]]
+                continue
+            entry_id = _next_id(role, {"entries": role_entries})
             entry_topics = list(extract_topics(lesson))
             entry = {
                 "id": entry_id,
@@ -595,11 +4080,13 @@ def record_consultation(
                 "source_sessions": [session_id],
                 "supersedes": [],
             }
-            active.setdefault("entries", []).append(entry)
-            save_active(project_dir, role, active)
+            entry["features"] = _derive_features(entry)
+            role_entries.append(entry)
+            entries[role].add(len(role_entries) - 1)
+            added[role] = [entry]
 
     # --- Tier 0: Update index ---
-    index = load_index(project_dir)
+    _bump_generations(index, [role for role in ("strategist", "critic", "hub") if role in added or role in merged])
     index["consultation_count"] = index.get("consultation_count", 0) + 1
     index["last_updated"] = now_iso
 
@@ -638,27 +4125,444 @@ def record_consultation(
         if session_id not in entry["decision_ids"]:
             entry["decision_ids"].append(session_id)
 
-        # Grow keywords (cap at 30 per topic)
-        existing = set(entry["keywords"])
-        entry["keywords"] = list(existing | candidate_words)[:30]
+        # Grow keywords (counted, cap at KEYWORD_CAP per topic)
+        _grow_topic_keywords(entry, candidate_words, index["consultation_count"])
 
         # Track decisions (cap at 3 most recent)
         entry["decisions"].append({"session": session_id, "summary": decision[:100]})
         entry["decisions"] = entry["decisions"][-3:]
     index["topic_index"] = ti
 
-    save_index(project_dir, index)
+    return ConsultationChanges(
+        session_id=session_id,
+        index=index,
+        added=added,
+        decision=decision_section,
+        lessons=lessons,
+        logs=logs,
+        merged=merged,
+    )
+
+
+@_locked(exclusive=True)
+def apply_compaction(project_dir: str, role: str, entries: list[dict]) -> None:
+    """Replace a role's active memory and advance the compaction watermark atomically."""
+    backend = get_backend(project_dir)
+    backend.recover()
+    index = dict(backend.load_index())
+    index["compaction_watermark"] = f"S-{index.get('consultation_count', 0):03d}"
+    _bump_generations(index, [role])
+    backend.replace_active({role: [_with_features(e) for e in entries]}, index)
+
+
+# ---------------------------------------------------------------------------
+# Automatic compaction (the curator's rules, applied deterministically)
+# ---------------------------------------------------------------------------
+COMPACT_SIMILARITY = 0.6  # shingle Jaccard at which compaction folds an entry into a cluster
+COMPACT_TARGET = 20  # active entries per role the curator aims to stay under
+# (minimum importance, detail_level), highest first — the rules in agents/curator.md
+COMPACT_DETAIL_RULES = ((7, 3), (4, 2), (0, 1))
+PINNED_MIN_DETAIL = 2
+UNSCORED_IMPORTANCE = 5  # what retrieval assumes for an entry without importance
+
+
+def _importance(entry: dict) -> int:
+    importance = entry.get("importance")
+    return UNSCORED_IMPORTANCE if importance is None else importance
+
+
+def _compact_detail_level(entry: dict) -> int:
+    """The detail_level the curator rules allow ``entry`` (never above its current one)."""
+    importance = _importance(entry)
+    level = next(level for floor, level in COMPACT_DETAIL_RULES if importance >= floor)
+    current = entry.get("detail_level")
+    if isinstance(current, int) and 0 < current < level:
+        level = current
+    return max(level, PINNED_MIN_DETAIL) if entry.get("pinned") else level
+
+
+def _fold_entries(representative: dict, absorbed: list[dict]) -> dict:
+    """``representative`` carrying the sessions, references and topics of ``absorbed`` (a new dict)."""
+    group = [representative, *absorbed]
+    sessions = list(dict.fromkeys(s for e in group for s in e.get("source_sessions") or ()))
+    topics = list(dict.fromkeys(t for e in group for t in e.get("topics") or ()))
+    supersedes = list(dict.fromkeys(
+        s for e in group for s in [*(e.get("supersedes") or ()), e["id"]] if s != representative["id"]
+    ))
+    folded = {
+        **representative,
+        "topics": topics,
+        "importance": max(_importance(e) for e in group),
+        "referenced_count": sum(e.get("referenced_count") or 0 for e in group),
+        "source_sessions": sessions,
+        "supersedes": supersedes,
+    }
+    for key in ("last_validated", "last_referenced"):
+        stamps = [e[key] for e in group if e.get(key)]
+        if stamps:
+            folded[key] = max(stamps)
+    return folded
+
+
+def _cluster_entries(entries: list[dict], similarity: float) -> tuple[list[int], dict[int, list[tuple[int, float]]]]:
+    """Leader clustering of near-duplicate entries at shingle Jaccard ``similarity`` or above.
+
+    Entries are visited pinned first, then by importance, references and
+    stored order; each joins the first kept entry it matches, otherwise it is
+    kept. Pinned entries and entries without a unique id are always kept.
+    Returns the kept positions and, per kept position that absorbed others,
+    (absorbed position, Jaccard) pairs.
+    """
+    ids = Counter(e.get("id") for e in entries)
+    order = sorted(
+        range(len(entries)),
+        key=lambda pos: (
+            not entries[pos].get("pinned"),
+            -_importance(entries[pos]),
+            -(entries[pos].get("referenced_count") or 0),
+            pos,
+        ),
+    )
+    shingles = [_shingles(e.get("text") or "") for e in entries]
+    # Prefix filter: with each set's shingles rarest first, two sets at Jaccard
+    # ``similarity`` or above share a shingle within their first few.
+    spread = Counter(s for group in shingles for s in group)
+    prefixes = []
+    for group in shingles:
+        overlap = math.ceil(similarity * len(group) - 1e-9)  # shingles a match must share, at least
+        prefixes.append(sorted(group, key=lambda s: (spread[s], s))[: len(group) - overlap + 1])
+    kept: list[int] = []
+    rank: dict[int, int] = {}  # kept position -> visit order, for those that can absorb
+    postings: dict[str, list[int]] = {}  # prefix shingle -> kept positions
+    absorbed: dict[int, list[tuple[int, float]]] = {}
+    for pos in order:
+        entry = entries[pos]
+        unique = bool(entry.get("id")) and ids[entry["id"]] == 1
+        if unique and not entry.get("pinned") and shingles[pos]:
+            candidates = {k for s in prefixes[pos] for k in postings.get(s, ())}
+            scores = {k: _jaccard(shingles[pos], shingles[k]) for k in candidates}
+            target = min((k for k in candidates if scores[k] >= similarity), key=rank.__getitem__, default=None)
+            if target is not None:
+                absorbed.setdefault(target, []).append((pos, scores[target]))
+                continue
+        kept.append(pos)
+        if unique:
+            rank[pos] = len(rank)
+            for s in prefixes[pos]:
+                postings.setdefault(s, []).append(pos)
+    return kept, absorbed
+
+
+def compact_entries(entries: list[dict]) -> tuple[list[dict], dict[str, list[str]]]:
+    """Cluster near-duplicate entries and apply the curator's detail-level rules.
+
+    Entries are clustered by _cluster_entries at COMPACT_SIMILARITY; each
+    cluster folds into its kept entry. Returns the kept entries in stored
+    order and, per kept entry that absorbed others, the absorbed ids.
+    """
+    kept, clusters = _cluster_entries(entries, COMPACT_SIMILARITY)
+    absorbed = {k: [pos for pos, _ in group] for k, group in clusters.items()}
+    compacted = []
+    for pos in sorted(kept):
+        entry = entries[pos]
+        if pos in absorbed:
+            entry = _fold_entries(entry, [entries[a] for a in absorbed[pos]])
+        level = _compact_detail_level(entry)
+        if entry is not entries[pos] or entry.get("detail_level") != level:
+            entry = {**entry, "detail_level": level}
+            stored = MemoryEntry.from_dict(entries[pos]).stored  # the text is unchanged
+            entry["features"] = _derive_features(entry, stored["minhash"] if stored else None)
+        compacted.append(entry)
+    merges = {entries[k]["id"]: [entries[a]["id"] for a in group] for k, group in sorted(absorbed.items())}
+    return compacted, merges
+
+
+@_locked(exclusive=True)
+def auto_compact(project_dir: str, roles: list[str] | None = None, dry_run: bool = False) -> dict:
+    """Compact each role's active memory with compact_entries, in one transaction.
+
+    Returns {role: {"before", "after", "merged", "downgraded"}}, where
+    ``merged`` maps kept ids to the ids folded into them and ``downgraded``
+    lists the ids whose detail_level was lowered. Nothing is written when
+    ``dry_run`` is set or no role changed; otherwise the compaction watermark
+    advances as with apply_compaction.
+    """
+    backend = get_backend(project_dir)
+    backend.recover()
+    report: dict[str, dict] = {}
+    active: dict[str, list[dict]] = {}
+    for role in roles or ["strategist", "critic", "hub"]:
+        entries = backend.load_entries(role)
+        compacted, merges = compact_entries(entries)
+        levels = {e.get("id"): e.get("detail_level") for e in entries}
+        levels = {k: v if isinstance(v, int) else len(DETAIL_LEVELS) for k, v in levels.items()}
+        report[role] = {
+            "before": len(entries),
+            "after": len(compacted),
+            "merged": merges,
+            "downgraded": [e["id"] for e in compacted if e.get("id") and e["detail_level"] < levels[e["id"]]],
+        }
+        if compacted != entries:
+            active[role] = compacted
+    if active and not dry_run:
+        index = dict(backend.load_index())
+        index["compaction_watermark"] = f"S-{index.get('consultation_count', 0):03d}"
+        _bump_generations(index, active)
+        backend.replace_active(active, index)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Patch-based compaction (small edits checked against the role's generation)
+# ---------------------------------------------------------------------------
+PATCH_OPS = ("delete", "merge", "update", "pin", "unpin")
+PATCH_FIELDS = ("text", "headline", "topics", "importance", "detail_level")
+
 
-    return f"Recorded consultation {session_id}. Memory updated across all tiers."
+def _patch_fields(fields: dict) -> dict:
+    """``fields`` checked against PATCH_FIELDS and their types. Raises ValueError."""
+    unknown = set(fields) - set(PATCH_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Must be among {', '.join(PATCH_FIELDS)}.")
+    for key in ("text", "headline"):
+        if key in fields and not isinstance(fields[key], str):
+            raise ValueError(f"{key} must be a string.")
+    if "topics" in fields and not (
+        isinstance(fields["topics"], list) and all(isinstance(t, str) for t in fields["topics"])
+    ):
+        raise ValueError("topics must be a list of strings.")
+    for key, top in (("importance", 10), ("detail_level", len(DETAIL_LEVELS))):
+        value = fields.get(key)
+        if key in fields and (type(value) is not int or not 1 <= value <= top):
+            raise ValueError(f"{key} must be an integer from 1 to {top}.")
+    return fields
+
+
+def _merged_entry(role: str, entries: list[dict], group: list[dict], fields: dict, now_iso: str) -> dict:
+    """A new entry replacing ``group``: their history combined, ``fields`` on top."""
+    created = [e["created"] for e in group if e.get("created")]
+    referenced = [e["last_referenced"] for e in group if e.get("last_referenced")]
+    entry = {
+        "id": _next_id(role, {"entries": entries}),
+        "topics": list(dict.fromkeys(t for e in group for t in e.get("topics") or ())),
+        "detail_level": max(e.get("detail_level") or len(DETAIL_LEVELS) for e in group),
+        "text": "",
+        "importance": max(_importance(e) for e in group),
+        "pinned": any(e.get("pinned") for e in group),
+        "created": min(created) if created else now_iso,
+        "last_validated": now_iso,
+        "last_referenced": max(referenced) if referenced else now_iso,
+        "referenced_count": sum(e.get("referenced_count") or 0 for e in group),
+        "source_sessions": list(dict.fromkeys(s for e in group for s in e.get("source_sessions") or ())),
+        "supersedes": list(dict.fromkeys(s for e in group for s in [*(e.get("supersedes") or ()), e["id"]])),
+        **fields,
+    }
+    if "headline" not in fields:
+        text = entry["text"]
+        entry["headline"] = text[:100].split(".")[0] + "." if "." in text[:100] else text[:80]
+    return entry
+
+
+def apply_patch_ops(role: str, entries: list[dict], ops: list[dict]) -> list[dict]:
+    """``entries`` with ``ops`` applied in order (a new list). Raises ValueError on any bad op.
+
+    Ops are {"op": "delete", "ids": [...]}, {"op": "merge", "ids": [...],
+    "entry": {...}} (a new entry, with PATCH_FIELDS from "entry" and "text"
+    required, at the first merged entry's position), {"op": "update", "id":
+    ..., <PATCH_FIELDS>} and {"op": "pin" | "unpin", "id": ...}.
+    """
+    now_iso = datetime.now(timezone.utc).isoformat()
+    entries = list(entries)
+    for n, op in enumerate(ops, start=1):
+        if not isinstance(op, dict) or op.get("op") not in PATCH_OPS:
+            raise ValueError(f"Operation {n}: op must be one of {', '.join(PATCH_OPS)}.")
+        kind = op["op"]
+        ids = op.get("ids") if kind in ("delete", "merge") else [op.get("id")]
+        valid = isinstance(ids, list) and ids and all(isinstance(i, str) for i in ids)
+        if not valid or len(set(ids)) != len(ids):
+            raise ValueError(f"Operation {n} ({kind}): needs distinct entry ids (strings).")
+        positions = {}
+        for pos, entry in enumerate(entries):
+            if entry.get("id") in ids:
+                if entry["id"] in positions:
+                    raise ValueError(f"Operation {n} ({kind}): id {entry['id']} is not unique in {role}.")
+                positions[entry["id"]] = pos
+        missing = [i for i in ids if i not in positions]
+        if missing:
+            raise ValueError(f"Operation {n} ({kind}): no {role} entry {', '.join(missing)}.")
+        try:
+            if kind == "delete":
+                entries = [e for pos, e in enumerate(entries) if pos not in positions.values()]
+            elif kind == "merge":
+                fields = op.get("entry")
+                if not isinstance(fields, dict) or not isinstance(fields.get("text"), str) or not fields["text"]:
+                    raise ValueError("entry.text is required.")
+                group = [entries[pos] for pos in sorted(positions.values())]
+                merged = _with_features(_merged_entry(role, entries, group, _patch_fields(fields), now_iso))
+                first = min(positions.values())
+                entries[first] = merged
+                entries = [e for pos, e in enumerate(entries) if pos == first or pos not in positions.values()]
+            else:
+                pos = positions[ids[0]]
+                if kind == "update":
+                    fields = _patch_fields({k: v for k, v in op.items() if k not in ("op", "id")})
+                    if not fields:
+                        raise ValueError("nothing to update.")
+                    entries[pos] = {**entries[pos], **fields}
+                else:
+                    entries[pos] = {**entries[pos], "pinned": kind == "pin"}
+                entries[pos] = {**entries[pos], "features": _derive_features(entries[pos])}
+        except ValueError as e:
+            raise ValueError(f"Operation {n} ({kind}): {e}") from None
+    return entries
+
+
+@_locked(exclusive=True)
+def patch_entries(project_dir: str, role: str, ops: list[dict], generation: int) -> int:
+    """Apply ``ops`` (see apply_patch_ops) to a role's active entries atomically.
+
+    ``generation`` is the role generation the caller last read (see
+    role_generation); if the role has been written since, nothing is applied
+    and ValueError is raised, as it is for any invalid op. The compaction
+    watermark advances as with apply_compaction. Returns the new generation.
+    """
+    backend = get_backend(project_dir)
+    backend.recover()
+    index = dict(backend.load_index())
+    current = role_generation(index, role)
+    if generation != current:
+        raise ValueError(f"{role} is at generation {current}, not {generation}: reload and rebuild the patch.")
+    entries = apply_patch_ops(role, backend.load_entries(role), ops)
+    index["compaction_watermark"] = f"S-{index.get('consultation_count', 0):03d}"
+    _bump_generations(index, [role])
+    backend.replace_active({role: entries}, index)
+    return current + 1
+
+
+# ---------------------------------------------------------------------------
+# Compaction candidates (what the curator reasons over instead of every entry)
+# ---------------------------------------------------------------------------
+CANDIDATE_SIMILARITY = 0.35  # below COMPACT_SIMILARITY: pairs auto-compaction leaves for the curator
+CANDIDATE_DECISION_OVERLAP = 0.3  # share of the decision's words an entry must mention to count as superseded
+CANDIDATE_STALE_DAYS = 90  # days since validation, as _stale_marker
+CANDIDATE_LOW_IMPORTANCE = 3
+CANDIDATE_GROUP_CAP = 20
+
+
+def _candidate_member(entry: dict, score: float) -> dict:
+    return {
+        "id": entry["id"],
+        "importance": entry.get("importance"),
+        "headline": entry.get("headline") or (entry.get("text") or "")[:80],
+        "score": score,
+    }
+
+
+def _duplicate_groups(entries: list[dict], tokens: list[int]) -> list[dict]:
+    kept, clusters = _cluster_entries(entries, CANDIDATE_SIMILARITY)
+    return [
+        {
+            "kind": "duplicates",
+            "keep": entries[k]["id"],
+            "entries": [
+                _candidate_member(entries[k], 1.0),
+                *(_candidate_member(entries[pos], round(score, 2)) for pos, score in group),
+            ],
+            "tokens_saved": sum(tokens[pos] for pos, _ in group),
+        }
+        for k, group in sorted(clusters.items())
+    ]
+
+
+def _superseded_groups(
+    records: list[MemoryEntry], entries: list[dict], tokens: list[int], topic_index: dict
+) -> list[dict]:
+    """Entries older than a later decision on one of their topics whose words they share."""
+    groups: dict[str, dict] = {}
+    for pos, entry in enumerate(entries):
+        sessions = entry.get("source_sessions") or ()
+        if entry.get("pinned") or not entry.get("id") or not sessions:
+            continue
+        newest = max(map(_session_order, sessions))
+        words = records[pos].words()
+        for topic in entry.get("topics") or ():
+            for decision in reversed((topic_index.get(topic) or {}).get("decisions", ())):
+                if _session_order(decision["session"]) <= newest:
+                    break
+                decided = set(re.findall(r"[a-z0-9-]+", decision.get("summary", "").lower())) - _STOPWORDS
+                overlap = len(decided & words) / len(decided) if decided else 0.0
+                if overlap < CANDIDATE_DECISION_OVERLAP:
+                    continue
+                group = groups.setdefault(decision["session"], {
+                    "kind": "superseded",
+                    "decision": decision["session"],
+                    "topic": topic,
+                    "summary": decision.get("summary", ""),
+                    "entries": [],
+                    "tokens_saved": 0,
+                })
+                if all(m["id"] != entry["id"] for m in group["entries"]):
+                    group["entries"].append(_candidate_member(entry, round(overlap, 2)))
+                    group["tokens_saved"] += tokens[pos]
+    return list(groups.values())
+
+
+def _stale_group(records: list[MemoryEntry], entries: list[dict], tokens: list[int], now: datetime) -> list[dict]:
+    members, saved = [], 0
+    for pos, (record, entry) in enumerate(zip(records, entries)):
+        days = _entry_ages(record, now)[1]
+        low = (record.importance or 0) <= CANDIDATE_LOW_IMPORTANCE
+        if entry.get("id") and not record.pinned and low and days is not None and days > CANDIDATE_STALE_DAYS:
+            members.append(_candidate_member(entry, days))
+            saved += tokens[pos]
+    return [{"kind": "stale", "entries": members, "tokens_saved": saved}] if members else []
+
+
+@_locked(exclusive=False)
+def compaction_candidates(project_dir: str, role: str, limit: int = CANDIDATE_GROUP_CAP) -> dict:
+    """Candidate groups for the curator, most tokens saved first.
+
+    "duplicates" are near-duplicate clusters (shingle Jaccard at
+    CANDIDATE_SIMILARITY or above) with the entry to keep first; "superseded"
+    groups hold entries older than a later decision on their topic that
+    mentions their words; "stale" lists low-importance entries not validated
+    in CANDIDATE_STALE_DAYS. Each member's score is its Jaccard with the kept
+    entry, its overlap with the decision or its days since validation.
+    Returns {"role", "generation", "entries", "tokens", "groups": [{"kind",
+    "entries": [{"id", "importance", "headline", "score"}], "tokens_saved",
+    ...}]}; ``tokens_saved`` assumes every member but a kept one is dropped.
+    """
+    if role not in ROLES:
+        raise ValueError(f"Invalid role: {role}. Must be one of {', '.join(ROLES)}.")
+    backend = get_backend(project_dir)
+    index = backend.load_index()
+    entries = backend.load_entries(role)
+    records = [MemoryEntry.from_dict(e) for e in entries]
+    tokens = [_entry_tokens_full(r) for r in records]
+    groups = [
+        *_duplicate_groups(entries, tokens),
+        *_superseded_groups(records, entries, tokens, index.get("topic_index", {})),
+        *_stale_group(records, entries, tokens, datetime.now(timezone.utc)),
+    ]
+    groups.sort(key=lambda g: -g["tokens_saved"])
+    return {
+        "role": role,
+        "generation": role_generation(index, role),
+        "entries": len(entries),
+        "tokens": sum(tokens),
+        "groups": groups[:max(0, limit)],
+    }
 
 
 # ---------------------------------------------------------------------------
 # Memory health / compaction status
 # ---------------------------------------------------------------------------
+@_locked(exclusive=False)
 def get_memory_health(project_dir: str) -> dict:
     """Get memory health stats for compaction decisions."""
-    memory = _memory_dir(project_dir)
-    index = load_index(project_dir)
+    backend = get_backend(project_dir)
+    index = backend.load_index()
+    archive_counts = backend.archive_counts(index)
 
     health = {
         "consultation_count": index.get("consultation_count", 0),
@@ -669,21 +4573,18 @@ def get_memory_health(project_dir: str) -> dict:
     }
 
     for role in ["strategist", "critic", "hub"]:
-        active = load_active(project_dir, role)
-        entries = active.get("entries", [])
+        entries = backend.load_records(role)
         entry_count = len(entries)
-        total_tokens = sum(estimate_tokens(e.get("text", "")) for e in entries)
+        total_tokens = sum(_entry_tokens_full(e) for e in entries)
 
-        log_path = memory / f"{role}-log.md"
-        log_lines = 0
-        if log_path.exists():
-            log_lines = len(log_path.read_text(encoding="utf-8").strip().split("\n"))
+        log_lines = archive_counts.get(f"{role}-log.md", 0)
 
         needs = total_tokens > 6000 or entry_count > 20
         if needs:
             health["needs_compaction"] = True
 
         health["roles"][role] = {
+            "generation": role_generation(index, role),
             "active_entries": entry_count,
             "active_tokens": total_tokens,
             "log_lines": log_lines,
@@ -691,3 +4592,165 @@ def get_memory_health(project_dir: str) -> dict:
         }
 
     return health
+
+
+# ---------------------------------------------------------------------------
+# Archive search (filtered, ranked, cursor-paginated)
+# ---------------------------------------------------------------------------
+SEARCH_PAGE_SIZE = 10
+SEARCH_MAX_PAGE = 50
+SEARCH_SNIPPET_WORDS = 40
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    """Up to SEARCH_SNIPPET_WORDS words of ``text``, starting just before its first query term."""
+    words = text.split()
+    first = next(
+        (n for n, word in enumerate(words) if terms.intersection(re.findall(r"[a-z0-9-]+", word.lower()))), 0
+    )
+    start = max(0, min(first - 8, len(words) - SEARCH_SNIPPET_WORDS))
+    window = " ".join(words[start:start + SEARCH_SNIPPET_WORDS])
+    return f"{'... ' if start else ''}{window}{' ...' if start + SEARCH_SNIPPET_WORDS < len(words) else ''}"
+
+
+def _search_fingerprint(params: list, counts: dict[str, int]) -> str:
+    return f"{zlib.crc32(json.dumps([params, counts], sort_keys=True).encode('utf-8')):08x}"
+
+
+@_locked(exclusive=False)
+def search_archive(
+    project_dir: str,
+    query: str = "",
+    topic: str = "",
+    kinds: list[str] | None = None,
+    sessions: tuple[str, str] | None = None,
+    dates: tuple[str, str] | None = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    cursor: str = "",
+) -> dict:
+    """One page of archive records matching the filters, best first.
+
+    ``query`` ranks by BM25 over the records that pass the other filters
+    (records sharing no query word are left out); without one, records come
+    newest first. ``topic`` keeps the sessions the topic index lists for it
+    and records whose text the topic matcher tags with it. ``sessions`` and
+    ``dates`` are inclusive (first, last) bounds, either end "" for open.
+    ``cursor`` is the ``next_cursor`` of the previous page; a cursor from
+    another search, or from before the archive changed, raises ValueError.
+
+    Returns {"hits": [{"kind", "session", "date", "source", "score",
+    "snippet"}], "total": matching records, "next_cursor": str | None}.
+    """
+    kinds = sorted(set(kinds or ARCHIVE_KINDS))
+    unknown = set(kinds) - set(ARCHIVE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown kinds: {', '.join(sorted(unknown))}. Must be among {', '.join(ARCHIVE_KINDS)}.")
+    limit = max(1, min(limit, SEARCH_MAX_PAGE))
+    backend = get_backend(project_dir)
+    index = backend.load_index()
+    fingerprint = _search_fingerprint([query, topic, kinds, sessions, dates, limit], backend.archive_counts(index))
+    offset = 0
+    if cursor:
+        position, _, stamp = cursor.partition(".")
+        if not position.isdigit() or stamp != fingerprint:
+            raise ValueError("cursor does not belong to this search, or the archive has changed since.")
+        offset = int(position)
+
+    files = backend.archive_files(set(kinds), (dates[0] or "0", dates[1] or "9") if dates else None, sessions)
+    topic_index = index.get("topic_index", {})
+    topic_sessions = set((topic_index.get(topic) or {}).get("decision_ids", ())) if topic else set()
+    low, high = dates if dates else ("", "")
+    high = high or "9"
+    # (file, archive position of its first record, positions passing the filters or None for all)
+    selected: list[tuple[ArchiveFile, int, list[int] | None]] = []
+    first = 0
+    for archive in files:
+        picks = None
+        if sessions:
+            picks = [n for session, found in archive.sessions.items() if _in_sessions(session, sessions) for n in found]
+        if dates and not (low <= archive.dates[0] and archive.dates[1] <= high):
+            records = archive.records
+            picks = [n for n in (range(len(records)) if picks is None else picks) if low <= records[n].date <= high]
+        if topic:
+            tagged = set(archive.tagged(topic, topic_index))
+            tagged.update(n for session in topic_sessions for n in archive.sessions.get(session, ()))
+            picks = sorted(tagged) if picks is None else [n for n in picks if n in tagged]
+        if picks is None or picks:
+            selected.append((archive, first, picks))
+        first += len(archive.records)
+
+    terms = set(re.findall(r"[a-z0-9-]+", query.lower())) - _STOPWORDS
+
+    def newest(n: int, record: ArchiveRecord) -> tuple:
+        return _session_order(record.session), record.kind, record.source, n
+
+    if terms:
+        # BM25 statistics come from the file totals and postings; only records sharing a term are scored.
+        n_docs, total_len, matched, df = 0, 0, [], Counter()
+        for archive, first, picks in selected:
+            postings = {term: archive.postings.get(term, ()) for term in terms}
+            if picks is None:
+                n_docs += len(archive.records)
+                total_len += archive.length
+            else:
+                n_docs += len(picks)
+                total_len += sum(archive.records[n].length for n in picks)
+                allowed = set(picks)
+                postings = {term: allowed.intersection(found) for term, found in postings.items()}
+            for term, found in postings.items():
+                df[term] += len(found)
+            matched.extend((first + n, archive.records[n]) for n in set().union(*postings.values()))
+        avg_len = total_len / max(n_docs, 1)
+        weights = dict.fromkeys(terms, 1.0)
+        scored = [
+            (_bm25(record.tf, record.length, weights, df, n_docs, avg_len), newest(n, record), record)
+            for n, record in matched
+        ]
+        total = len(scored)
+        ranked = heapq.nlargest(offset + limit, scored, key=lambda hit: (hit[0], hit[1]))
+    else:
+        eligible = (
+            (0.0, newest(first + n, archive.records[n]), archive.records[n])
+            for archive, first, picks in selected
+            for n in (range(len(archive.records)) if picks is None else picks)
+        )
+        total = sum(len(archive.records) if picks is None else len(picks) for archive, _, picks in selected)
+        ranked = heapq.nlargest(offset + limit, eligible, key=lambda hit: hit[1])
+
+    hits = []
+    for score, _, record in ranked[offset:offset + limit]:
+        hits.append({
+            "kind": record.kind,
+            "session": record.session,
+            "date": record.date,
+            "source": record.source,
+            "score": round(score, 3),
+            "snippet": _snippet(record.text, terms),
+        })
+    more = offset + limit < total
+    return {"hits": hits, "total": total, "next_cursor": f"{offset + limit}.{fingerprint}" if more else None}
+
+
+# ---------------------------------------------------------------------------
+# Decision lookup (by session id or topic, through the decisions offset index)
+# ---------------------------------------------------------------------------
+@_locked(exclusive=False)
+def fetch_decisions(
+    project_dir: str, sessions: list[str] | None = None, topic: str = "", limit: int = DECISION_FETCH_CAP
+) -> list[dict]:
+    """Full decision records by session id, oldest first.
+
+    ``topic`` selects the sessions the topic index lists for it (combined with
+    ``sessions``, only those on both). Only the ``limit`` most recent sessions
+    are read. Returns [{"session", "date", "topics", "text"}]; a session
+    recorded more than once yields each of its decisions.
+    """
+    if not sessions and not topic:
+        raise ValueError("give session ids or a topic.")
+    backend = get_backend(project_dir)
+    wanted = set(sessions or ())
+    if topic:
+        listed = set((backend.load_index().get("topic_index", {}).get(topic) or {}).get("decision_ids", ()))
+        wanted = wanted & listed if sessions else listed
+    wanted = set(sorted(wanted, key=_session_order)[-max(1, limit):])
+    return backend.session_decisions(wanted)
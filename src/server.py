@@ -1,21 +1,40 @@
-"""The Council MCP Server v3 — Memory-only persistence layer (6 tools)."""
+"""The Council MCP Server v3 — Memory-only persistence layer (14 tools)."""
 
+import asyncio
 import json
+import os
 import shutil
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial, wraps
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
 
 from .memory import (
+    PACKING_MODES,
+    COMPACT_TARGET,
+    RANKING_MODES,
+    MemoryLens,
+    MemoryLock,
+    apply_compaction,
+    auto_compact,
+    build_memory_batch,
     build_memory_response,
+    build_memory_views,
+    compaction_candidates,
+    fetch_decisions,
+    get_backend,
     get_memory_health,
     get_original_prompt,
-    load_index,
+    invalidate_memory_cache,
+    migrate_to_sqlite,
+    patch_entries,
     record_consultation,
-    save_active,
-    save_index,
+    search_archive,
     store_original_prompt,
+    verify_memory,
 )
 
 mcp = FastMCP("the-council")
@@ -32,11 +51,59 @@ def _check_init(project_dir: str) -> str | None:
     return None
 
 
+# ---------------------------------------------------------------------------
+# Worker pool: tool bodies block on file I/O and scoring, so they run off the
+# event loop and one slow load never stalls other requests on the transport.
+# ---------------------------------------------------------------------------
+MAX_WORKERS = int(os.environ.get("COUNCIL_MAX_WORKERS", "4"))
+_EXECUTOR: ThreadPoolExecutor | None = None
+# Per event loop (asyncio locks are bound to one): project path -> writer lock.
+_WRITE_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="council")
+    return _EXECUTOR
+
+
+def _write_lock(project_dir: str) -> asyncio.Lock:
+    locks = _WRITE_LOCKS.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault(str(Path(project_dir).resolve()), asyncio.Lock())
+
+
+def _offload(writes: bool = False):
+    """Run a blocking ``(project_dir, ...)`` tool body on the worker pool.
+
+    Tools that ``writes`` run one at a time per project: later writers wait
+    on the event loop rather than each holding a pool thread while blocked on
+    the memory lock. Reads are not serialized (MemoryLock lets them overlap).
+    """
+
+    def decorate(func):
+        @wraps(func)
+        async def wrapper(project_dir: str, *args, **kwargs):
+            call = partial(func, project_dir, *args, **kwargs)
+            loop = asyncio.get_running_loop()
+            if not writes:
+                return await loop.run_in_executor(_executor(), call)
+            async with _write_lock(project_dir):
+                return await loop.run_in_executor(_executor(), call)
+
+        return wrapper
+
+    return decorate
+
+
 # ---------------------------------------------------------------------------
 # Tool 1: init
 # ---------------------------------------------------------------------------
 @mcp.tool()
-async def council_memory_init(project_dir: str) -> str:
+@_offload(writes=True)
+def council_memory_init(project_dir: str) -> str:
     """Create .council/ directory structure in a project."""
     council = _council_dir(project_dir)
 
@@ -48,7 +115,7 @@ async def council_memory_init(project_dir: str) -> str:
 
     # Initial Tier 0 index
     index = {
-        "version": 1,
+        "version": 2,
         "consultation_count": 0,
         "last_updated": datetime.now(timezone.utc).isoformat(),
         "compaction_watermark": "",
@@ -93,22 +160,53 @@ async def council_memory_init(project_dir: str) -> str:
 # Tool 2: load
 # ---------------------------------------------------------------------------
 @mcp.tool()
-async def council_memory_load(
-    project_dir: str, goal: str = "", max_tokens: int = 4000
+@_offload()
+def council_memory_load(
+    project_dir: str,
+    goal: str = "",
+    max_tokens: int = 4000,
+    ranking: str = "overlap",
+    lenses: list[str] | None = None,
+    packing: str = "greedy",
 ) -> str:
-    """Load optimized memory for teammate injection. Goal-filtered, budget-aware."""
+    """Load optimized memory for teammate injection. Goal-filtered, budget-aware.
+
+    ranking: "overlap" (default word-overlap scoring) or "bm25" (rarity-weighted).
+    lenses: optional teammate views, each "name" or "name:budget" (e.g.
+    ["strategist-alpha:2000", "critic", "security-auditor:1500"]). Returns one
+    packed view per lens from a single retrieval; budget defaults to max_tokens.
+    packing: "greedy" (default) or "optimal" (knapsack over headline, summary and
+    full text; time-bounded, falls back to greedy).
+    """
     error = _check_init(project_dir)
     if error:
         return error
 
-    return build_memory_response(project_dir, goal=goal, max_tokens=max_tokens)
+    if ranking not in RANKING_MODES:
+        return f"Invalid ranking: {ranking}. Must be one of: {', '.join(RANKING_MODES)}."
+    if packing not in PACKING_MODES:
+        return f"Invalid packing: {packing}. Must be one of: {', '.join(PACKING_MODES)}."
+
+    if not lenses:
+        return build_memory_response(project_dir, goal=goal, max_tokens=max_tokens, ranking=ranking, packing=packing)
+
+    try:
+        resolved = [MemoryLens.resolve(spec, max_tokens) for spec in lenses]
+        views = build_memory_views(project_dir, goal=goal, lenses=resolved, ranking=ranking, packing=packing)
+    except ValueError as e:
+        return str(e)
+    return "\n\n".join(
+        f"=== MEMORY VIEW: {lens.name} (budget: {lens.budget} tokens) ===\n{views[lens.name]}"
+        for lens in resolved
+    )
 
 
 # ---------------------------------------------------------------------------
 # Tool 3: record
 # ---------------------------------------------------------------------------
 @mcp.tool()
-async def council_memory_record(
+@_offload(writes=True)
+def council_memory_record(
     project_dir: str,
     goal: str,
     strategist_summary: str,
@@ -125,14 +223,9 @@ async def council_memory_record(
     if error:
         return error
 
-    # Generate session ID
-    index = load_index(project_dir)
-    count = index.get("consultation_count", 0) + 1
-    session_id = f"S-{count:03d}"
-
     return record_consultation(
         project_dir=project_dir,
-        session_id=session_id,
+        session_id=None,
         goal=goal,
         strategist_summary=strategist_summary,
         critic_summary=critic_summary,
@@ -148,15 +241,24 @@ async def council_memory_record(
 # ---------------------------------------------------------------------------
 # Tool 4: status
 # ---------------------------------------------------------------------------
+STATUS_TOPIC_DECISIONS = 3  # full decision records the status view shows for a topic
+
+
 @mcp.tool()
-async def council_memory_status(project_dir: str) -> str:
-    """Council state: recent decisions, memory health, compaction recommendations."""
+@_offload()
+def council_memory_status(project_dir: str, topic: str = "") -> str:
+    """Council state: recent decisions, memory health, compaction recommendations.
+
+    topic: also show the full records of the latest decisions on this topic.
+    """
     error = _check_init(project_dir)
     if error:
         return error
 
-    index = load_index(project_dir)
-    health = get_memory_health(project_dir)
+    with MemoryLock(project_dir):
+        index = get_backend(project_dir).load_index()
+        health = get_memory_health(project_dir)
+        decisions = fetch_decisions(project_dir, topic=topic, limit=STATUS_TOPIC_DECISIONS) if topic else []
     parts = ["# Council Status\n"]
 
     # Summary
@@ -171,6 +273,12 @@ async def council_memory_status(project_dir: str) -> str:
             parts.append(f"- **{d.get('session_id', '?')}** ({d.get('date', '?')}): {d.get('goal_oneliner', '')} -> {d.get('decision_oneliner', '')}")
         parts.append("")
 
+    if topic:
+        parts.append(f"## Decisions on {topic}\n")
+        parts.extend(_format_decision(d) for d in decisions)
+        if not decisions:
+            parts.append("No recorded decisions on this topic.\n")
+
     # Pinned
     pinned = index.get("pinned", [])
     if pinned:
@@ -185,7 +293,7 @@ async def council_memory_status(project_dir: str) -> str:
         status = "COMPACT RECOMMENDED" if info["needs_compaction"] else "OK"
         parts.append(
             f"- **{role}**: {info['active_entries']} entries, ~{info['active_tokens']} tokens, "
-            f"log={info['log_lines']} lines — {status}"
+            f"log={info['log_lines']} lines, generation {info['generation']} — {status}"
         )
 
     if health.get("needs_compaction"):
@@ -200,7 +308,8 @@ async def council_memory_status(project_dir: str) -> str:
 # Tool 5: reset
 # ---------------------------------------------------------------------------
 @mcp.tool()
-async def council_memory_reset(project_dir: str, full: bool = False) -> str:
+@_offload(writes=True)
+def council_memory_reset(project_dir: str, full: bool = False) -> str:
     """Clear session data. full=True also clears all memory."""
     error = _check_init(project_dir)
     if error:
@@ -210,44 +319,52 @@ async def council_memory_reset(project_dir: str, full: bool = False) -> str:
     memory = council / "memory"
 
     if full:
-        # Remove and recreate everything
-        if memory.exists():
-            shutil.rmtree(memory)
-        memory.mkdir(parents=True, exist_ok=True)
-
-        # Re-create initial files
-        index = {
-            "version": 1,
-            "consultation_count": 0,
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "compaction_watermark": "",
-            "recent_decisions": [],
-            "pinned": [],
-            "topic_index": {},
-            "original_prompt": "",
-        }
-        (memory / "index.json").write_text(json.dumps(index, indent=2), encoding="utf-8")
-        (memory / "decisions.md").write_text("# Hub Decision Record\n", encoding="utf-8")
-        (memory / "lessons.jsonl").write_text("", encoding="utf-8")
-        for role in ["strategist", "critic"]:
-            (memory / f"{role}-log.md").write_text(f"# {role.title()} Memory Log\n", encoding="utf-8")
+        # Remove and recreate everything, under the writer lock so no record lands in a
+        # half-deleted tree. The lock file itself stays: other processes lock its inode.
+        with MemoryLock(project_dir, exclusive=True):
+            memory.mkdir(parents=True, exist_ok=True)
+            # Generations keep counting across resets, so a patch built before it is rejected.
+            old = get_backend(project_dir).load_index().get("generations") or {}
+            for path in memory.iterdir():
+                if path.name == ".lock":
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+
+            # Re-create initial files
+            index = {
+                "version": 2,
+                "consultation_count": 0,
+                "last_updated": datetime.now(timezone.utc).isoformat(),
+                "compaction_watermark": "",
+                "recent_decisions": [],
+                "pinned": [],
+                "topic_index": {},
+                "original_prompt": "",
+                "generations": {role: old.get(role, 0) + 1 for role in ["strategist", "critic", "hub"]},
+            }
+            (memory / "index.json").write_text(json.dumps(index, indent=2), encoding="utf-8")
+            (memory / "decisions.md").write_text("# Hub Decision Record\n", encoding="utf-8")
+            (memory / "lessons.jsonl").write_text("", encoding="utf-8")
+            for role in ["strategist", "critic"]:
+                (memory / f"{role}-log.md").write_text(f"# {role.title()} Memory Log\n", encoding="utf-8")
+        invalidate_memory_cache(project_dir)
 
         return "Full reset complete. All memory cleared."
 
-    # Soft reset: clear active memory entries but keep archives
-    for role in ["strategist", "critic", "hub"]:
-        active_path = memory / f"{role}-active.json"
-        if active_path.exists():
-            active_path.write_text(
-                json.dumps({"version": 1, "role": role, "entries": []}, indent=2),
-                encoding="utf-8",
-            )
-
-    # Reset index counters but keep topic_index
-    index = load_index(project_dir)
-    index["recent_decisions"] = []
-    index["pinned"] = []
-    save_index(project_dir, index)
+    # Soft reset: clear active memory entries but keep archives,
+    # and reset index counters but keep topic_index
+    with MemoryLock(project_dir, exclusive=True):
+        backend = get_backend(project_dir)
+        index = dict(backend.load_index())
+        index["recent_decisions"] = []
+        index["pinned"] = []
+        index["generations"] = {
+            role: (index.get("generations") or {}).get(role, 0) + 1 for role in ["strategist", "critic", "hub"]
+        }
+        backend.replace_active({role: [] for role in ["strategist", "critic", "hub"]}, index)
 
     return "Session reset. Active memory cleared. Archives preserved."
 
@@ -256,7 +373,8 @@ async def council_memory_reset(project_dir: str, full: bool = False) -> str:
 # Tool 6: compact
 # ---------------------------------------------------------------------------
 @mcp.tool()
-async def council_memory_compact(
+@_offload(writes=True)
+def council_memory_compact(
     project_dir: str, role: str, compacted_entries: str
 ) -> str:
     """Write compacted active memory for a role. Called by curator."""
@@ -274,17 +392,310 @@ async def council_memory_compact(
     except json.JSONDecodeError as e:
         return f"Invalid JSON in compacted_entries: {e}"
 
-    active = {"version": 1, "role": role, "entries": entries}
-    save_active(project_dir, role, active)
-
-    # Update compaction watermark in index
-    index = load_index(project_dir)
-    index["compaction_watermark"] = f"S-{index.get('consultation_count', 0):03d}"
-    save_index(project_dir, index)
+    # Active file, retrieval index and compaction watermark in one transaction
+    apply_compaction(project_dir, role, entries)
 
     return f"Compacted {role} active memory: {len(entries)} entries written."
 
 
+# ---------------------------------------------------------------------------
+# Tool 7: verify
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload(writes=True)
+def council_memory_verify(project_dir: str) -> str:
+    """Recompute archive counters and sidecar indexes from disk. Reports drift."""
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    report = verify_memory(project_dir)
+    counts = report["counts"]
+    parts = [
+        "Rebuilt archive counters, lessons index and retrieval index.",
+        f"- decisions: {counts['decisions.md']}, lessons: {counts['lessons.jsonl']}, "
+        f"log lines: strategist={counts['strategist-log.md']} critic={counts['critic-log.md']}",
+    ]
+    if report["archive"]:
+        for name, (stored, actual) in report["archive"].items():
+            parts.append(f"- corrected {name}: {stored} -> {actual}")
+    else:
+        parts.append("- stored counters matched the files on disk")
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Tool 8: migrate
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload(writes=True)
+def council_memory_migrate(project_dir: str) -> str:
+    """Move memory into a SQLite database (.council/memory/council.db). One-shot."""
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    try:
+        report = migrate_to_sqlite(project_dir)
+    except (ValueError, RuntimeError) as e:
+        return f"Migration not performed: {e}"
+
+    entries = report["entries"]
+    archive = report["archive"]
+    return (
+        "Migrated memory to .council/memory/council.db (flat files kept as a backup).\n"
+        f"- active entries: strategist={entries['strategist']} critic={entries['critic']} hub={entries['hub']}\n"
+        f"- archive: {archive['decisions.md']} decisions, {archive['lessons.jsonl']} lessons"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tool 9: load_batch
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload()
+def council_memory_load_batch(
+    project_dir: str,
+    goals: list[str],
+    max_tokens: int = 4000,
+    ranking: str = "overlap",
+    dedupe: bool = False,
+    packing: str = "greedy",
+) -> str:
+    """Load one memory block per goal from a single retrieval (e.g. build pipeline phases).
+
+    dedupe: leave entries already shown for an earlier goal out of later blocks.
+    packing: "greedy" (default) or "optimal", as for council_memory_load.
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    if ranking not in RANKING_MODES:
+        return f"Invalid ranking: {ranking}. Must be one of: {', '.join(RANKING_MODES)}."
+    if packing not in PACKING_MODES:
+        return f"Invalid packing: {packing}. Must be one of: {', '.join(PACKING_MODES)}."
+    if not goals:
+        return "goals must contain at least one goal."
+
+    blocks = build_memory_batch(
+        project_dir, goals, max_tokens=max_tokens, ranking=ranking, dedupe=dedupe, packing=packing
+    )
+    return "\n\n".join(
+        f"=== MEMORY BLOCK {n}/{len(goals)}: {goal} ===\n{block}"
+        for n, (goal, block) in enumerate(zip(goals, blocks), start=1)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tool 10: autocompact
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload(writes=True)
+def council_memory_autocompact(project_dir: str, role: str = "", dry_run: bool = False) -> str:
+    """Compact active memory without the curator: merge near-duplicates, apply detail-level rules.
+
+    role: one of strategist, critic or hub (default: all three).
+    dry_run: report what would change without writing.
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    if role and role not in ("strategist", "critic", "hub"):
+        return f"Invalid role: {role}. Must be strategist, critic, or hub."
+
+    report = auto_compact(project_dir, [role] if role else None, dry_run=dry_run)
+    parts = ["Auto-compaction (dry run, nothing written):" if dry_run else "Auto-compacted active memory:"]
+    over = []
+    for name, info in report.items():
+        parts.append(
+            f"- **{name}**: {info['before']} -> {info['after']} entries, "
+            f"{len(info['downgraded'])} detail levels lowered"
+        )
+        for kept, folded in info["merged"].items():
+            parts.append(f"  - {kept} absorbed {', '.join(folded)}")
+        if info["after"] > COMPACT_TARGET:
+            over.append(name)
+    if over:
+        parts.append(
+            f"\nStill over {COMPACT_TARGET} entries: {', '.join(over)}. "
+            "Run the curator (`/council:maintain`) for semantic merges."
+        )
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Tool 11: patch
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload(writes=True)
+def council_memory_patch(project_dir: str, role: str, operations: str, generation: int) -> str:
+    """Edit a role's active memory in place with a JSON array of operations. Called by curator.
+
+    Operations: {"op": "delete", "ids": [...]}, {"op": "merge", "ids": [...],
+    "entry": {"text": ..., ...}}, {"op": "update", "id": ..., "importance": 5,
+    "detail_level": 2, ...} and {"op": "pin" | "unpin", "id": ...}. Editable
+    fields: text, headline, topics, importance, detail_level.
+    generation: the role's generation from council_memory_status (or the last
+    patch). All operations apply together, or none do if the role changed since.
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    if role not in ("strategist", "critic", "hub"):
+        return f"Invalid role: {role}. Must be strategist, critic, or hub."
+
+    try:
+        ops = json.loads(operations)
+        if not isinstance(ops, list):
+            return "operations must be a JSON array of operation objects."
+    except json.JSONDecodeError as e:
+        return f"Invalid JSON in operations: {e}"
+
+    try:
+        new_generation = patch_entries(project_dir, role, ops, generation)
+    except ValueError as e:
+        return f"Patch not applied: {e}"
+    return f"Patched {role} active memory: {len(ops)} operations applied. Generation is now {new_generation}."
+
+
+# ---------------------------------------------------------------------------
+# Tool 12: search
+# ---------------------------------------------------------------------------
+@mcp.tool()
+@_offload()
+def council_memory_search(
+    project_dir: str,
+    query: str = "",
+    topic: str = "",
+    kinds: list[str] | None = None,
+    session_from: str = "",
+    session_to: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    limit: int = 10,
+    cursor: str = "",
+) -> str:
+    """Search the archive (lessons, decisions, role logs) and return one page of ranked snippets.
+
+    query: ranks by relevance (BM25); without it, newest first.
+    topic: a topic index name (e.g. "database").
+    kinds: any of "lesson", "decision", "log" (default: all).
+    session_from/session_to, date_from/date_to (YYYY-MM-DD): inclusive bounds.
+    limit: hits per page (max 50). cursor: the "next cursor" of the previous page.
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    sessions = (session_from, session_to) if session_from or session_to else None
+    dates = (date_from, date_to) if date_from or date_to else None
+    try:
+        page = search_archive(
+            project_dir, query=query, topic=topic, kinds=kinds, sessions=sessions, dates=dates, limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return f"Search not run: {e}"
+
+    if not page["hits"]:
+        return "No archive records match."
+    first = int(cursor.partition(".")[0]) + 1 if cursor else 1
+    parts = [f"## Archive search: {first}-{first + len(page['hits']) - 1} of {page['total']}\n"]
+    for hit in page["hits"]:
+        score = f" score={hit['score']}" if query else ""
+        parts.append(f"- [{hit['kind']}] {hit['session']} {hit['date']} ({hit['source']}){score}: {hit['snippet']}")
+    if page["next_cursor"]:
+        parts.append(f"\nNext cursor: {page['next_cursor']}")
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Tool 13: decisions
+# ---------------------------------------------------------------------------
+
+def _format_decision(decision: dict) -> str:
+    topics = f" [{', '.join(decision['topics'])}]" if decision["topics"] else ""
+    return f"### {decision['session']} ({decision['date']}){topics}\n\n{decision['text']}\n"
+
+
+@mcp.tool()
+@_offload()
+def council_memory_decisions(
+    project_dir: str, sessions: list[str] | None = None, topic: str = "", limit: int = 20
+) -> str:
+    """Fetch full decision records by session id (e.g. ["S-004"]) or for a topic, without reading decisions.md.
+
+    topic: a topic index name; with sessions, only those also listed under it.
+    limit: the most recent sessions to return (default 20).
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    try:
+        decisions = fetch_decisions(project_dir, sessions=sessions, topic=topic, limit=limit)
+    except ValueError as e:
+        return f"Decisions not fetched: {e}"
+    if not decisions:
+        return "No recorded decisions match."
+    return "\n".join([f"## Decisions ({len(decisions)})\n", *(_format_decision(d) for d in decisions)])
+
+
+# ---------------------------------------------------------------------------
+# Tool 14: candidates
+# ---------------------------------------------------------------------------
+def _candidate_heading(group: dict) -> str:
+    if group["kind"] == "duplicates":
+        return f"near-duplicates, keep {group['keep']}"
+    if group["kind"] == "superseded":
+        return f"superseded by {group['decision']} on {group['topic']}"
+    return "stale, low importance"
+
+
+@mcp.tool()
+@_offload()
+def council_memory_candidates(project_dir: str, role: str, limit: int = 20) -> str:
+    """Candidate groups for compacting a role: near-duplicates, entries superseded by a later decision, stale ones.
+
+    Called by curator before council_memory_patch, instead of reading every entry.
+    Each group lists its members' id, score (similarity to the kept entry,
+    overlap with the decision, or days stale), importance and headline, and the
+    tokens removing them would save. limit: groups to return, largest savings first.
+    """
+    error = _check_init(project_dir)
+    if error:
+        return error
+
+    try:
+        report = compaction_candidates(project_dir, role, limit=limit)
+    except ValueError as e:
+        return str(e)
+
+    parts = [
+        f"## Compaction candidates: {role} (generation {report['generation']}, {report['entries']} entries, "
+        f"~{report['tokens']} tokens)\n"
+    ]
+    if not report["groups"]:
+        parts.append("No candidate groups: nothing looks duplicated, superseded or stale.")
+    for n, group in enumerate(report["groups"], start=1):
+        parts.append(f"### {n}. {_candidate_heading(group)} — saves ~{group['tokens_saved']} tokens\n")
+        if group["kind"] == "superseded":
+            parts.append(f"Decision: {group['summary']}")
+        for member in group["entries"]:
+            if group["kind"] == "stale":
+                score = f"{member['score']}d"
+            elif group["kind"] == "duplicates" and member["id"] == group["keep"]:
+                score = "keep"
+            else:
+                score = f"{member['score']:.2f}"
+            parts.append(f"- {member['id']} ({score}, imp {member['importance']}): {member['headline']}")
+        parts.append("")
+    return "\n".join(parts).rstrip()
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
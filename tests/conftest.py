@@ -1,18 +1,44 @@
 """Shared fixtures for council memory tests."""
 
 import json
+import sys
 import tempfile
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 import pytest
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import record_consultation
+
 
 def _iso(days_ago: int = 0) -> str:
     dt = datetime.now(timezone.utc) - timedelta(days=days_ago)
     return dt.isoformat()
 
 
+def add_consultation(
+    project_dir: str, n: int | str = 1, *, roles: tuple[str, ...] = (), numbered: bool = False, **fields
+) -> str:
+    """Record consultation ``n`` with placeholder summaries (goal "consultation {n}", decision "d").
+
+    ``numbered`` names the session S-{n:03d} instead of allocating the next id.
+    Each of ``roles`` gets the lesson "<Role> lesson {n}."; other lessons, and
+    any other record_consultation argument, come through ``fields``.
+    """
+    kwargs = {
+        "session_id": f"S-{n:03d}" if numbered else None,
+        "goal": f"consultation {n}",
+        "strategist_summary": "s",
+        "critic_summary": "c",
+        "decision": "d",
+        **{f"{role}_lesson": f"{role.capitalize()} lesson {n}." for role in roles},
+        **fields,
+    }
+    return record_consultation(project_dir=project_dir, **kwargs)
+
+
 @pytest.fixture
 def tmp_project(tmp_path):
     """Creates a temp project with .council/memory/ structure."""
@@ -0,0 +1,197 @@
+"""Tests for council_memory_search: filtered, ranked, cursor-paginated archive search."""
+
+import asyncio
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory
+from memory import (
+    _parse_archive,
+    close_archive_segment,
+    fts5_available,
+    invalidate_memory_cache,
+    migrate_to_sqlite,
+    record_consultation,
+    search_archive,
+)
+from src import server
+
+GOALS = [
+    ("Pick a database for billing", "Use PostgreSQL with logical replication.", "Replica lag hid a billing bug."),
+    ("Secure the login flow", "Rotate JWT signing keys monthly.", "Token expiry was never tested."),
+    ("Speed up the billing reports", "Cache report queries in Redis.", "Cache invalidation broke billing totals."),
+    ("Deploy the API on Kubernetes", "Use readiness probes on every pod.", "Probes that hit the database flapped."),
+]
+
+
+@pytest.fixture
+def archive_project(tmp_project):
+    for goal, strategist, critic in GOALS:
+        record_consultation(
+            project_dir=tmp_project,
+            session_id=None,
+            goal=goal,
+            strategist_summary="s",
+            critic_summary="c",
+            decision=f"Decided: {goal.lower()}.",
+            strategist_lesson=strategist,
+            critic_lesson=critic,
+        )
+    return tmp_project
+
+
+def _all_pages(project_dir: str, **filters) -> list[dict]:
+    hits, cursor = [], ""
+    while True:
+        page = search_archive(project_dir, cursor=cursor, **filters)
+        hits.extend(page["hits"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return hits
+
+
+class TestParseArchive:
+    def test_sections_split_on_their_headers(self):
+        decisions = (
+            "# Hub Decision Record\n"
+            "\n## 2026-03-01 — Pick a queue (extended) (session S-004)\n\n- **Goal:** Pick a queue\n\n"
+            "\n## 2026-03-02 — Next (session S-005)\n\n- **Decision:** Kafka\n"
+        )
+        records = _parse_archive("decisions.md", decisions)
+        assert [(r.kind, r.session, r.date, r.source, r.text) for r in records] == [
+            ("decision", "S-004", "2026-03-01", "hub", "- **Goal:** Pick a queue"),
+            ("decision", "S-005", "2026-03-02", "hub", "- **Decision:** Kafka"),
+        ]
+        log = "# Critic Memory Log\n\n### Session S-002 (2026-02-01)\n\nNo rollback plan.\n"
+        (record,) = _parse_archive("critic-log.md", log)
+        assert (record.kind, record.session, record.source) == ("log", "S-002", "critic")
+        assert record.text == "No rollback plan."
+
+
+class TestSearchArchive:
+    def test_query_ranks_matching_records(self, archive_project):
+        page = search_archive(archive_project, query="billing cache", kinds=["lesson", "decision"])
+        assert page["total"] == 5
+        top = page["hits"][0]
+        assert (top["kind"], top["session"]) == ("lesson", "S-003")
+        assert top["snippet"] == "Cache invalidation broke billing totals."
+        assert all(h["score"] > 0 for h in page["hits"])
+
+    def test_no_query_lists_newest_first(self, archive_project):
+        page = search_archive(archive_project, kinds=["decision"])
+        assert [h["session"] for h in page["hits"]] == ["S-004", "S-003", "S-002", "S-001"]
+
+    def test_session_and_date_ranges(self, archive_project):
+        hits = _all_pages(archive_project, sessions=("S-002", "S-003"))
+        # Per session: one decision, two lessons and two log sections.
+        assert len(hits) == 10
+        assert {h["session"] for h in hits} == {"S-002", "S-003"}
+        assert search_archive(archive_project, dates=("2999-01-01", ""))["total"] == 0
+
+    def test_topic_filter(self, archive_project):
+        # S-001 is listed under the topic, an S-004 lesson mentions the database and
+        # S-003's billing lessons match "billing", a keyword the topic learned from S-001.
+        hits = _all_pages(archive_project, topic="database")
+        assert {h["session"] for h in hits} == {"S-001", "S-003", "S-004"}
+        assert [h["snippet"] for h in hits if h["session"] == "S-004"] == ["Probes that hit the database flapped."] * 2
+
+    def test_pages_cover_every_hit_once(self, archive_project):
+        everything = search_archive(archive_project, limit=50)
+        paged = _all_pages(archive_project, limit=3)
+        assert everything["total"] == 20
+        assert paged == everything["hits"]
+
+    def test_cursor_is_tied_to_the_search_and_archive(self, archive_project):
+        cursor = search_archive(archive_project, limit=3)["next_cursor"]
+        with pytest.raises(ValueError, match="cursor"):
+            search_archive(archive_project, query="billing", limit=3, cursor=cursor)
+        record_consultation(
+            project_dir=archive_project, session_id=None, goal="g", strategist_summary="s", critic_summary="c",
+            decision="d",
+        )
+        with pytest.raises(ValueError, match="archive has changed"):
+            search_archive(archive_project, limit=3, cursor=cursor)
+
+    def test_corrupt_lesson_lines_are_skipped(self, archive_project):
+        before = _all_pages(archive_project, query="billing")
+        with open(Path(archive_project) / ".council" / "memory" / "lessons.jsonl", "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+        assert _all_pages(archive_project, query="billing") == before
+
+    def test_closed_segments_are_searched(self, archive_project):
+        before = _all_pages(archive_project, query="billing")
+        close_archive_segment(archive_project)
+        invalidate_memory_cache()
+        assert _all_pages(archive_project, query="billing") == before
+
+    @pytest.mark.skipif(not fts5_available(), reason="sqlite3 built without FTS5")
+    def test_sqlite_backend_matches(self, archive_project):
+        before = _all_pages(archive_project, query="billing")
+        migrate_to_sqlite(archive_project)
+        memory_dir = Path(archive_project) / ".council" / "memory"
+        for path in memory_dir.iterdir():
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.name != "council.db":
+                path.unlink()
+        invalidate_memory_cache()
+        assert _all_pages(archive_project, query="billing") == before
+
+
+class TestArchiveCache:
+    def test_warm_topic_search_tags_nothing_again(self, archive_project, monkeypatch):
+        first = _all_pages(archive_project, topic="database")
+        calls = []
+        original = memory.extract_topics
+        monkeypatch.setattr(memory, "extract_topics", lambda *args: calls.append(args) or original(*args))
+        assert _all_pages(archive_project, topic="database") == first
+        assert calls == []
+
+    def test_a_record_parses_only_what_it_appended(self, archive_project, monkeypatch):
+        search_archive(archive_project, query="billing")
+        record_consultation(
+            project_dir=archive_project, session_id=None, goal="Plan the billing migration", strategist_summary="s",
+            critic_summary="c", decision="Migrate billing in batches.", strategist_lesson="Batch the billing move.",
+        )
+        parsed = []
+        original = memory._parse_archive
+        monkeypatch.setattr(memory, "_parse_archive", lambda name, text: parsed.append(text) or original(name, text))
+        page = search_archive(archive_project, query="billing")
+        assert parsed and all("S-005" in text and "S-004" not in text for text in parsed)
+        monkeypatch.undo()
+        invalidate_memory_cache()
+        assert search_archive(archive_project, query="billing") == page
+
+    def test_session_range_skips_closed_segments(self, archive_project, monkeypatch):
+        close_archive_segment(archive_project)
+        record_consultation(
+            project_dir=archive_project, session_id=None, goal="Plan the billing migration", strategist_summary="s",
+            critic_summary="c", decision="Migrate billing in batches.", strategist_lesson="Batch the billing move.",
+        )
+        invalidate_memory_cache()
+        opened = []
+        for name in ("_archive_file", "_session_range_file"):
+            original = getattr(memory, name)
+            monkeypatch.setattr(memory, name, lambda *args, original=original: opened.append(args) or original(*args))
+        hits = _all_pages(archive_project, sessions=("S-005", ""))
+        assert {h["session"] for h in hits} == {"S-005"}
+        assert opened and not any("archive/" in str(args) for args in opened)
+
+
+class TestSearchTool:
+    def test_formats_a_page(self, archive_project):
+        output = asyncio.run(server.council_memory_search(archive_project, kinds=["decision"], limit=2))
+        lines = output.splitlines()
+        assert lines[0] == "## Archive search: 1-2 of 4"
+        assert lines[2].startswith("- [decision] S-004 ")
+        assert lines[-1].startswith("Next cursor: 2.")
+
+    def test_reports_bad_cursor(self, archive_project):
+        output = asyncio.run(server.council_memory_search(archive_project, cursor="bogus"))
+        assert output.startswith("Search not run: cursor")
@@ -0,0 +1,198 @@
+"""Tests for the monthly, gzip-compressed archive segments and their manifest."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    build_memory_response,
+    close_archive_segment,
+    fts5_available,
+    get_backend,
+    get_memory_health,
+    invalidate_memory_cache,
+    load_segment_manifest,
+    migrate_to_sqlite,
+    read_session_lessons,
+    recover_memory,
+    verify_memory,
+)
+from tests.conftest import add_consultation
+
+
+def _memory_dir(project_dir: str) -> Path:
+    return Path(project_dir) / ".council" / "memory"
+
+
+def _write_old_lessons(project_dir: str, n: int) -> list[dict]:
+    """Lessons of sessions S-001..S-003 recorded in January, before any manifest existed."""
+    lessons = [
+        {
+            "ts": "2026-01-15T00:00:00+00:00",
+            "lesson": f"PostgreSQL schema lesson {i}",
+            "source": "critic",
+            "session": f"S-{i % 3 + 1:03d}",
+        }
+        for i in range(n)
+    ]
+    with open(_memory_dir(project_dir) / "lessons.jsonl", "w", encoding="utf-8") as f:
+        for lesson in lessons:
+            f.write(json.dumps(lesson) + "\n")
+    return lessons
+
+
+def _all_lessons(project_dir: str) -> list[dict]:
+    """Every archived lesson of sessions S-001..S-009, closed segments first."""
+    return read_session_lessons(project_dir, {f"S-{n:03d}" for n in range(1, 10)}, limit=1000)
+
+
+class TestMonthlyRoll:
+    def test_first_record_of_a_new_month_closes_the_segment(self, tmp_project):
+        old = _write_old_lessons(tmp_project, 12)
+        add_consultation(tmp_project, 4, roles=("strategist", "critic"), numbered=True)
+
+        segment = load_segment_manifest(tmp_project)["segments"][0]
+        assert segment["label"] == "2026-01"
+        assert segment["sessions"] == ["S-001", "S-003"]
+        info = segment["files"]["lessons.jsonl"]
+        assert info["count"] == 12
+        assert info["stored"] < info["bytes"]
+        packed = _memory_dir(tmp_project) / info["path"]
+        assert [json.loads(line) for line in gzip.decompress(packed.read_bytes()).splitlines()] == old
+
+        open_lessons = (_memory_dir(tmp_project) / "lessons.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["session"] for line in open_lessons] == ["S-004", "S-004"]
+        assert get_backend(tmp_project).archive_counts({})["lessons.jsonl"] == 14
+        assert _all_lessons(tmp_project)[:12] == old
+
+    def test_same_month_records_stay_open(self, tmp_project):
+        for n in range(1, 4):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        manifest = load_segment_manifest(tmp_project)
+        assert manifest["segments"] == []
+        assert manifest["open_since"]
+
+    def test_counts_survive_forced_closes(self, tmp_project):
+        for n in range(1, 4):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        before = get_backend(tmp_project).archive_counts({})
+        lessons = _all_lessons(tmp_project)
+
+        first = close_archive_segment(tmp_project)
+        add_consultation(tmp_project, 4, roles=("strategist", "critic"), numbered=True)
+        second = close_archive_segment(tmp_project)
+        assert second["label"] == f"{first['label']}-2"
+        assert close_archive_segment(tmp_project) is None
+
+        after = get_backend(tmp_project).archive_counts({})
+        assert after["decisions.md"] == before["decisions.md"] + 1
+        assert after["lessons.jsonl"] == before["lessons.jsonl"] + 2
+        assert get_memory_health(tmp_project)["roles"]["critic"]["log_lines"] == after["critic-log.md"] > 0
+        assert _all_lessons(tmp_project)[:6] == lessons
+        assert verify_memory(tmp_project)["archive"] == {}
+
+
+class TestSegmentReads:
+    def test_session_lessons_across_segments(self, tmp_project):
+        for n in range(1, 4):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        close_archive_segment(tmp_project)
+        add_consultation(tmp_project, 4, roles=("strategist", "critic"), numbered=True)
+        wanted = {"S-002", "S-004"}
+        lessons = read_session_lessons(tmp_project, wanted)
+        assert [l["lesson"] for l in lessons] == [
+            "Strategist lesson 2.", "Critic lesson 2.", "Strategist lesson 4.", "Critic lesson 4."
+        ]
+        assert read_session_lessons(tmp_project, wanted, limit=3) == lessons[1:]
+
+    def test_segments_outside_the_session_range_are_not_opened(self, tmp_project):
+        for n in range(1, 3):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        close_archive_segment(tmp_project)
+        for n in range(3, 5):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        close_archive_segment(tmp_project)
+
+        memory._segment_member.cache_clear()
+        assert [l["session"] for l in read_session_lessons(tmp_project, {"S-004"})] == ["S-004", "S-004"]
+        assert memory._segment_member.cache_info().currsize == 1
+        assert read_session_lessons(tmp_project, {"S-009"}) == []
+        assert memory._segment_member.cache_info().currsize == 1
+
+    def test_only_members_holding_the_sessions_are_inflated(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(memory, "SEGMENT_MEMBER", 512)
+        lessons = _write_old_lessons(tmp_project, 300)
+        close_archive_segment(tmp_project)
+        segment = load_segment_manifest(tmp_project)["segments"][0]
+        members = json.loads((_memory_dir(tmp_project) / segment["files"]["lessons.jsonl"]["index"]).read_text())
+        assert len(members["members"]) > 10
+
+        memory._segment_lessons.cache_clear()
+        memory._segment_member.cache_clear()
+        wanted = [l for l in lessons if l["session"] == "S-002"]
+        assert read_session_lessons(tmp_project, {"S-002"}, limit=5) == wanted[-5:]
+        assert memory._segment_member.cache_info().currsize <= 3
+        assert memory._segment_lessons.cache_info().currsize == 0
+        assert read_session_lessons(tmp_project, {"S-002"}) == wanted
+
+    def test_segment_without_index_is_parsed_whole(self, tmp_project):
+        lessons = _write_old_lessons(tmp_project, 12)
+        close_archive_segment(tmp_project)
+        manifest_path = _memory_dir(tmp_project) / "archive" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        del manifest["segments"][0]["files"]["lessons.jsonl"]["index"]
+        manifest_path.write_text(json.dumps(manifest))
+        assert read_session_lessons(tmp_project, {"S-001"}, limit=3) == [
+            l for l in lessons if l["session"] == "S-001"
+        ][-3:]
+
+    def test_closed_lessons_reach_the_memory_output(self, tmp_project_with_lessons):
+        close_archive_segment(tmp_project_with_lessons)
+        invalidate_memory_cache()
+        output = build_memory_response(tmp_project_with_lessons, goal="database schema migration", max_tokens=4000)
+        assert "### Archived Lessons" in output
+        assert "PostgreSQL" in output
+        assert "25 lessons archived" in output
+
+
+class TestSegmentDurability:
+    def test_crash_during_close_rolls_back(self, tmp_project, monkeypatch):
+        for n in range(1, 3):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        lessons_path = _memory_dir(tmp_project) / "lessons.jsonl"
+        before = lessons_path.read_bytes()
+        original = memory._write_durable
+
+        def crash_on_manifest(path, raw):
+            if path.name == "manifest.json.pending":
+                raise OSError("simulated crash")
+            return original(path, raw)
+
+        monkeypatch.setattr(memory, "_write_durable", crash_on_manifest)
+        with pytest.raises(OSError):
+            close_archive_segment(tmp_project)
+        monkeypatch.undo()
+
+        assert "rolled back" in recover_memory(tmp_project)
+        assert lessons_path.read_bytes() == before
+        assert not list((_memory_dir(tmp_project) / "archive").glob("*.pending"))
+        assert load_segment_manifest(tmp_project)["segments"] == []
+
+    @pytest.mark.skipif(not fts5_available(), reason="sqlite3 built without FTS5")
+    def test_migration_includes_closed_segments(self, tmp_project):
+        _write_old_lessons(tmp_project, 6)
+        for n in range(4, 6):
+            add_consultation(tmp_project, n, roles=("strategist", "critic"), numbered=True)
+        counts = get_backend(tmp_project).archive_counts({})
+        lessons = _all_lessons(tmp_project)
+
+        assert migrate_to_sqlite(tmp_project)["archive"] == counts
+        invalidate_memory_cache()
+        backend = get_backend(tmp_project)
+        assert [l.to_dict() for l in backend.session_lessons({"S-001", "S-002", "S-003", "S-004", "S-005"})] == lessons
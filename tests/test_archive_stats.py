@@ -0,0 +1,83 @@
+"""Tests for the maintained archive counters in index.json."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    ARCHIVE_FILES,
+    ROLES,
+    _recount_archive_file,
+    build_memory_response,
+    current_archive_stats,
+    get_memory_health,
+    load_index,
+    save_index,
+    verify_memory,
+)
+from tests.conftest import add_consultation
+
+
+class TestMaintainedCounters:
+    def test_counters_match_recount(self, tmp_project):
+        for n in range(1, 6):
+            add_consultation(
+                tmp_project, n, roles=ROLES, numbered=True, critic_lesson=f"Critic lesson {n}.\nSecond line.",
+            )
+        stats = load_index(tmp_project)["archive_stats"]
+        memory_dir = Path(tmp_project) / ".council" / "memory"
+        for name in ARCHIVE_FILES:
+            assert stats["counts"][name] == _recount_archive_file(memory_dir / name)
+            assert stats["bytes"][name] == (memory_dir / name).stat().st_size
+        assert stats["counts"]["decisions.md"] == 5
+        assert stats["counts"]["lessons.jsonl"] == 15
+
+    def test_load_and_status_do_not_rescan(self, tmp_project, monkeypatch):
+        for n in range(1, 4):
+            add_consultation(
+                tmp_project, n, roles=ROLES, numbered=True, critic_lesson=f"Critic lesson {n}.\nSecond line.",
+            )
+
+        def boom(path):
+            raise AssertionError(f"rescanned {path}")
+
+        monkeypatch.setattr(memory, "_recount_archive_file", boom)
+        output = build_memory_response(tmp_project, goal="database", max_tokens=4000)
+        assert "3 decisions, 9 lessons archived" in output
+        health = get_memory_health(tmp_project)
+        assert health["roles"]["strategist"]["log_lines"] > 0
+
+    def test_external_append_is_recounted(self, tmp_project):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True, critic_lesson="Critic lesson 1.\nSecond line.")
+        decisions = Path(tmp_project) / ".council" / "memory" / "decisions.md"
+        with open(decisions, "a", encoding="utf-8") as f:
+            f.write("\n## 2026-01-01 — hand written (session S-999)\n\n- **Decision:** x\n\n")
+        assert current_archive_stats(tmp_project)["counts"]["decisions.md"] == 2
+
+
+class TestVerify:
+    def test_verify_repairs_drift(self, tmp_project):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True, critic_lesson="Critic lesson 1.\nSecond line.")
+        index = load_index(tmp_project)
+        index["archive_stats"]["counts"]["lessons.jsonl"] = 99
+        save_index(tmp_project, index)
+
+        report = verify_memory(tmp_project)
+        assert report["archive"]["lessons.jsonl"] == (99, 3)
+        assert load_index(tmp_project)["archive_stats"]["counts"]["lessons.jsonl"] == 3
+
+    def test_verify_on_clean_memory_reports_no_drift(self, tmp_project):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True, critic_lesson="Critic lesson 1.\nSecond line.")
+        assert verify_memory(tmp_project)["archive"] == {}
+
+
+@pytest.mark.parametrize("block_boundary", [1, 2, 3])
+def test_recount_handles_headers_split_across_blocks(tmp_path, block_boundary):
+    path = tmp_path / "decisions.md"
+    prefix = "x" * ((1 << 20) - block_boundary)
+    path.write_text(prefix + "\n## a\n## b\n", encoding="utf-8")
+    assert _recount_archive_file(path) == 2
@@ -0,0 +1,146 @@
+"""Tests for server-side compaction: near-duplicate clusters and the curator's detail-level rules."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory
+from memory import auto_compact, build_memory_response, compact_entries, load_active, load_index
+from src import server
+
+
+def _entry(n: int, text: str, importance: int, **extra) -> dict:
+    return {
+        "id": f"M-strategist-{n:03d}",
+        "topics": ["infrastructure"],
+        "text": text,
+        "importance": importance,
+        "pinned": False,
+        "created": "2026-01-01T00:00:00+00:00",
+        "last_validated": f"2026-01-{n:02d}T00:00:00+00:00",
+        "referenced_count": 1,
+        "source_sessions": [f"S-{n:03d}"],
+        "supersedes": [],
+        **extra,
+    }
+
+
+def _add(project_dir: str, *entries: dict) -> None:
+    path = Path(project_dir) / ".council" / "memory" / "strategist-active.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["entries"].extend(entries)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    memory.invalidate_memory_cache()
+
+
+class TestCompactEntries:
+    def test_near_duplicates_fold_into_the_most_important(self):
+        entries = [
+            _entry(1, "Deploy using Docker containers on Kubernetes for better scalability.", 5),
+            _entry(2, "Use PostgreSQL for the primary data store.", 7),
+            _entry(3, "Deploy using Docker containers on Kubernetes for scalability.", 8, topics=["deploy"]),
+        ]
+        compacted, merges = compact_entries(entries)
+
+        assert merges == {"M-strategist-003": ["M-strategist-001"]}
+        assert [e["id"] for e in compacted] == ["M-strategist-002", "M-strategist-003"]
+        kept = compacted[1]
+        assert kept["text"] == entries[2]["text"]
+        assert kept["source_sessions"] == ["S-003", "S-001"]
+        assert kept["supersedes"] == ["M-strategist-001"]
+        assert kept["topics"] == ["deploy", "infrastructure"]
+        assert kept["referenced_count"] == 2
+        assert kept["last_validated"] == entries[2]["last_validated"]
+        assert kept["features"] == memory._derive_features(kept)
+
+    def test_detail_levels_follow_importance(self):
+        entries = [
+            _entry(1, "alpha", 9),
+            _entry(2, "bravo", 5),
+            _entry(3, "charlie", 2),
+            _entry(4, "delta", 2, pinned=True),
+            _entry(5, "echo", 8, detail_level=2),
+        ]
+        compacted, _ = compact_entries(entries)
+        assert [e["detail_level"] for e in compacted] == [3, 2, 1, 2, 2]
+
+    def test_missing_importance_is_treated_as_unscored(self):
+        compacted, _ = compact_entries([_entry(1, "alpha", None), _entry(2, "bravo", 0)])
+        # Retrieval scores a missing importance as 5: summary level, not a headline.
+        assert [e["detail_level"] for e in compacted] == [2, 1]
+
+    def test_pinned_entries_are_never_absorbed(self):
+        text = "This project uses hexagonal architecture. Do not change."
+        entries = [_entry(1, text, 4, pinned=True), _entry(2, text, 9, pinned=True), _entry(3, text, 9)]
+        compacted, merges = compact_entries(entries)
+        assert [e["id"] for e in compacted] == ["M-strategist-001", "M-strategist-002"]
+        assert merges == {"M-strategist-002": ["M-strategist-003"]}
+
+    def test_compaction_is_idempotent(self):
+        entries = [_entry(n, f"Rotate the signing keys of service {n % 3}.", n) for n in range(1, 10)]
+        once, _ = compact_entries(entries)
+        twice, merges = compact_entries(once)
+        assert twice == once
+        assert merges == {}
+
+
+class TestAutoCompact:
+    def test_writes_roles_and_watermark(self, tmp_project_with_entries):
+        _add(tmp_project_with_entries, _entry(4, "Use PostgreSQL as the primary data store.", 3))
+        index = load_index(tmp_project_with_entries)
+        index["consultation_count"] = 7
+        (Path(tmp_project_with_entries) / ".council" / "memory" / "index.json").write_text(json.dumps(index))
+        memory.invalidate_memory_cache()
+
+        report = auto_compact(tmp_project_with_entries)
+        assert report["strategist"] == {
+            "before": 5,
+            "after": 4,
+            "merged": {"M-strategist-002": ["M-strategist-004"]},
+            "downgraded": ["M-strategist-003"],
+        }
+        assert report["critic"] == {"before": 0, "after": 0, "merged": {}, "downgraded": []}
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert [e["detail_level"] for e in entries] == [3, 3, 2, 3]
+        assert load_index(tmp_project_with_entries)["compaction_watermark"] == "S-007"
+
+    def test_dry_run_writes_nothing(self, tmp_project_with_entries):
+        path = Path(tmp_project_with_entries) / ".council" / "memory" / "strategist-active.json"
+        load_active(tmp_project_with_entries, "strategist")  # the v1 -> v2 upgrade rewrites the file on read
+        before = path.read_bytes()
+        report = auto_compact(tmp_project_with_entries, ["strategist"], dry_run=True)
+        assert report["strategist"]["downgraded"] == ["M-strategist-003"]
+        assert path.read_bytes() == before
+        assert load_index(tmp_project_with_entries)["compaction_watermark"] == ""
+
+    def test_load_honours_lowered_detail_level(self, tmp_project_with_entries):
+        auto_compact(tmp_project_with_entries)
+        output = build_memory_response(tmp_project_with_entries, goal="redis cache", max_tokens=8000)
+        # Importance 6: summary at most (the text is one sentence, so the summary is all of it).
+        assert "Cache API responses in Redis with 5-minute TTL." in output
+        text = "Pin every base image digest. Rebuild weekly. Scan on push."
+        _add(tmp_project_with_entries, _entry(9, text, 2, headline="Pin every base image digest."))
+        auto_compact(tmp_project_with_entries)
+        output = build_memory_response(tmp_project_with_entries, goal="base image digest", max_tokens=8000)
+        assert "M-strategist-009 [imp:2] [stale: " in output
+        assert "]: Pin every base image digest." in output
+        assert text not in output
+
+
+class TestAutoCompactTool:
+    def test_reports_merges(self, tmp_project_with_entries):
+        _add(tmp_project_with_entries, _entry(4, "Use PostgreSQL as the primary data store.", 3))
+        output = asyncio.run(server.council_memory_autocompact(tmp_project_with_entries, role="strategist"))
+        assert output.splitlines() == [
+            "Auto-compacted active memory:",
+            "- **strategist**: 5 -> 4 entries, 1 detail levels lowered",
+            "  - M-strategist-002 absorbed M-strategist-004",
+        ]
+
+    def test_rejects_unknown_role(self, tmp_project):
+        output = asyncio.run(server.council_memory_autocompact(tmp_project, role="oracle"))
+        assert output.startswith("Invalid role: oracle.")
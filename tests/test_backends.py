@@ -0,0 +1,154 @@
+"""Parity tests: the file layout and the SQLite backend answer identically."""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    FileBackend,
+    SqliteBackend,
+    apply_compaction,
+    build_memory_response,
+    estimate_tokens,
+    fts5_available,
+    get_backend,
+    get_memory_health,
+    get_original_prompt,
+    invalidate_memory_cache,
+    migrate_to_sqlite,
+    store_original_prompt,
+    verify_memory,
+)
+from tests.conftest import add_consultation
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="sqlite3 built without FTS5")
+
+
+def _consultation(n: int) -> dict:
+    """The texts of consultation ``n``: migration and cache-rollback lessons of varying importance."""
+    return {
+        "goal": f"database migration plan {n}",
+        "decision": f"Decision {n}: run the schema migration online.",
+        "strategist_lesson": f"Strategist lesson {n}: batch the PostgreSQL schema migration.",
+        "critic_lesson": f"Critic lesson {n}: rollback plans matter for read-through cache tiers.",
+        "hub_lesson": f"Hub lesson {n}.",
+        "importance": (n % 10) + 1,
+    }
+
+
+def _to_sqlite(project_dir: str) -> None:
+    """Migrate, then remove the flat files so only council.db can answer."""
+    migrate_to_sqlite(project_dir)
+    memory_dir = Path(project_dir) / ".council" / "memory"
+    for path in memory_dir.iterdir():
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.name != "council.db":
+            path.unlink()
+    invalidate_memory_cache()
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def project(request, tmp_project_with_lessons):
+    if request.param == "sqlite":
+        _to_sqlite(tmp_project_with_lessons)
+    return tmp_project_with_lessons
+
+
+class TestSameAssertions:
+    def test_backend_selected(self, project, request):
+        expected = SqliteBackend if request.node.callspec.params["project"] == "sqlite" else FileBackend
+        assert isinstance(get_backend(project), expected)
+
+    def test_generous_budget(self, project):
+        output = build_memory_response(project, goal="deploy docker on kubernetes", max_tokens=8000)
+        assert "### Relevant to this goal" in output
+        assert "Deploy using Docker containers on Kubernetes for scalability." in output
+        assert "[stale: 120d]" in output
+        assert "25 lessons archived" in output
+
+    def test_tight_budget_top_entries(self, project):
+        output = build_memory_response(project, goal="", max_tokens=600)
+        assert "### Key memories (budget-limited)" in output
+        assert "M-hub-001" in output
+        assert "M-strategist-002" in output
+        assert "M-strategist-003" not in output
+
+    def test_budget_never_exceeded(self, project):
+        for budget in (500, 1200, 2000, 4000):
+            output = build_memory_response(project, goal="database schema", max_tokens=budget)
+            assert estimate_tokens(output) <= budget
+
+    def test_archived_lessons(self, project):
+        output = build_memory_response(project, goal="database schema migration", max_tokens=4000)
+        assert "### Archived Lessons" in output
+        assert "PostgreSQL" in output
+
+    def test_bm25(self, project):
+        output = build_memory_response(project, goal="redis cache", max_tokens=4000, ranking="bm25")
+        assert output.index("M-strategist-003") < output.index("M-strategist-002")
+
+    def test_record_then_load(self, project):
+        assert "S-001" in add_consultation(project, 1, **_consultation(1))
+        output = build_memory_response(project, goal="rollback plans", max_tokens=4000)
+        assert "M-critic-001" in output
+        health = get_memory_health(project)
+        assert health["consultation_count"] == 1
+        assert health["roles"]["critic"]["active_entries"] == 1
+        assert health["roles"]["critic"]["log_lines"] >= 1
+
+    def test_compaction(self, project):
+        apply_compaction(project, "strategist", [])
+        assert get_memory_health(project)["roles"]["strategist"]["active_entries"] == 0
+        assert "M-strategist-001" not in build_memory_response(project, goal="docker", max_tokens=4000)
+
+    def test_original_prompt(self, project):
+        store_original_prompt(project, "Build a billing service")
+        assert get_original_prompt(project) == "Build a billing service"
+
+    def test_verify(self, project):
+        add_consultation(project, 1, **_consultation(1))
+        report = verify_memory(project)
+        assert report["archive"] == {}
+        assert report["counts"]["lessons.jsonl"] == 28
+
+
+class TestIdenticalOutput:
+    GOALS = ["", "database schema migration", "deploy docker on kubernetes", "read-through cache rollback", "k8s"]
+
+    def _assert_same(self, file_project: str, sqlite_project: str) -> None:
+        for goal in self.GOALS:
+            for budget in (600, 1500, 4000):
+                for ranking in ("overlap", "bm25"):
+                    for role in ("", "critic"):
+                        kwargs = dict(goal=goal, max_tokens=budget, ranking=ranking, role_filter=role)
+                        assert build_memory_response(file_project, **kwargs) == build_memory_response(
+                            sqlite_project, **kwargs
+                        ), kwargs
+        file_health, sqlite_health = get_memory_health(file_project), get_memory_health(sqlite_project)
+        file_health.pop("last_updated")
+        sqlite_health.pop("last_updated")
+        assert file_health == sqlite_health
+
+    def test_migrated_project_answers_identically(self, tmp_path_factory, tmp_project_with_lessons):
+        for n in range(1, 13):
+            add_consultation(tmp_project_with_lessons, n, **_consultation(n))
+        sqlite_project = str(tmp_path_factory.mktemp("sqlite") / "project")
+        shutil.copytree(tmp_project_with_lessons, sqlite_project)
+        _to_sqlite(sqlite_project)
+        self._assert_same(tmp_project_with_lessons, sqlite_project)
+
+        # Both keep agreeing as consultations are recorded after the migration.
+        for n in range(13, 16):
+            for project_dir in (tmp_project_with_lessons, sqlite_project):
+                add_consultation(project_dir, n, **{**_consultation(n), "goal": "cache invalidation for kubernetes"})
+        self._assert_same(tmp_project_with_lessons, sqlite_project)
+
+    def test_migrate_twice_refused(self, tmp_project_with_lessons):
+        migrate_to_sqlite(tmp_project_with_lessons)
+        with pytest.raises(ValueError):
+            migrate_to_sqlite(tmp_project_with_lessons)
@@ -0,0 +1,94 @@
+"""Tests for the optional BM25 ranking and its incrementally maintained stats."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    _index_role,
+    build_memory_response,
+    load_active,
+    load_retrieval_index,
+    save_active,
+)
+from tests.conftest import add_consultation
+
+
+def _stats(role_index: dict) -> dict:
+    return {
+        "docs": role_index["docs"],
+        "df": role_index["df"],
+        "total_len": role_index["total_len"],
+        "terms": {t: sorted(ids) for t, ids in role_index["terms"].items()},
+        "topics": {t: sorted(ids) for t, ids in role_index["topics"].items()},
+    }
+
+
+class TestIncrementalStats:
+    def test_incremental_updates_match_full_rebuild(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(memory, "RETRIEVAL_INDEX_EVERY", 1)
+        for n in range(1, 6):
+            add_consultation(
+                tmp_project, n, numbered=True, strategist_lesson=f"Service note {n}: tune the service pool size {n}.",
+            )
+        active = load_active(tmp_project, "strategist")
+        # Compaction: drop one entry, edit another
+        active["entries"].pop(1)
+        active["entries"][0]["text"] = "Rewritten lesson about pgbouncer."
+        active["entries"][0]["headline"] = "Rewritten lesson."
+        save_active(tmp_project, "strategist", active)
+        add_consultation(tmp_project, 6, numbered=True, strategist_lesson="Another service lesson.")
+
+        incremental = load_retrieval_index(tmp_project)["roles"]["strategist"]
+        rebuilt = _index_role(None, load_active(tmp_project, "strategist")["entries"])
+        assert _stats(incremental) == _stats(rebuilt)
+        assert len(incremental["docs"]) == 5
+        assert incremental["df"]["service"] == 4
+
+    def test_unchanged_entries_are_not_recomputed(self, tmp_project):
+        add_consultation(tmp_project, 1, numbered=True, strategist_lesson="Use pgbouncer.")
+        before = load_retrieval_index(tmp_project)["roles"]["strategist"]["docs"]["M-strategist-001"]
+        add_consultation(tmp_project, 2, numbered=True, strategist_lesson="Use redis.")
+        after = load_retrieval_index(tmp_project)["roles"]["strategist"]["docs"]["M-strategist-001"]
+        assert before == after
+
+
+class TestBM25Ranking:
+    def _seed(self, project_dir: str) -> None:
+        for n in range(1, 9):
+            add_consultation(
+                project_dir, n, numbered=True, strategist_lesson=f"Service outage runbook {n}: restart the service.",
+            )
+        add_consultation(project_dir, 9, numbered=True, strategist_lesson="Zookeeper quorum needs an odd node count.")
+
+    def test_rare_term_outranks_common_terms(self, tmp_project):
+        self._seed(tmp_project)
+        goal = "service outage zookeeper"
+
+        overlap = build_memory_response(tmp_project, goal=goal, max_tokens=6000)
+        bm25 = build_memory_response(tmp_project, goal=goal, max_tokens=6000, ranking="bm25")
+
+        first = lambda out: out.split("### Relevant to this goal\n", 1)[1].split("\n", 1)[0]
+        assert "M-strategist-009" not in first(overlap)
+        assert "M-strategist-009" in first(bm25)
+
+    def test_bm25_respects_budget(self, tmp_project):
+        self._seed(tmp_project)
+        from memory import estimate_tokens
+        for budget in [800, 1500, 3000]:
+            out = build_memory_response(tmp_project, goal="service pgbouncer", max_tokens=budget, ranking="bm25")
+            assert estimate_tokens(out) <= budget
+
+    def test_bm25_with_archive_lessons(self, tmp_project_with_lessons):
+        out = build_memory_response(
+            tmp_project_with_lessons, goal="database schema migration", max_tokens=4000, ranking="bm25"
+        )
+        assert "Archived Lessons" in out
+
+    def test_unknown_ranking_rejected(self, tmp_project):
+        with pytest.raises(ValueError):
+            build_memory_response(tmp_project, goal="x", ranking="tfidf")
@@ -0,0 +1,115 @@
+"""Tests for compaction candidates: the groups the curator reasons over."""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory import compaction_candidates, invalidate_memory_cache, patch_entries
+from src import server
+
+
+def _entry(n: int, text: str, importance: int, session: str, days: int = 1, **extra) -> dict:
+    stamp = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    return {
+        "id": f"M-strategist-{n:03d}",
+        "topics": ["database"],
+        "text": text,
+        "importance": importance,
+        "pinned": False,
+        "created": stamp,
+        "last_validated": stamp,
+        "referenced_count": 0,
+        "source_sessions": [session],
+        "supersedes": [],
+        **extra,
+    }
+
+
+@pytest.fixture
+def candidate_project(tmp_project):
+    memory_dir = Path(tmp_project) / ".council" / "memory"
+    entries = [
+        _entry(1, "Run database migrations in a single transaction with a rollback script.", 7, "S-001"),
+        _entry(2, "Use MySQL for the billing store.", 6, "S-001"),
+        _entry(3, "Run database migrations in one transaction and keep a rollback script ready.", 5, "S-002"),
+        _entry(4, "Prefer tabs in YAML files.", 2, "S-002", days=200, topics=[]),
+        _entry(5, "Never expose the admin port.", 2, "S-002", days=200, topics=[], pinned=True),
+    ]
+    data = {"version": 2, "role": "strategist", "entries": entries}
+    (memory_dir / "strategist-active.json").write_text(json.dumps(data), encoding="utf-8")
+    index = json.loads((memory_dir / "index.json").read_text(encoding="utf-8"))
+    index["topic_index"] = {
+        "database": {
+            "decision_ids": ["S-001", "S-004"],
+            "memory_ids": [],
+            "keywords": [],
+            "decisions": [
+                {"session": "S-001", "summary": "Use MySQL for billing."},
+                {"session": "S-004", "summary": "Move the billing store from MySQL to PostgreSQL."},
+            ],
+        }
+    }
+    (memory_dir / "index.json").write_text(json.dumps(index), encoding="utf-8")
+    invalidate_memory_cache()
+    return tmp_project
+
+
+def _by_kind(report: dict) -> dict[str, dict]:
+    return {group["kind"]: group for group in report["groups"]}
+
+
+class TestCompactionCandidates:
+    def test_groups_by_kind(self, candidate_project):
+        report = compaction_candidates(candidate_project, "strategist")
+        assert (report["role"], report["generation"], report["entries"]) == ("strategist", 0, 5)
+        groups = _by_kind(report)
+
+        duplicates = groups["duplicates"]
+        assert duplicates["keep"] == "M-strategist-001"
+        assert [(m["id"], m["score"]) for m in duplicates["entries"]] == [
+            ("M-strategist-001", 1.0), ("M-strategist-003", 0.43)
+        ]
+        superseded = groups["superseded"]
+        assert (superseded["decision"], superseded["topic"]) == ("S-004", "database")
+        assert [(m["id"], m["score"]) for m in superseded["entries"]] == [("M-strategist-002", 0.5)]
+        stale = groups["stale"]
+        assert [m["id"] for m in stale["entries"]] == ["M-strategist-004"]
+        assert stale["entries"][0]["score"] >= 199
+
+    def test_savings_order_the_groups(self, candidate_project):
+        report = compaction_candidates(candidate_project, "strategist")
+        saved = [group["tokens_saved"] for group in report["groups"]]
+        assert saved == sorted(saved, reverse=True) and all(saved)
+        assert len(compaction_candidates(candidate_project, "strategist", limit=1)["groups"]) == 1
+
+    def test_applied_patch_clears_its_group(self, candidate_project):
+        ops = [{
+            "op": "merge",
+            "ids": ["M-strategist-001", "M-strategist-003"],
+            "entry": {"text": "Run migrations in one transaction with a rollback script."},
+        }]
+        patch_entries(candidate_project, "strategist", ops, 0)
+        report = compaction_candidates(candidate_project, "strategist")
+        assert report["generation"] == 1
+        assert "duplicates" not in _by_kind(report)
+
+    def test_unknown_role(self, candidate_project):
+        with pytest.raises(ValueError, match="Invalid role"):
+            compaction_candidates(candidate_project, "oracle")
+
+
+class TestCandidatesTool:
+    def test_formats_groups(self, candidate_project):
+        output = asyncio.run(server.council_memory_candidates(candidate_project, "strategist"))
+        lines = output.splitlines()
+        assert lines[0].startswith("## Compaction candidates: strategist (generation 0, 5 entries, ~")
+        assert "- M-strategist-003 (0.43, imp 5): Run database migrations in one transaction" in output
+        assert "Decision: Move the billing store from MySQL to PostgreSQL." in output
+        assert "- M-strategist-004 (200d, imp 2): Prefer tabs in YAML files." in output
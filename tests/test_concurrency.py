@@ -0,0 +1,226 @@
+"""Tests for the per-project memory lock and group commit of concurrent records."""
+
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    MemoryLock,
+    ROLES,
+    _MemoryTransaction,
+    invalidate_memory_cache,
+    load_active,
+    load_index,
+    verify_memory,
+)
+from tests.conftest import add_consultation
+
+needs_flock = pytest.mark.skipif(memory.fcntl is None, reason="fcntl not available")
+
+
+def _worker(project_dir: str, worker: int, count: int) -> None:
+    for i in range(count):
+        add_consultation(project_dir, f"w{worker}-{i}", roles=ROLES)
+
+
+def _assert_consistent(project_dir: str, total: int) -> None:
+    invalidate_memory_cache()
+    assert load_index(project_dir)["consultation_count"] == total
+    memory_dir = Path(project_dir) / ".council" / "memory"
+    sessions = re.findall(r"\(session (S-\d+)\)", (memory_dir / "decisions.md").read_text(encoding="utf-8"))
+    assert sorted(sessions) == [f"S-{n:03d}" for n in range(1, total + 1)]
+    for role in ("strategist", "critic", "hub"):
+        entries = load_active(project_dir, role)["entries"]
+        ids = [e["id"] for e in entries]
+        assert len(ids) == total
+        assert len(set(ids)) == total
+    assert verify_memory(project_dir)["archive"] == {}
+
+
+class TestCrossProcess:
+    @needs_flock
+    def test_parallel_processes_lose_nothing(self, tmp_project):
+        try:
+            ctx = multiprocessing.get_context("fork")
+        except ValueError:
+            pytest.skip("fork start method not available")
+        workers, per_worker = 4, 6
+        procs = [ctx.Process(target=_worker, args=(tmp_project, w, per_worker)) for w in range(workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+            assert p.exitcode == 0
+        _assert_consistent(tmp_project, workers * per_worker)
+
+
+class TestThreads:
+    def test_parallel_threads_lose_nothing(self, tmp_project):
+        threads = [threading.Thread(target=_worker, args=(tmp_project, w, 5)) for w in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(60)
+        _assert_consistent(tmp_project, 30)
+
+    @needs_flock
+    def test_queued_writers_share_one_commit(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, "seed", roles=ROLES)
+        commits = []
+        original = _MemoryTransaction.commit
+
+        def counting_commit(self):
+            commits.append(self)
+            return original(self)
+
+        monkeypatch.setattr(_MemoryTransaction, "commit", counting_commit)
+        key = str(Path(tmp_project) / ".council" / "memory")
+        results: list[str] = []
+        threads = [
+            threading.Thread(target=lambda n=n: results.append(add_consultation(tmp_project, f"t{n}", roles=ROLES)))
+            for n in range(5)
+        ]
+
+        # Hold the lock so every writer queues up behind it.
+        with MemoryLock(tmp_project, exclusive=True):
+            for t in threads:
+                t.start()
+            deadline = time.monotonic() + 10
+            while len(memory._RECORD_QUEUES.get(key, ())) < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        for t in threads:
+            t.join(30)
+
+        assert len(commits) == 1
+        assert sorted(results) == sorted(
+            f"Recorded consultation S-{n:03d}. Memory updated across all tiers." for n in range(2, 7)
+        )
+        _assert_consistent(tmp_project, 6)
+
+    @needs_flock
+    def test_bad_record_fails_alone(self, tmp_project):
+        add_consultation(tmp_project, "seed", roles=ROLES)
+        key = str(Path(tmp_project) / ".council" / "memory")
+        outcomes: dict[str, object] = {}
+
+        def write(tag: str, goal) -> None:
+            try:
+                outcomes[tag] = add_consultation(tmp_project, tag, goal=goal, strategist_lesson=f"Lesson {tag}.")
+            except Exception as e:
+                outcomes[tag] = e
+
+        threads = [
+            threading.Thread(target=write, args=(tag, goal))
+            for tag, goal in [("a", "database goal a"), ("bad", None), ("b", "database goal b")]
+        ]
+        with MemoryLock(tmp_project, exclusive=True):
+            # Start them one at a time so the bad record is staged between the others.
+            for queued, t in enumerate(threads, 1):
+                t.start()
+                deadline = time.monotonic() + 10
+                while len(memory._RECORD_QUEUES.get(key, ())) < queued and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        for t in threads:
+            t.join(30)
+
+        assert isinstance(outcomes["bad"], AttributeError)
+        assert sorted(outcomes[tag] for tag in "ab") == [
+            f"Recorded consultation S-{n:03d}. Memory updated across all tiers." for n in (2, 3)
+        ]
+        invalidate_memory_cache()
+        assert load_index(tmp_project)["consultation_count"] == 3
+        assert [e["text"] for e in load_active(tmp_project, "strategist")["entries"]][1:] == ["Lesson a.", "Lesson b."]
+
+    def test_failed_batch_reports_to_every_writer(self, tmp_project, monkeypatch):
+        def boom(self, batch):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(memory.FileBackend, "commit_consultations", boom)
+        with pytest.raises(OSError, match="disk full"):
+            add_consultation(tmp_project, "x", roles=ROLES)
+        monkeypatch.undo()
+        assert "S-001" in add_consultation(tmp_project, "y", roles=ROLES)
+
+    @needs_flock
+    def test_lock_failure_does_not_wedge_later_records(self, tmp_project):
+        lock_path = Path(tmp_project) / ".council" / "memory" / ".lock"
+        lock_path.mkdir()
+        with pytest.raises(IsADirectoryError):
+            add_consultation(tmp_project, "x", roles=ROLES)
+        outcome: list = []
+
+        def second():
+            try:
+                outcome.append(add_consultation(tmp_project, "y", roles=ROLES))
+            except OSError as e:
+                outcome.append(e)
+
+        thread = threading.Thread(target=second, daemon=True)
+        thread.start()
+        thread.join(10)
+        assert not thread.is_alive()
+        assert isinstance(outcome[0], IsADirectoryError)
+        lock_path.rmdir()
+        assert "S-001" in add_consultation(tmp_project, "z", roles=ROLES)
+
+    def test_concurrent_loads_of_a_v1_index(self, tmp_project):
+        add_consultation(tmp_project, "seed", roles=ROLES)
+        index_path = Path(tmp_project) / ".council" / "memory" / "index.json"
+        index_path.write_text(index_path.read_text(encoding="utf-8").replace('"version": 2', '"version": 1'))
+        counts: list[int] = []
+
+        def load() -> None:
+            for _ in range(50):
+                invalidate_memory_cache()
+                counts.append(memory.load_index(tmp_project)["consultation_count"])
+
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(60)
+        assert counts == [1] * 400
+        assert '"version": 1' in index_path.read_text(encoding="utf-8")
+
+    def test_concurrent_json_writes_use_their_own_temp_files(self, tmp_project):
+        path = Path(tmp_project) / ".council" / "memory" / "scratch.json"
+        errors: list[Exception] = []
+
+        def write(n: int) -> None:
+            try:
+                for i in range(50):
+                    memory._write_json(path, {"writer": n, "round": i})
+            except OSError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(60)
+        assert errors == []
+        assert [p.name for p in path.parent.iterdir() if p.name.endswith(".tmp")] == []
+
+    def test_lock_is_reentrant(self, tmp_project):
+        with MemoryLock(tmp_project, exclusive=True):
+            with MemoryLock(tmp_project, exclusive=True):
+                assert "S-001" in add_consultation(tmp_project, "inner", roles=ROLES)
+
+    @needs_flock
+    def test_exclusive_inside_shared_is_refused(self, tmp_project):
+        with MemoryLock(tmp_project):
+            with MemoryLock(tmp_project):
+                pass
+            with pytest.raises(RuntimeError, match="shared"):
+                add_consultation(tmp_project, "inner", roles=ROLES)
+        with MemoryLock(tmp_project, exclusive=True):
+            with MemoryLock(tmp_project):
+                assert "S-001" in add_consultation(tmp_project, "outer", roles=ROLES)
@@ -0,0 +1,154 @@
+"""Tests for the session-offset index over decisions.md and decision lookup."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory
+from memory import (
+    close_archive_segment,
+    fetch_decisions,
+    fts5_available,
+    invalidate_memory_cache,
+    load_decisions_index,
+    migrate_to_sqlite,
+    record_consultation,
+    verify_memory,
+)
+from src import server
+
+GOALS = [
+    ("Pick a database for billing", "Use PostgreSQL."),
+    ("Secure the login flow", "Rotate JWT signing keys monthly — ünïcode notes."),
+    ("Speed up the billing database reports", "Cache report queries in Redis."),
+]
+
+
+def _decisions_path(project_dir: str) -> Path:
+    return Path(project_dir) / ".council" / "memory" / "decisions.md"
+
+
+def _decide(project_dir: str) -> None:
+    for goal, decision in GOALS:
+        record_consultation(
+            project_dir=project_dir,
+            session_id=None,
+            goal=goal,
+            strategist_summary="s",
+            critic_summary="c",
+            decision=decision,
+        )
+
+
+@pytest.fixture
+def decided_project(tmp_project):
+    _decide(tmp_project)
+    return tmp_project
+
+
+class TestDecisionsIndex:
+    def test_record_persists_section_offsets(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(memory, "SIDECAR_LAG", 0)
+        _decide(tmp_project)
+        sidecar = Path(tmp_project) / ".council" / "memory" / "decisions-index.json"
+        didx = json.loads(sidecar.read_text(encoding="utf-8"))
+        raw = _decisions_path(tmp_project).read_bytes()
+        assert didx["size"] == len(raw)
+        offset, length, _, _ = didx["sessions"]["S-002"][0]
+        section = raw[offset:offset + length].decode("utf-8")
+        assert section.startswith("\n## ") and "(session S-002)" in section
+        assert section.endswith("ünïcode notes.\n\n")
+        assert didx["sessions"]["S-001"][0][3] == ["data", "database"]
+
+    def test_records_within_the_lag_leave_the_sidecar_alone(self, decided_project):
+        sidecar = json.loads((Path(decided_project) / ".council" / "memory" / "decisions-index.json").read_text())
+        assert set(sidecar["sessions"]) == {"S-001"}
+        didx = load_decisions_index(decided_project)
+        assert didx["size"] == _decisions_path(decided_project).stat().st_size
+        assert set(didx["sessions"]) == {"S-001", "S-002", "S-003"}
+
+    def test_sections_appended_by_hand_are_indexed(self, decided_project):
+        with open(_decisions_path(decided_project), "a", encoding="utf-8") as f:
+            f.write("\n## 2026-01-05 — Manual entry (session S-009)\n\n- **Goal:** Tune the database\n\n")
+        didx = load_decisions_index(decided_project)
+        assert set(didx["sessions"]) == {"S-001", "S-002", "S-003", "S-009"}
+        (decision,) = fetch_decisions(decided_project, ["S-009"])
+        assert decision == {
+            "session": "S-009",
+            "date": "2026-01-05",
+            "topics": ["data", "database"],
+            "text": "- **Goal:** Tune the database",
+        }
+
+    def test_rewritten_file_is_reindexed(self, decided_project):
+        path = _decisions_path(decided_project)
+        # Same size, different last decision
+        path.write_text(path.read_text(encoding="utf-8").replace("in Redis.", "in Varnish"), encoding="utf-8")
+        (decision,) = fetch_decisions(decided_project, ["S-003"])
+        assert decision["text"].endswith("- **Decision:** Cache report queries in Varnish")
+
+    def test_verify_rebuilds_the_sidecar(self, decided_project):
+        sidecar = Path(decided_project) / ".council" / "memory" / "decisions-index.json"
+        before = load_decisions_index(decided_project)
+        sidecar.write_text(json.dumps({"version": 1, "size": 3, "tail": "0", "sessions": {}}), encoding="utf-8")
+        verify_memory(decided_project)
+        assert json.loads(sidecar.read_text(encoding="utf-8")) == before
+
+
+class TestFetchDecisions:
+    def test_by_session(self, decided_project):
+        decisions = fetch_decisions(decided_project, ["S-003", "S-001", "S-404"])
+        assert [d["session"] for d in decisions] == ["S-001", "S-003"]
+        assert decisions[1]["text"].splitlines()[-1] == "- **Decision:** Cache report queries in Redis."
+
+    def test_by_topic_with_limit(self, decided_project):
+        assert [d["session"] for d in fetch_decisions(decided_project, topic="database")] == ["S-001", "S-003"]
+        assert [d["session"] for d in fetch_decisions(decided_project, topic="database", limit=1)] == ["S-003"]
+        assert fetch_decisions(decided_project, ["S-002", "S-003"], topic="database")[0]["session"] == "S-003"
+        with pytest.raises(ValueError):
+            fetch_decisions(decided_project)
+
+    def test_closed_segments_are_read(self, decided_project):
+        before = fetch_decisions(decided_project, ["S-001", "S-003"])
+        close_archive_segment(decided_project)
+        record_consultation(
+            project_dir=decided_project, session_id=None, goal="g", strategist_summary="s", critic_summary="c",
+            decision="d",
+        )
+        invalidate_memory_cache()
+        assert load_decisions_index(decided_project)["sessions"].keys() == {"S-004"}
+        assert fetch_decisions(decided_project, ["S-001", "S-003"]) == before
+        assert [d["session"] for d in fetch_decisions(decided_project, ["S-002", "S-004"])] == ["S-002", "S-004"]
+
+    @pytest.mark.skipif(not fts5_available(), reason="sqlite3 built without FTS5")
+    def test_sqlite_backend_matches(self, decided_project):
+        before = fetch_decisions(decided_project, ["S-001", "S-002", "S-003"])
+        migrate_to_sqlite(decided_project)
+        invalidate_memory_cache()
+        assert fetch_decisions(decided_project, ["S-001", "S-002", "S-003"]) == before
+        record_consultation(
+            project_dir=decided_project, session_id=None, goal="g", strategist_summary="s", critic_summary="c",
+            decision="d",
+        )
+        assert fetch_decisions(decided_project, ["S-004"])[0]["text"].endswith("- **Decision:** d")
+
+
+class TestDecisionTools:
+    def test_decisions_tool(self, decided_project):
+        output = asyncio.run(server.council_memory_decisions(decided_project, topic="database"))
+        lines = output.splitlines()
+        assert lines[0] == "## Decisions (2)"
+        assert lines[2].startswith("### S-001 (") and lines[2].endswith(") [data, database]")
+        missing = asyncio.run(server.council_memory_decisions(decided_project))
+        assert missing == "Decisions not fetched: give session ids or a topic."
+
+    def test_status_shows_topic_decisions(self, decided_project):
+        output = asyncio.run(server.council_memory_status(decided_project, topic="authentication"))
+        assert "## Decisions on authentication\n" in output
+        assert "- **Decision:** Rotate JWT signing keys monthly" in output
@@ -0,0 +1,143 @@
+"""Tests for merging near-duplicate lessons into existing active entries at record time."""
+
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    MemoryLock,
+    _NearDuplicates,
+    _RecordRequest,
+    fts5_available,
+    get_backend,
+    invalidate_memory_cache,
+    load_active,
+    migrate_to_sqlite,
+    record_consultation,
+)
+from tests.conftest import add_consultation
+
+
+class TestMergeOnRecord:
+    def test_restated_lesson_merges(self, tmp_project):
+        add_consultation(tmp_project, strategist_lesson="Use pgbouncer in transaction mode for connection pooling.")
+        first = load_active(tmp_project, "strategist")["entries"][0]
+        result = add_consultation(
+            tmp_project, strategist_lesson="use PgBouncer in transaction mode for connection pooling!",
+        )
+
+        assert result.endswith("Merged near-duplicate lessons into M-strategist-001.")
+        (entry,) = load_active(tmp_project, "strategist")["entries"]
+        assert entry["text"] == first["text"]
+        assert entry["source_sessions"] == ["S-001", "S-002"]
+        assert entry["referenced_count"] == 1
+        assert entry["last_validated"] > first["last_validated"]
+        assert entry["features"] == memory._derive_features(entry)
+        # The archive still keeps every lesson as recorded.
+        lessons_path = Path(tmp_project) / ".council" / "memory" / "lessons.jsonl"
+        assert len(lessons_path.read_text(encoding="utf-8").splitlines()) == 2
+
+    def test_restatement_raises_importance(self, tmp_project):
+        add_consultation(tmp_project, strategist_lesson="Use pgbouncer in transaction mode for connection pooling.")
+        record_consultation(
+            project_dir=tmp_project, session_id=None, goal="g", strategist_summary="s", critic_summary="c",
+            decision="d", strategist_lesson="Use pgbouncer in transaction mode for connection pooling.", importance=9,
+        )
+        add_consultation(tmp_project, strategist_lesson="Use pgbouncer in transaction mode for connection pooling.")
+        (entry,) = load_active(tmp_project, "strategist")["entries"]
+        assert entry["importance"] == 9
+
+    def test_restatement_pins_the_entry(self, tmp_project):
+        add_consultation(tmp_project, strategist_lesson="Use pgbouncer in transaction mode for connection pooling.")
+        record_consultation(
+            project_dir=tmp_project, session_id=None, goal="g", strategist_summary="s", critic_summary="c",
+            decision="d", strategist_lesson="Use pgbouncer in transaction mode for connection pooling.", pin=True,
+        )
+        (entry,) = load_active(tmp_project, "strategist")["entries"]
+        assert entry["pinned"] is True
+        assert [p["id"] for p in memory.load_index(tmp_project)["pinned"]] == ["P-S-002"]
+
+    def test_distinct_lessons_are_kept(self, tmp_project):
+        for n in range(1, 4):
+            result = add_consultation(
+                tmp_project, strategist_lesson=f"Lesson {n}: batch the PostgreSQL schema migration. Then verify.",
+            )
+            assert "Merged" not in result
+        add_consultation(
+            tmp_project,
+            strategist_lesson="Use pgbouncer in transaction mode for connection pooling in production only.",
+        )
+        add_consultation(tmp_project, strategist_lesson="Use pgbouncer in session mode.")
+        assert len(load_active(tmp_project, "strategist")["entries"]) == 5
+
+    def test_merges_into_entries_without_stored_signature(self, tmp_project_with_entries):
+        result = add_consultation(
+            tmp_project_with_entries,
+            strategist_lesson="Deploy using Docker containers on Kubernetes, for scalability.",
+        )
+        assert result.startswith("Recorded consultation S-001.")
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert [e["id"] for e in entries] == ["M-strategist-001", "M-strategist-002", "M-strategist-003", "M-hub-001"]
+        # S-001 already sourced the entry: the session is not listed twice.
+        assert entries[0]["source_sessions"] == ["S-001"]
+        assert entries[0]["referenced_count"] == 2
+
+    def test_roles_are_deduplicated_separately(self, tmp_project):
+        lesson = "Always pin the base image digest."
+        add_consultation(tmp_project, strategist_lesson=lesson)
+        add_consultation(tmp_project, critic_lesson=lesson)
+        assert len(load_active(tmp_project, "strategist")["entries"]) == 1
+        assert len(load_active(tmp_project, "critic")["entries"]) == 1
+
+    def test_group_commit_merges_within_the_batch(self, tmp_project):
+        kwargs = dict(
+            session_id=None, goal="g", strategist_summary="s", critic_summary="c", decision="d",
+            strategist_lesson="Rotate the JWT signing keys every month.", critic_lesson="", hub_lesson="",
+            importance=5, pin=False,
+        )
+        batch = [_RecordRequest(kwargs=kwargs, done=threading.Event()) for _ in range(3)]
+        with MemoryLock(tmp_project, exclusive=True):
+            memory._commit_record_batch(tmp_project, batch)
+        (entry,) = load_active(tmp_project, "strategist")["entries"]
+        assert entry["source_sessions"] == ["S-001", "S-002", "S-003"]
+        assert entry["referenced_count"] == 2
+        assert [r.result.endswith("into M-strategist-001.") for r in batch] == [False, True, True]
+
+
+class TestNearDuplicateIndex:
+    def test_duplicate_ids_are_never_targets(self):
+        text = "Cache the rendered page for five minutes."
+        entries = [{"id": "M-hub-001", "text": text}, {"id": "M-hub-001", "text": text}, {"text": text}]
+        assert _NearDuplicates(entries).find(text) is None
+
+    def test_best_match_wins(self):
+        entries = [
+            {"id": "M-hub-001", "text": "Cache the rendered page for five minutes behind the CDN edge."},
+            {"id": "M-hub-002", "text": "Cache the rendered page for five minutes."},
+        ]
+        assert _NearDuplicates(entries).find("Cache the rendered page for five minutes.") == 1
+
+
+@pytest.mark.skipif(not fts5_available(), reason="sqlite3 built without FTS5")
+class TestSqliteMerge:
+    def test_merge_keeps_position(self, tmp_project_with_entries):
+        migrate_to_sqlite(tmp_project_with_entries)
+        memory_dir = Path(tmp_project_with_entries) / ".council" / "memory"
+        for path in memory_dir.iterdir():
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.name != "council.db":
+                path.unlink()
+        invalidate_memory_cache()
+
+        add_consultation(tmp_project_with_entries, strategist_lesson="Use PostgreSQL for the primary data store!")
+        entries = get_backend(tmp_project_with_entries).load_entries("strategist")
+        assert [e["id"] for e in entries] == ["M-strategist-001", "M-strategist-002", "M-strategist-003", "M-hub-001"]
+        assert len(entries[1]["source_sessions"]) == 2
+        assert entries[1]["referenced_count"] == 1
@@ -0,0 +1,104 @@
+"""Tests for the per-entry features block stored at record and compaction time."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    MemoryEntry,
+    _entry_tokens,
+    apply_compaction,
+    build_memory_response,
+    get_backend,
+    get_memory_health,
+    invalidate_memory_cache,
+    load_active,
+)
+from tests.conftest import add_consultation
+
+GOALS = ["", "database schema migration", "deploy docker on kubernetes", "redis cache"]
+
+
+def _outputs(project_dir: str) -> list[str]:
+    return [
+        build_memory_response(project_dir, goal=goal, max_tokens=budget, packing=packing)
+        for goal in GOALS
+        for budget in (600, 1500, 4000)
+        for packing in ("greedy", "optimal")
+    ]
+
+
+class TestStoredFeatures:
+    def test_record_stores_features(self, tmp_project):
+        add_consultation(
+            tmp_project, 1, strategist_lesson="Use PostgreSQL with pgbouncer. Pool connections per service.",
+        )
+        entry = load_active(tmp_project, "strategist")["entries"][0]
+        features = entry["features"]
+        assert set(features["terms"].split()) == set(_entry_tokens(entry))
+        assert features["topics"] == sorted(set(entry["topics"]))
+        assert features["created"] == features["validated"]
+        assert features["words"] == [4, 8, 8]
+
+    def test_record_backfills_existing_entries(self, tmp_project_with_entries):
+        add_consultation(tmp_project_with_entries, 1, strategist_lesson="Rotate JWT secrets monthly.")
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert all("features" in e for e in entries)
+
+    def test_compaction_stores_features(self, tmp_project_with_entries):
+        kept = [
+            {k: v for k, v in e.items() if k != "features"}
+            for e in load_active(tmp_project_with_entries, "strategist")["entries"][:2]
+        ]
+        apply_compaction(tmp_project_with_entries, "strategist", kept)
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert [MemoryEntry.from_dict(e).stored is not None for e in entries] == [True, True]
+
+    def test_output_identical_with_and_without_features(self, tmp_project_with_lessons):
+        for n in range(1, 6):
+            add_consultation(
+                tmp_project_with_lessons, n,
+                strategist_lesson=f"Lesson {n}: batch the PostgreSQL schema migration. Then verify.",
+            )
+        apply_compaction(
+            tmp_project_with_lessons, "strategist", load_active(tmp_project_with_lessons, "strategist")["entries"]
+        )
+        stored = _outputs(tmp_project_with_lessons)
+        health = get_memory_health(tmp_project_with_lessons)
+
+        backend = get_backend(tmp_project_with_lessons)
+        backend.replace_active({
+            role: [{k: v for k, v in e.items() if k != "features"} for e in backend.load_entries(role)]
+            for role in ("strategist", "critic", "hub")
+        })
+        invalidate_memory_cache()
+        assert _outputs(tmp_project_with_lessons) == stored
+        assert get_memory_health(tmp_project_with_lessons) == health
+
+
+class TestStaleFeatures:
+    def test_edited_text_is_rederived(self, tmp_project):
+        add_consultation(tmp_project, 1, strategist_lesson="Deploy on kubernetes.")
+        active_path = Path(tmp_project) / ".council" / "memory" / "strategist-active.json"
+        data = json.loads(active_path.read_text(encoding="utf-8"))
+        data["entries"][0]["text"] = "Hand-edited note about pgbouncer pooling."
+        active_path.write_text(json.dumps(data), encoding="utf-8")
+
+        output = build_memory_response(tmp_project, goal="pgbouncer", max_tokens=4000)
+        assert "### Relevant to this goal\n- M-strategist-001" in output
+        # Reads never write the refreshed block back.
+        assert json.loads(active_path.read_text(encoding="utf-8")) == data
+
+    def test_revalidation_clears_stale_marker(self, tmp_project_with_entries):
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert "[stale: 120d]" in build_memory_response(tmp_project_with_entries, max_tokens=4000)
+        fresh = entries[0]["last_validated"]
+        revalidated = [
+            {**e, "last_validated": fresh} if e["id"] == "M-strategist-003" else e
+            for e in [memory._with_features(e) for e in entries]
+        ]
+        apply_compaction(tmp_project_with_entries, "strategist", revalidated)
+        assert "[stale:" not in build_memory_response(tmp_project_with_entries, max_tokens=4000)
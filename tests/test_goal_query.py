@@ -0,0 +1,131 @@
+"""GoalQuery must reproduce the per-entry goal analysis it replaces exactly."""
+
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    SYNONYM_MAP,
+    _STOPWORDS,
+    GoalQuery,
+    _score_lesson,
+    build_memory_response,
+    compute_relevance,
+    extract_topics,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _reference_relevance(entry: dict, goal: str, topic_index: dict | None, now: datetime) -> float:
+    """Original compute_relevance, with datetime.now() replaced by ``now``."""
+    entry_topics = set(entry.get("topics", []))
+    goal_topics = extract_topics(goal, topic_index)
+    topic_score = len(entry_topics & goal_topics) / max(len(entry_topics), 1) if entry_topics else 0.0
+
+    goal_words_raw = set(re.findall(r"[a-z0-9-]+", goal.lower()))
+    goal_words_expanded = {SYNONYM_MAP[w] for w in goal_words_raw if w in SYNONYM_MAP}
+    entry_text = entry.get("text", "") + " " + entry.get("headline", "")
+    entry_words = set(re.findall(r"[a-z0-9-]+", entry_text.lower()))
+    direct_overlap = len(goal_words_raw & entry_words) / max(len(goal_words_raw), 1)
+    synonym_overlap = (
+        len(goal_words_expanded & entry_words) / max(len(goal_words_expanded), 1)
+        if goal_words_expanded else 0.0
+    )
+    keyword_overlap = direct_overlap + synonym_overlap * 0.5
+
+    try:
+        days_old = (now - datetime.fromisoformat(entry.get("created", ""))).days
+    except (ValueError, TypeError):
+        days_old = 0
+    recency = max(0.0, 0.3 - (days_old * 0.01))
+    base_score = topic_score * 0.5 + keyword_overlap * 0.3 + recency * 0.2
+    if entry.get("pinned"):
+        return base_score
+    try:
+        stale_days = (now - datetime.fromisoformat(entry.get("last_validated") or entry.get("created", ""))).days
+    except (ValueError, TypeError):
+        stale_days = 0
+    return base_score * (0.7 if stale_days > 90 else 1.0)
+
+
+def _reference_score_lesson(lesson: dict, goal: str) -> float:
+    lesson_words = set(re.findall(r"[a-z0-9-]+", lesson.get("lesson", "").lower()))
+    goal_words = set(re.findall(r"[a-z0-9-]+", goal.lower())) - _STOPWORDS
+    return len(goal_words & lesson_words) / max(len(goal_words), 1) if goal_words else 0.0
+
+
+def _entries() -> list[dict]:
+    def iso(days: int) -> str:
+        return (NOW - timedelta(days=days)).isoformat()
+
+    return [
+        {"id": "a", "topics": ["database"], "text": "Use PostgreSQL with pgbouncer pooling.", "headline": "PostgreSQL", "created": iso(3)},
+        {"id": "b", "topics": ["infrastructure"], "text": "Deploy on kubernetes via helm.", "headline": "k8s", "created": iso(120), "last_validated": iso(10)},
+        {"id": "c", "topics": [], "text": "Cache responses in redis.", "created": iso(200), "pinned": True},
+        {"id": "d", "topics": ["frontend", "api"], "text": "", "headline": "", "created": "not-a-date"},
+        {"id": "e", "topics": ["security"], "text": "Rotate jwt secrets", "created": iso(95), "last_validated": ""},
+        {"id": "f", "text": "naive timestamp entry", "created": "2025-01-01T00:00:00"},
+    ]
+
+
+GOALS = [
+    "database schema migration",
+    "deploy to k8s with redis cache and postgres",
+    "the and for",
+    "",
+    "Rotate JWT secrets for the auth0 login flow",
+]
+TOPIC_INDEX = {"billing": {"keywords": ["invoice", "pgbouncer"], "decision_ids": ["S-001"]}}
+
+
+class TestGoalQueryParity:
+    def test_relevance_matches_original_scores_exactly(self):
+        for goal in GOALS:
+            query = GoalQuery.from_goal(goal, TOPIC_INDEX, now=NOW)
+            for entry in _entries():
+                assert compute_relevance(entry, query) == _reference_relevance(entry, goal, TOPIC_INDEX, NOW)
+
+    def test_string_goal_still_accepted(self):
+        entry = _entries()[0]
+        now = datetime.now(timezone.utc)
+        assert compute_relevance(entry, "database pooling") == _reference_relevance(entry, "database pooling", None, now)
+
+    def test_lesson_scores_match_original(self):
+        lessons = [
+            {"lesson": "Database schema migration needs a rollback plan."},
+            {"lesson": "Redis cache TTL of five minutes."},
+            {"lesson": ""},
+            {},
+        ]
+        for goal in GOALS:
+            query = GoalQuery.from_goal(goal, now=NOW)
+            for lesson in lessons:
+                assert _score_lesson(lesson, query) == _reference_score_lesson(lesson, goal)
+
+    def test_query_fields(self):
+        query = GoalQuery.from_goal("Deploy k8s for the database", now=NOW)
+        assert query.raw_words == {"deploy", "k8s", "for", "the", "database"}
+        assert query.synonym_words == {"kubernetes"}
+        assert query.filtered_words == {"deploy", "k8s", "database"}
+        assert {"infrastructure", "database"} <= query.topics
+        assert query.now == NOW
+
+
+class TestGoalAnalyzedOnce:
+    def test_build_memory_response_analyzes_goal_once(self, tmp_project_with_lessons, monkeypatch):
+        import memory
+
+        calls = []
+        original = memory.extract_topics
+
+        def counting(text, topic_index=None):
+            calls.append(text)
+            return original(text, topic_index)
+
+        monkeypatch.setattr(memory, "extract_topics", counting)
+        build_memory_response(tmp_project_with_lessons, goal="database schema migration", max_tokens=4000)
+        assert calls == ["database schema migration"]
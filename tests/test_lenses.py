@@ -0,0 +1,104 @@
+"""Tests for multi-lens retrieval (one pass, several packed views)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    LENS_PROFILES,
+    MemoryLens,
+    build_memory_response,
+    build_memory_views,
+    estimate_tokens,
+)
+from tests.conftest import add_consultation
+
+
+def _views(n: int) -> dict:
+    """The texts of consultation ``n``: each role's take on a database rollout."""
+    return {
+        "goal": f"database rollout {n}",
+        "strategist_lesson": f"Strategist view {n}: shard the database by tenant.",
+        "critic_lesson": f"Critic view {n}: database shards need a security audit of cross-tenant queries.",
+        "hub_lesson": f"Hub view {n}: database rollout goes region by region.",
+    }
+
+
+class TestResolve:
+    def test_profile_by_name_and_budget(self):
+        lens = MemoryLens.resolve("strategist-alpha:2000", 4000)
+        assert lens.name == "strategist-alpha"
+        assert lens.budget == 2000
+        assert lens.role_weights == LENS_PROFILES["strategist"]["roles"]
+
+    def test_default_budget(self):
+        assert MemoryLens.resolve("critic", 3000).budget == 3000
+
+    def test_longest_profile_match(self):
+        assert MemoryLens.resolve("security-auditor", 4000).topic_weights == LENS_PROFILES["security-auditor"]["topics"]
+        assert MemoryLens.resolve("qa-critic", 4000).role_weights == LENS_PROFILES["critic"]["roles"]
+
+    def test_unknown_name_is_neutral(self):
+        lens = MemoryLens.resolve("data-engineer", 4000)
+        assert lens.role_weights == {} and lens.topic_weights == {}
+
+    @pytest.mark.parametrize("spec", ["", ":100", "critic:abc", "critic:0"])
+    def test_invalid_specs(self, spec):
+        with pytest.raises(ValueError):
+            MemoryLens.resolve(spec, 4000)
+
+
+class TestViews:
+    def test_neutral_lens_matches_single_response(self, tmp_project_with_lessons):
+        for n in range(1, 6):
+            add_consultation(tmp_project_with_lessons, n, **_views(n))
+        for budget in (600, 1500, 4000, 8000):
+            for goal in ("", "database schema migration"):
+                views = build_memory_views(
+                    tmp_project_with_lessons, goal=goal, lenses=[MemoryLens("all", budget)]
+                )
+                assert views["all"] == build_memory_response(tmp_project_with_lessons, goal=goal, max_tokens=budget)
+
+    def test_one_retrieval_for_many_lenses(self, tmp_project_with_lessons, monkeypatch):
+        for n in range(1, 4):
+            add_consultation(tmp_project_with_lessons, n, **_views(n))
+        calls = {"entries": 0, "lessons": 0}
+        load_entries = memory.FileBackend.load_entries
+        session_lessons = memory.FileBackend.session_lessons
+
+        def counting_entries(self, role):
+            calls["entries"] += 1
+            return load_entries(self, role)
+
+        def counting_lessons(self, sessions, limit=memory.ARCHIVE_LESSON_CAP):
+            calls["lessons"] += 1
+            return session_lessons(self, sessions, limit)
+
+        monkeypatch.setattr(memory.FileBackend, "load_entries", counting_entries)
+        monkeypatch.setattr(memory.FileBackend, "session_lessons", counting_lessons)
+        specs = ["strategist-alpha:3000", "strategist-beta:2500", "critic:3000", "architect:2000", "security-auditor:2000"]
+        lenses = [MemoryLens.resolve(spec, 4000) for spec in specs]
+        views = build_memory_views(tmp_project_with_lessons, goal="database schema migration", lenses=lenses)
+
+        assert list(views) == [lens.name for lens in lenses]
+        assert calls["entries"] == 3
+        assert calls["lessons"] == 1
+        for lens in lenses:
+            assert estimate_tokens(views[lens.name]) <= lens.budget
+            assert f"budget: {lens.budget} tokens" in views[lens.name]
+
+    def test_lens_reorders_by_role(self, tmp_project):
+        add_consultation(tmp_project, 1, **_views(1))
+        lenses = [MemoryLens.resolve("critic", 8000), MemoryLens.resolve("strategist", 8000)]
+        views = build_memory_views(tmp_project, goal="database rollout", lenses=lenses)
+        critic_view, strategist_view = views["critic"], views["strategist"]
+        assert critic_view.index("M-critic-001") < critic_view.index("M-strategist-001")
+        assert strategist_view.index("M-strategist-001") < strategist_view.index("M-critic-001")
+
+    def test_duplicate_names_rejected(self, tmp_project):
+        with pytest.raises(ValueError):
+            build_memory_views(tmp_project, goal="x", lenses=[MemoryLens("critic", 1000), MemoryLens("critic", 2000)])
@@ -0,0 +1,115 @@
+"""Tests for the session-offset index over lessons.jsonl."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    build_memory_response,
+    load_lessons_index,
+    read_session_lessons,
+    record_consultation,
+    refresh_lessons_index,
+)
+
+
+def _lessons_path(project_dir: str) -> Path:
+    return Path(project_dir) / ".council" / "memory" / "lessons.jsonl"
+
+
+def _write_lessons(project_dir: str, n: int, sessions: int = 3) -> list[dict]:
+    lessons = [
+        {"ts": "2026-01-01T00:00:00+00:00", "lesson": f"Lesson {i}", "source": "critic", "session": f"S-{i % sessions + 1:03d}"}
+        for i in range(n)
+    ]
+    with open(_lessons_path(project_dir), "w", encoding="utf-8") as f:
+        for lesson in lessons:
+            f.write(json.dumps(lesson) + "\n")
+    return lessons
+
+
+class TestLessonsIndex:
+    def test_record_persists_offsets(self, tmp_project):
+        record_consultation(
+            project_dir=tmp_project,
+            session_id="S-001",
+            goal="g",
+            strategist_summary="s",
+            critic_summary="c",
+            decision="d",
+            strategist_lesson="Strategist lesson.",
+            critic_lesson="Critic lesson ünïcode.",
+        )
+        sidecar = Path(tmp_project) / ".council" / "memory" / "lessons-index.json"
+        data = json.loads(sidecar.read_text(encoding="utf-8"))
+        assert data["count"] == 2
+        assert len(data["sessions"]["S-001"]) == 2
+        assert [l["lesson"] for l in read_session_lessons(tmp_project, {"S-001"})] == [
+            "Strategist lesson.",
+            "Critic lesson ünïcode.",
+        ]
+
+    def test_lookup_matches_full_scan(self, tmp_project):
+        lessons = _write_lessons(tmp_project, 700)
+        wanted = {"S-001", "S-003"}
+        expected = [l for l in lessons if l["session"] in wanted][-200:]
+        assert read_session_lessons(tmp_project, wanted) == expected
+
+    def test_rewritten_file_is_reindexed(self, tmp_project):
+        _write_lessons(tmp_project, 10, sessions=1)
+        assert load_lessons_index(tmp_project)["count"] == 10
+        # Same size, different sessions
+        _write_lessons(tmp_project, 10, sessions=2)
+        lidx = load_lessons_index(tmp_project)
+        assert set(lidx["sessions"]) == {"S-001", "S-002"}
+
+    def test_partial_trailing_line_not_indexed(self, tmp_project):
+        _write_lessons(tmp_project, 3, sessions=1)
+        with open(_lessons_path(tmp_project), "a", encoding="utf-8") as f:
+            f.write('{"lesson": "half wri')
+        assert load_lessons_index(tmp_project)["count"] == 3
+
+    def test_signpost_count_from_index(self, tmp_project_with_lessons):
+        output = build_memory_response(tmp_project_with_lessons, goal="database", max_tokens=4000)
+        assert "25 lessons archived" in output
+
+
+class TestReverseScan:
+    def test_matches_indexed_lookup(self, tmp_project, monkeypatch):
+        lessons = _write_lessons(tmp_project, 700)
+        wanted = {"S-002"}
+        monkeypatch.setattr(memory, "TAIL_BLOCK", 97)
+        scanned = read_session_lessons(tmp_project, wanted)
+        refresh_lessons_index(tmp_project)
+        assert read_session_lessons(tmp_project, wanted) == scanned
+        assert scanned == [l for l in lessons if l["session"] in wanted][-200:]
+
+    def test_stops_at_the_limit(self, tmp_project, monkeypatch):
+        _write_lessons(tmp_project, 1000, sessions=4)
+        seen = []
+        reverse_lines = memory._reverse_lines
+
+        def counting(f, *args):
+            for line in reverse_lines(f, *args):
+                seen.append(line)
+                yield line
+
+        monkeypatch.setattr(memory, "_reverse_lines", counting)
+        lessons = read_session_lessons(tmp_project, {"S-001"}, limit=10)
+        assert [l["lesson"] for l in lessons] == [f"Lesson {i}" for i in range(960, 1000, 4)]
+        assert len(seen) == 40
+
+    def test_rewritten_prefix_falls_back_to_scan(self, tmp_project):
+        _write_lessons(tmp_project, 10, sessions=1)
+        refresh_lessons_index(tmp_project)
+        expected = _write_lessons(tmp_project, 10, sessions=2)
+        assert read_session_lessons(tmp_project, {"S-002"}) == expected[1::2]
+
+    def test_partial_trailing_line_skipped(self, tmp_project):
+        lessons = _write_lessons(tmp_project, 3, sessions=1)
+        with open(_lessons_path(tmp_project), "a", encoding="utf-8") as f:
+            f.write('{"lesson": "half wri", "session": "S-001"')
+        assert read_session_lessons(tmp_project, {"S-001"}) == lessons
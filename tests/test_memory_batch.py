@@ -0,0 +1,96 @@
+"""Tests for batch goal retrieval (one load, one block per goal)."""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import build_memory_batch, build_memory_response
+from tests.conftest import add_consultation
+
+GOALS = [
+    "database schema migration",
+    "deploy docker on kubernetes",
+    "cache performance for the api",
+]
+
+
+@pytest.fixture
+def project(tmp_project_with_lessons):
+    for n, lesson in enumerate(
+        [
+            "Run schema migration in batches on PostgreSQL.",
+            "Kubernetes deploys need readiness probes.",
+            "Cache API responses close to the edge.",
+            "Docker images should be pinned by digest.",
+        ],
+        start=1,
+    ):
+        add_consultation(
+            tmp_project_with_lessons, n, goal=f"consultation {n} about {lesson}", strategist_lesson=lesson,
+            critic_lesson=f"Critic angle on {lesson}",
+        )
+    return tmp_project_with_lessons
+
+
+def _entry_ids(block: str) -> set[str]:
+    return set(re.findall(r"^- (M-[a-z]+-\d+) ", block, flags=re.MULTILINE))
+
+
+class TestMemoryBatch:
+    @pytest.mark.parametrize("budget", [600, 1500, 4000])
+    @pytest.mark.parametrize("ranking", ["overlap", "bm25"])
+    def test_blocks_match_single_loads(self, project, budget, ranking):
+        blocks = build_memory_batch(project, GOALS, max_tokens=budget, ranking=ranking)
+        assert blocks == [
+            build_memory_response(project, goal=goal, max_tokens=budget, ranking=ranking) for goal in GOALS
+        ]
+
+    def test_tiers_loaded_once(self, project, monkeypatch):
+        calls = {"index": 0, "entries": 0}
+        load_index = memory.FileBackend.load_index
+        load_entries = memory.FileBackend.load_entries
+
+        def counting_index(self):
+            calls["index"] += 1
+            return load_index(self)
+
+        def counting_entries(self, role):
+            calls["entries"] += 1
+            return load_entries(self, role)
+
+        monkeypatch.setattr(memory.FileBackend, "load_index", counting_index)
+        monkeypatch.setattr(memory.FileBackend, "load_entries", counting_entries)
+        build_memory_batch(project, GOALS, max_tokens=4000)
+        assert calls == {"index": 1, "entries": 3}
+
+    def test_entry_features_shared_across_goals(self, project, monkeypatch):
+        computed = []
+        original = memory._entry_features
+
+        def spy(entry, now):
+            computed.append(entry.id)
+            return original(entry, now)
+
+        monkeypatch.setattr(memory, "_entry_features", spy)
+        build_memory_batch(project, GOALS * 3, max_tokens=4000)
+        assert len(computed) == len(set(computed))
+
+    def test_dedupe_skips_entries_shown_earlier(self, project):
+        plain = build_memory_batch(project, GOALS, max_tokens=4000)
+        deduped = build_memory_batch(project, GOALS, max_tokens=4000, dedupe=True)
+        assert deduped[0] == plain[0]
+        assert deduped[1] != plain[1]
+        seen = _entry_ids(deduped[0])
+        for block in deduped[1:]:
+            ids = _entry_ids(block)
+            assert not ids & seen
+            seen |= ids
+
+    def test_unknown_ranking(self, project):
+        with pytest.raises(ValueError):
+            build_memory_batch(project, GOALS, ranking="tfidf")
@@ -0,0 +1,78 @@
+"""Tests for the in-process, stat-validated parse cache."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    build_memory_response,
+    invalidate_memory_cache,
+    load_active,
+    load_index,
+    record_consultation,
+    save_active,
+)
+
+
+def _count_parses(monkeypatch) -> list:
+    calls = []
+    original = json.loads
+
+    def spy(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(memory.json, "loads", spy)
+    return calls
+
+
+class TestParseCache:
+    def test_repeated_loads_skip_parsing(self, tmp_project_with_entries, monkeypatch):
+        first = load_active(tmp_project_with_entries, "strategist")
+        calls = _count_parses(monkeypatch)
+        assert load_active(tmp_project_with_entries, "strategist") is first
+        load_index(tmp_project_with_entries)
+        load_index(tmp_project_with_entries)
+        assert len(calls) <= 1  # index parsed at most once
+
+    def test_save_primes_cache(self, tmp_project, monkeypatch):
+        data = {"version": 2, "role": "critic", "entries": [{"id": "M-critic-001", "text": "x"}]}
+        save_active(tmp_project, "critic", data)
+        calls = _count_parses(monkeypatch)
+        assert load_active(tmp_project, "critic") is data
+        assert calls == []
+
+    def test_external_edit_invalidates(self, tmp_project_with_entries):
+        load_active(tmp_project_with_entries, "critic")
+        path = Path(tmp_project_with_entries) / ".council" / "memory" / "critic-active.json"
+        path.write_text(json.dumps({"version": 2, "role": "critic", "entries": [{"id": "M-critic-009"}]}), encoding="utf-8")
+        assert load_active(tmp_project_with_entries, "critic")["entries"][0]["id"] == "M-critic-009"
+
+    def test_warm_consultation_loads_parse_nothing(self, tmp_project, monkeypatch):
+        record_consultation(
+            project_dir=tmp_project,
+            session_id="S-001",
+            goal="database pooling",
+            strategist_summary="s",
+            critic_summary="c",
+            decision="d",
+            strategist_lesson="Use pgbouncer.",
+            critic_lesson="Watch pool saturation.",
+            hub_lesson="Record pool sizes.",
+        )
+        build_memory_response(tmp_project, goal="database pooling", max_tokens=4000)
+        reads = []
+        original = Path.read_text
+        monkeypatch.setattr(Path, "read_text", lambda self, *a, **k: reads.append(self.name) or original(self, *a, **k))
+        build_memory_response(tmp_project, goal="database pooling", max_tokens=4000)
+        assert reads == []
+
+    def test_invalidate_drops_project(self, tmp_project_with_entries, monkeypatch):
+        load_active(tmp_project_with_entries, "strategist")
+        invalidate_memory_cache(tmp_project_with_entries)
+        calls = _count_parses(monkeypatch)
+        load_active(tmp_project_with_entries, "strategist")
+        assert len(calls) == 1
@@ -20,6 +20,7 @@ from memory import (
     load_active,
     load_index,
     record_consultation,
+    save_index,
 )
 
 
@@ -313,9 +314,10 @@ class TestStaleMarker:
         assert loaded["version"] == 2
         assert loaded["consultation_count"] == 3  # data preserved
 
-        # File should be written back as v2
-        on_disk = json.loads((memory_dir / "index.json").read_text(encoding="utf-8"))
-        assert on_disk["version"] == 2
+        # Loads never write (they run under a shared lock); the next save stores v2.
+        assert json.loads((memory_dir / "index.json").read_text(encoding="utf-8"))["version"] == 1
+        save_index(tmp_project, loaded)
+        assert json.loads((memory_dir / "index.json").read_text(encoding="utf-8"))["version"] == 2
 
 
 # ===========================================================================
@@ -0,0 +1,123 @@
+"""Tests for the optimal (multiple-choice knapsack) budget packer."""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    MemoryEntry,
+    MemoryLens,
+    _entry_choices,
+    _pack_entries,
+    _pack_entries_optimal,
+    build_memory_batch,
+    build_memory_response,
+    build_memory_views,
+    estimate_tokens,
+    save_active,
+)
+
+NOW = datetime.now(timezone.utc)
+TIER0 = "## Your Memory (0 consultations, budget: 1500 tokens)\n"
+
+
+def _entry(n: int, words: int, importance: int = 5) -> MemoryEntry:
+    text = f"Lesson {n} about the cache tier. " + " ".join(f"detail{n}-{i}" for i in range(words))
+    return MemoryEntry.from_dict({
+        "id": f"M-strategist-{n:03d}",
+        "topics": ["performance"],
+        "text": text,
+        "headline": f"Lesson {n} about the cache tier.",
+        "importance": importance,
+        "created": NOW.isoformat(),
+        "last_validated": NOW.isoformat(),
+    })
+
+
+def _value(sections: list[str], all_entries: list[tuple[float, MemoryEntry]]) -> float:
+    """Captured value: score x level value of every packed line."""
+    values = {}
+    for score, entry in all_entries:
+        for line, _, level in _entry_choices(entry, NOW):
+            values[line] = score * level
+    return sum(values.get(line, 0.0) for line in sections)
+
+
+@pytest.fixture
+def blocked_entries():
+    """One long top entry ahead of many short, nearly as relevant ones."""
+    entries = [(0.9, _entry(1, 900, importance=9))]
+    entries += [(0.8 - n * 0.01, _entry(n, 30)) for n in range(2, 40)]
+    return entries
+
+
+class TestSolver:
+    def test_never_exceeds_budget(self, blocked_entries):
+        for max_tokens in (1100, 1500, 2600, 4000, 8000):
+            remaining = max_tokens - estimate_tokens(TIER0)
+            sections, used, _ = _pack_entries_optimal(TIER0, blocked_entries, remaining, "cache", NOW)
+            assert estimate_tokens("\n".join(sections).strip()) <= max_tokens
+            assert used <= remaining
+
+    def test_beats_greedy_when_a_long_entry_blocks(self, blocked_entries):
+        for remaining in (2600, 3000, 4000):
+            greedy, _, _ = _pack_entries(TIER0, blocked_entries, remaining, "cache", NOW)
+            optimal, _, _ = _pack_entries_optimal(TIER0, blocked_entries, remaining, "cache", NOW)
+            assert _value(optimal, blocked_entries) > _value(greedy, blocked_entries)
+
+    def test_uses_summary_level(self):
+        entries = [(0.9, _entry(1, 900, importance=9))]
+        sections, _, _ = _pack_entries_optimal(TIER0, entries, 300, "cache", NOW)
+        assert sections[2].endswith("...")
+        assert len(sections[2].split()) < 60
+
+    def test_output_in_score_order(self, blocked_entries):
+        _, _, packed = _pack_entries_optimal(TIER0, blocked_entries, 1500, "cache", NOW)
+        order = [e.id for _, e in blocked_entries]
+        assert [e.id for e in packed] == sorted((e.id for e in packed), key=order.index)
+
+    def test_time_bound_falls_back_to_greedy(self, blocked_entries):
+        greedy = _pack_entries(TIER0, blocked_entries, 1500, "cache", NOW)
+        assert _pack_entries_optimal(TIER0, blocked_entries, 1500, "cache", NOW, time_limit=-1.0) == greedy
+
+
+class TestPackingMode:
+    @pytest.fixture
+    def project(self, tmp_project_with_lessons):
+        entries = [e.to_dict() for e in [_entry(1, 900, importance=9)] + [_entry(n, 30) for n in range(2, 30)]]
+        save_active(tmp_project_with_lessons, "strategist", {"version": 1, "role": "strategist", "entries": entries})
+        return tmp_project_with_lessons
+
+    def test_greedy_is_default(self, project):
+        for budget in (600, 1500, 4000):
+            assert build_memory_response(project, goal="cache", max_tokens=budget) == build_memory_response(
+                project, goal="cache", max_tokens=budget, packing="greedy"
+            )
+
+    def test_optimal_packs_more_within_budget(self, project):
+        for budget in (1500, 2500, 4000):
+            greedy = build_memory_response(project, goal="cache tier", max_tokens=budget)
+            optimal = build_memory_response(project, goal="cache tier", max_tokens=budget, packing="optimal")
+            assert estimate_tokens(optimal) <= budget
+            assert optimal.count("- M-") >= greedy.count("- M-")
+
+    def test_views_and_batch_accept_packing(self, project):
+        expected = build_memory_response(project, goal="cache", max_tokens=2000, packing="optimal")
+        view = build_memory_views(project, goal="cache", lenses=[MemoryLens("all", 2000)], packing="optimal")
+        assert view["all"] == expected
+        assert build_memory_batch(project, ["cache"], max_tokens=2000, packing="optimal") == [expected]
+
+    def test_unknown_packing_rejected(self, project):
+        with pytest.raises(ValueError, match="Unknown packing"):
+            build_memory_response(project, goal="cache", packing="fastest")
+
+    def test_solver_timeout_matches_greedy(self, project, monkeypatch):
+        monkeypatch.setattr(memory, "PACKING_TIME_LIMIT", -1.0)
+        assert build_memory_response(project, goal="cache", max_tokens=1500, packing="optimal") == (
+            build_memory_response(project, goal="cache", max_tokens=1500)
+        )
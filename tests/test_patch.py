@@ -0,0 +1,138 @@
+"""Tests for patch-based compaction: small edits checked against the role's generation."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory
+from memory import apply_compaction, load_active, load_index, patch_entries, record_consultation, role_generation
+from src import server
+
+
+def _ids(project_dir: str, role: str = "strategist") -> list[str]:
+    return [e["id"] for e in load_active(project_dir, role)["entries"]]
+
+
+class TestPatchEntries:
+    def test_delete_update_and_pin(self, tmp_project_with_entries):
+        ops = [
+            {"op": "delete", "ids": ["M-strategist-003"]},
+            {"op": "update", "id": "M-strategist-002", "importance": 4, "detail_level": 2},
+            {"op": "unpin", "id": "M-hub-001"},
+        ]
+        assert patch_entries(tmp_project_with_entries, "strategist", ops, 0) == 1
+
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert [e["id"] for e in entries] == ["M-strategist-001", "M-strategist-002", "M-hub-001"]
+        assert (entries[1]["importance"], entries[1]["detail_level"]) == (4, 2)
+        assert entries[2]["pinned"] is False
+        assert all(e["features"] == memory._derive_features(e) for e in entries[1:])
+        index = load_index(tmp_project_with_entries)
+        assert index["generations"] == {"strategist": 1}
+        assert index["compaction_watermark"] == "S-000"
+
+    def test_merge_replaces_the_group_with_a_new_entry(self, tmp_project_with_entries):
+        ops = [{
+            "op": "merge",
+            "ids": ["M-strategist-003", "M-strategist-002"],
+            "entry": {"text": "Use PostgreSQL, with Redis as a 5-minute API cache.", "topics": ["database"]},
+        }]
+        patch_entries(tmp_project_with_entries, "strategist", ops, 0)
+
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        assert [e["id"] for e in entries] == ["M-strategist-001", "M-strategist-004", "M-hub-001"]
+        merged = entries[1]
+        assert merged["headline"] == "Use PostgreSQL, with Redis as a 5-minute API cache."
+        assert merged["topics"] == ["database"]
+        assert merged["importance"] == 7
+        assert merged["source_sessions"] == ["S-002", "S-003"]
+        assert merged["supersedes"] == ["M-strategist-002", "M-strategist-003"]
+        assert merged["features"] == memory._derive_features(merged)
+
+    def test_merging_unscored_entries_keeps_the_default_importance(self, tmp_project_with_entries):
+        entries = load_active(tmp_project_with_entries, "strategist")["entries"]
+        apply_compaction(
+            tmp_project_with_entries, "strategist", [{k: v for k, v in e.items() if k != "importance"} for e in entries]
+        )
+        ops = [{"op": "merge", "ids": ["M-strategist-001", "M-strategist-002"], "entry": {"text": "Merged."}}]
+        patch_entries(tmp_project_with_entries, "strategist", ops, 1)
+        merged = load_active(tmp_project_with_entries, "strategist")["entries"][0]
+        assert merged["importance"] == memory.UNSCORED_IMPORTANCE
+
+    def test_stale_generation_is_rejected(self, tmp_project_with_entries):
+        patch_entries(tmp_project_with_entries, "strategist", [{"op": "pin", "id": "M-strategist-001"}], 0)
+        with pytest.raises(ValueError, match="generation 1, not 0"):
+            patch_entries(tmp_project_with_entries, "strategist", [{"op": "delete", "ids": ["M-hub-001"]}], 0)
+        assert "M-hub-001" in _ids(tmp_project_with_entries)
+
+    @pytest.mark.parametrize("bad", [
+        {"op": "delete", "ids": ["M-strategist-404"]},
+        {"op": "update", "id": "M-strategist-001", "importance": 11},
+        {"op": "update", "id": "M-strategist-001", "created": "2020-01-01"},
+        {"op": "merge", "ids": ["M-strategist-001"], "entry": {}},
+        {"op": "rename", "id": "M-strategist-001"},
+        {"op": "delete", "ids": [["M-strategist-001"]]},
+        {"op": "update", "id": ["M-strategist-001"], "importance": 4},
+    ])
+    def test_invalid_op_applies_nothing(self, tmp_project_with_entries, bad):
+        before = load_active(tmp_project_with_entries, "strategist")["entries"]
+        with pytest.raises(ValueError, match="^Operation 2\\b"):
+            patch_entries(tmp_project_with_entries, "strategist", [{"op": "delete", "ids": ["M-hub-001"]}, bad], 0)
+        assert load_active(tmp_project_with_entries, "strategist")["entries"] == before
+        assert role_generation(load_index(tmp_project_with_entries), "strategist") == 0
+
+
+class TestGenerations:
+    def test_writes_advance_only_the_roles_they_touch(self, tmp_project_with_entries):
+        record_consultation(
+            project_dir=tmp_project_with_entries,
+            session_id=None,
+            goal="g",
+            strategist_summary="s",
+            critic_summary="c",
+            decision="d",
+            critic_lesson="Load-test the queue before launch.",
+        )
+        apply_compaction(tmp_project_with_entries, "hub", [])
+        assert load_index(tmp_project_with_entries)["generations"] == {"critic": 1, "hub": 1}
+
+
+class TestPatchTool:
+    def test_reports_new_generation(self, tmp_project_with_entries):
+        ops = json.dumps([{"op": "delete", "ids": ["M-strategist-003"]}])
+        output = asyncio.run(server.council_memory_patch(tmp_project_with_entries, "strategist", ops, 0))
+        assert output == "Patched strategist active memory: 1 operations applied. Generation is now 1."
+        status = asyncio.run(server.council_memory_status(tmp_project_with_entries))
+        assert "log=0 lines, generation 1 — " in status
+
+    def test_malformed_ids_are_reported(self, tmp_project_with_entries):
+        ops = json.dumps([{"op": "delete", "ids": [["M-strategist-003"]]}])
+        output = asyncio.run(server.council_memory_patch(tmp_project_with_entries, "strategist", ops, 0))
+        assert output == "Patch not applied: Operation 1 (delete): needs distinct entry ids (strings)."
+
+    def test_conflict_is_reported(self, tmp_project_with_entries):
+        ops = json.dumps([{"op": "delete", "ids": ["M-strategist-003"]}])
+        output = asyncio.run(server.council_memory_patch(tmp_project_with_entries, "strategist", ops, 3))
+        assert output.startswith("Patch not applied: strategist is at generation 0, not 3")
+
+    def test_full_reset_rejects_patches_built_before_it(self, tmp_project_with_entries):
+        asyncio.run(server.council_memory_reset(tmp_project_with_entries, full=True))
+        record_consultation(
+            project_dir=tmp_project_with_entries,
+            session_id=None,
+            goal="g",
+            strategist_summary="s",
+            critic_summary="c",
+            decision="d",
+            strategist_lesson="Load-test the queue before launch.",
+        )
+        assert role_generation(load_index(tmp_project_with_entries), "strategist") == 2
+        ops = json.dumps([{"op": "delete", "ids": ["M-strategist-001"]}])
+        output = asyncio.run(server.council_memory_patch(tmp_project_with_entries, "strategist", ops, 0))
+        assert output.startswith("Patch not applied: strategist is at generation 2, not 0")
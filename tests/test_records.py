@@ -0,0 +1,86 @@
+"""Tests for the slotted MemoryEntry and Lesson records used on the retrieval path."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    GoalQuery,
+    Lesson,
+    MemoryEntry,
+    _score_lesson,
+    apply_compaction,
+    build_memory_response,
+    compute_relevance,
+    get_backend,
+    load_active,
+)
+from tests.conftest import add_consultation
+
+
+class TestRoundTrip:
+    def test_recorded_entries(self, tmp_project):
+        for n in range(1, 4):
+            add_consultation(
+                tmp_project, n, goal=f"database schema migration {n}",
+                strategist_lesson=f"Lesson {n}: batch the PostgreSQL schema migration.",
+                critic_lesson=f"Rollback plan {n} for the migration.",
+            )
+        for entry in load_active(tmp_project, "strategist")["entries"]:
+            record = MemoryEntry.from_dict(entry)
+            assert record.to_dict() == entry
+            assert record.extra is None
+            assert record.stored is entry["features"]
+
+    def test_unknown_keys_and_nulls_survive(self):
+        data = {"id": "M-hub-001", "text": "t", "headline": None, "owner": "ops", "topics": []}
+        record = MemoryEntry.from_dict(data)
+        assert record.headline is None
+        assert record.extra == {"headline": None, "owner": "ops"}
+        assert record.to_dict() == data
+        assert MemoryEntry.from_json(json.dumps(data)).to_dict() == data
+
+    def test_lessons(self):
+        for data in (
+            {"ts": "2026-01-01T00:00:00+00:00", "lesson": "Pool connections.", "source": "critic", "session": "S-001"},
+            {"lesson": "No session.", "source": None, "tags": ["db"]},
+            {},
+        ):
+            lesson = Lesson.from_dict(data)
+            assert lesson.to_dict() == data
+            assert Lesson.from_json(json.dumps(data)).to_dict() == data
+
+    def test_records_use_slots(self):
+        for record in (MemoryEntry(), Lesson()):
+            assert not hasattr(record, "__dict__")
+            with pytest.raises(AttributeError):
+                record.unknown = 1
+
+
+class TestRetrievalRecords:
+    def test_records_cached_per_file_version(self, tmp_project_with_entries):
+        backend = get_backend(tmp_project_with_entries)
+        records = backend.load_records("strategist")
+        assert get_backend(tmp_project_with_entries).load_records("strategist") is records
+
+        kept = load_active(tmp_project_with_entries, "strategist")["entries"][:1]
+        apply_compaction(tmp_project_with_entries, "strategist", kept)
+        assert [r.id for r in backend.load_records("strategist")] == ["M-strategist-001"]
+
+    def test_dict_and_record_scores_agree(self, tmp_project_with_entries):
+        query = GoalQuery.from_goal("deploy docker database")
+        for entry in load_active(tmp_project_with_entries, "strategist")["entries"]:
+            assert compute_relevance(entry, query) == compute_relevance(MemoryEntry.from_dict(entry), query)
+            assert memory._stale_marker(entry) == memory._stale_marker(MemoryEntry.from_dict(entry))
+        lesson = {"lesson": "Deploy docker images nightly.", "source": "hub"}
+        assert _score_lesson(lesson, query) == _score_lesson(Lesson.from_dict(lesson), query) > 0
+
+    def test_archived_lessons_in_output(self, tmp_project_with_lessons):
+        output = build_memory_response(tmp_project_with_lessons, goal="database schema migration", max_tokens=4000)
+        assert "### Archived Lessons" in output
+        assert "PostgreSQL" in output
@@ -0,0 +1,175 @@
+"""Tests for the inverted index sidecar over active memory entries."""
+
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    MemoryLens,
+    build_memory_batch,
+    build_memory_response,
+    build_memory_views,
+    load_active,
+    load_retrieval_index,
+    save_active,
+)
+from tests.conftest import add_consultation
+
+
+class TestIndexMaintenance:
+    def test_record_indexes_terms_and_topics(self, tmp_project):
+        add_consultation(
+            tmp_project, 1, numbered=True, strategist_lesson="Use PostgreSQL with pgbouncer for connection pooling.",
+        )
+        role = load_retrieval_index(tmp_project)["roles"]["strategist"]
+        assert role["terms"]["pgbouncer"] == ["M-strategist-001"]
+        assert "M-strategist-001" in role["topics"]["database"]
+
+    def test_trailing_index_is_caught_up_on_load(self, tmp_project):
+        add_consultation(
+            tmp_project, 1, numbered=True, strategist_lesson="Use PostgreSQL with pgbouncer for connection pooling.",
+        )
+        add_consultation(tmp_project, 2, numbered=True, strategist_lesson="Deploy on kubernetes.")
+        stored = load_retrieval_index(tmp_project)
+        assert "kubernetes" not in stored["roles"]["strategist"]["terms"]
+        assert "M-strategist-002" in build_memory_response(tmp_project, goal="kubernetes", max_tokens=1500)
+        backend = memory.get_backend(tmp_project)
+        assert backend.candidate_keys("strategist", memory.GoalQuery.from_goal("kubernetes")) == {"M-strategist-002"}
+
+    def test_index_rewritten_every_few_records(self, tmp_project):
+        for n in range(1, memory.RETRIEVAL_INDEX_EVERY + 1):
+            add_consultation(tmp_project, n, numbered=True, strategist_lesson=f"Lesson {n} on pgbouncer.")
+        stored = load_retrieval_index(tmp_project)
+        assert stored["count"] == memory.RETRIEVAL_INDEX_EVERY
+        assert len(stored["roles"]["strategist"]["docs"]) == memory.RETRIEVAL_INDEX_EVERY
+
+    def test_compaction_reindexes_role(self, tmp_project):
+        add_consultation(tmp_project, 1, numbered=True, strategist_lesson="Use PostgreSQL with pgbouncer.")
+        add_consultation(tmp_project, 2, numbered=True, strategist_lesson="Deploy on kubernetes.")
+        active = load_active(tmp_project, "strategist")
+        active["entries"] = active["entries"][1:]
+        save_active(tmp_project, "strategist", active)
+
+        role = load_retrieval_index(tmp_project)["roles"]["strategist"]
+        assert "pgbouncer" not in role["terms"]
+        assert role["terms"]["kubernetes"] == ["M-strategist-002"]
+
+
+class TestIndexedRetrieval:
+    def test_output_identical_with_and_without_index(self, tmp_project):
+        for n, lesson in enumerate([
+            "Use PostgreSQL with pgbouncer for connection pooling.",
+            "Deploy on kubernetes with helm charts.",
+            "Cache API responses in redis.",
+            "React components should stay small.",
+            "Rotate JWT secrets monthly.",
+        ], start=1):
+            add_consultation(tmp_project, n, numbered=True, strategist_lesson=lesson)
+
+        goals = ["database pooling", "k8s deploy", "frontend react", "unrelated words", ""]
+        budgets = [1500, 3000, 6000]
+        indexed = [build_memory_response(tmp_project, goal=g, max_tokens=b) for g in goals for b in budgets]
+
+        (Path(tmp_project) / ".council" / "memory" / "retrieval-index.json").unlink()
+        scanned = [build_memory_response(tmp_project, goal=g, max_tokens=b) for g in goals for b in budgets]
+        assert indexed == scanned
+
+    def test_only_candidates_are_fully_scored(self, tmp_project, monkeypatch):
+        for n in range(1, 21):
+            add_consultation(
+                tmp_project, n, numbered=True, strategist_lesson=f"Unrelated note number {n} about gardening.",
+            )
+        add_consultation(tmp_project, 21, numbered=True, strategist_lesson="Use PostgreSQL with pgbouncer.")
+
+        scored = []
+        original = memory._entry_features
+
+        def spy(entry, now):
+            scored.append(entry.id)
+            return original(entry, now)
+
+        monkeypatch.setattr(memory, "_entry_features", spy)
+        output = build_memory_response(tmp_project, goal="pgbouncer", max_tokens=4000)
+        assert scored == ["M-strategist-021"]
+        assert "M-strategist-021" in output
+
+    def test_stale_sidecar_falls_back_to_scan(self, tmp_project):
+        add_consultation(tmp_project, 1, numbered=True, strategist_lesson="Deploy on kubernetes.")
+        active_path = Path(tmp_project) / ".council" / "memory" / "strategist-active.json"
+        data = json.loads(active_path.read_text(encoding="utf-8"))
+        data["entries"].append({
+            "id": "M-strategist-099",
+            "topics": [],
+            "text": "Hand-edited entry about pgbouncer.",
+            "headline": "Hand-edited entry.",
+            "importance": 1,
+        })
+        active_path.write_text(json.dumps(data), encoding="utf-8")
+
+        output = build_memory_response(tmp_project, goal="pgbouncer", max_tokens=4000)
+        assert "### Relevant to this goal\n- M-strategist-099" in output
+
+
+def _seed_entries(project_dir: str, count: int) -> None:
+    """``count`` strategist entries of mixed importance and age; every tenth mentions pgbouncer."""
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    entries = []
+    for n in range(1, count + 1):
+        stamp = (now - timedelta(days=rng.randint(0, 60))).isoformat()
+        subject = "pgbouncer pooling" if n % 10 == 0 else f"gardening plot {n}"
+        entries.append({
+            "id": f"M-strategist-{n:03d}",
+            "topics": ["security"] if n % 7 == 0 else [],
+            "text": f"Note {n} on {subject}. " + "Some more words to pad the note. " * rng.randint(0, 6),
+            "importance": rng.choice([None, 2, 4, 5, 7, 9]),
+            "pinned": n % 50 == 0,
+            "created": stamp,
+            "last_validated": stamp,
+        })
+    path = Path(project_dir) / ".council" / "memory" / "strategist-active.json"
+    path.write_text(json.dumps({"version": 2, "role": "strategist", "entries": entries}), encoding="utf-8")
+
+
+class TestBudgetedScoring:
+    def _unbudgeted(self, monkeypatch):
+        original = memory._Retrieval.score
+        monkeypatch.setattr(
+            memory._Retrieval, "score", lambda self, query, ranking, *args: original(self, query, ranking)
+        )
+
+    def test_output_identical_to_scoring_everything(self, tmp_project, monkeypatch):
+        _seed_entries(tmp_project, 300)
+        lenses = [MemoryLens.resolve("security-auditor:1200", 0), MemoryLens.resolve("planner:3000", 0)]
+
+        def loads():
+            return (
+                [build_memory_response(tmp_project, goal=g, max_tokens=b, ranking=r)
+                 for g in ["pgbouncer pooling", "unrelated words", ""]
+                 for b in [1500, 3000, 6000]
+                 for r in ["overlap", "bm25"]],
+                build_memory_views(tmp_project, goal="pgbouncer", lenses=lenses),
+                build_memory_batch(tmp_project, ["pgbouncer", "gardening", "pooling"], max_tokens=1500, dedupe=True),
+            )
+
+        budgeted = loads()
+        self._unbudgeted(monkeypatch)
+        assert budgeted == loads()
+
+    def test_unmatched_entries_scored_up_to_budget(self, tmp_project, monkeypatch):
+        _seed_entries(tmp_project, 300)
+        seen = []
+        original = memory._unmatched_relevance
+
+        def spy(entry, now):
+            seen.append(entry.id)
+            return original(entry, now)
+
+        monkeypatch.setattr(memory, "_unmatched_relevance", spy)
+        build_memory_response(tmp_project, goal="pgbouncer", max_tokens=1500)
+        assert 0 < len(seen) < 150
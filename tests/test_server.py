@@ -0,0 +1,92 @@
+"""Tests for the MCP tool layer: blocking tool bodies run off the event loop."""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import server
+
+
+async def _until(event: threading.Event, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not event.is_set():
+        assert time.monotonic() < deadline, "worker never started"
+        await asyncio.sleep(0.01)
+
+
+class TestOffload:
+    def test_status_completes_while_load_in_flight(self, tmp_project_with_lessons, monkeypatch):
+        project = tmp_project_with_lessons
+        started, release = threading.Event(), threading.Event()
+        original = server.build_memory_response
+
+        def slow_load(*args, **kwargs):
+            started.set()
+            release.wait(10)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(server, "build_memory_response", slow_load)
+
+        async def scenario():
+            load = asyncio.create_task(server.council_memory_load(project, goal="database schema", max_tokens=4000))
+            await _until(started)
+            status = await asyncio.wait_for(server.council_memory_status(project), 5)
+            in_flight = not load.done()
+            release.set()
+            return status, in_flight, await asyncio.wait_for(load, 10)
+
+        status, in_flight, output = asyncio.run(scenario())
+        assert status.startswith("# Council Status")
+        assert in_flight
+        assert "### Archived Lessons" in output
+
+    def test_writers_to_one_project_run_one_at_a_time(self, tmp_project, monkeypatch):
+        active = []
+        overlap = []
+        original = server.record_consultation
+
+        def tracked_record(**kwargs):
+            active.append(kwargs["goal"])
+            overlap.append(len(active))
+            time.sleep(0.02)
+            try:
+                return original(**kwargs)
+            finally:
+                active.remove(kwargs["goal"])
+
+        monkeypatch.setattr(server, "record_consultation", tracked_record)
+
+        async def scenario():
+            return await asyncio.gather(*(
+                server.council_memory_record(
+                    tmp_project, goal=f"goal {n}", strategist_summary="s", critic_summary="c", decision=f"decision {n}"
+                )
+                for n in range(6)
+            ))
+
+        results = asyncio.run(scenario())
+        assert max(overlap) == 1
+        assert sorted(results) == sorted(
+            f"Recorded consultation S-{n:03d}. Memory updated across all tiers." for n in range(1, 7)
+        )
+
+    def test_tools_keep_their_schemas(self, tmp_project):
+        async def scenario():
+            tools = {tool.name: tool for tool in await server.mcp.list_tools()}
+            _, result = await server.mcp.call_tool("council_memory_load", {"project_dir": tmp_project, "goal": "x"})
+            return tools, result["result"]
+
+        tools, output = asyncio.run(scenario())
+        assert len(tools) == 14
+        assert set(tools["council_memory_load"].inputSchema["properties"]) == {
+            "project_dir", "goal", "max_tokens", "ranking", "lenses", "packing"
+        }
+        assert output.startswith("## Your Memory")
+
+    def test_duplicate_lenses_return_a_message(self, tmp_project):
+        output = asyncio.run(server.council_memory_load(tmp_project, goal="x", lenses=["critic", "critic:2000"]))
+        assert output == "Duplicate lens names: critic, critic"
@@ -0,0 +1,172 @@
+"""Tests for the compiled topic matcher behind extract_topics."""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from memory import (
+    KEYWORD_CAP,
+    SYNONYM_MAP,
+    TOPIC_KEYWORDS,
+    _grow_topic_keywords,
+    extract_topics,
+    get_topic_matcher,
+    load_index,
+    record_consultation,
+)
+
+
+def _reference_extract_topics(text: str, topic_index: dict | None = None) -> set[str]:
+    """The original nested-substring implementation, kept as the oracle."""
+    raw_words = set(re.findall(r"[a-z0-9-]+", text.lower()))
+    expanded = {SYNONYM_MAP[w] for w in raw_words if w in SYNONYM_MAP}
+    word_seq = re.findall(r"[a-z0-9]+", text.lower())
+    bigrams = {f"{word_seq[i]}-{word_seq[i+1]}" for i in range(len(word_seq) - 1)}
+    words = raw_words | expanded | bigrams
+
+    keyword_map = {t: list(kws) for t, kws in TOPIC_KEYWORDS.items()}
+    if topic_index:
+        for topic, info in topic_index.items():
+            dynamic_kws = info.get("keywords", [])
+            if topic in keyword_map:
+                keyword_map[topic] = list(set(keyword_map[topic] + dynamic_kws))
+            else:
+                keyword_map[topic] = dynamic_kws
+    return {
+        topic for topic, keywords in keyword_map.items()
+        if keywords and any(kw in words or any(kw in w for w in words) for kw in keywords)
+    }
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdeilmnorst-") for _ in range(rng.randint(2, 9))).strip("-") or "x"
+
+
+class TestMatcherParity:
+    def test_seed_keywords_match_reference(self):
+        for text in [
+            "we need a database migration script",
+            "deploy the docker container and run tests",
+            "handle rate limit throttling",
+            "jenkins pipeline on eks with redis cache",
+            "data database dataset",
+            "",
+        ]:
+            assert extract_topics(text) == _reference_extract_topics(text)
+
+    def test_overlapping_keywords_all_reported(self):
+        # "data" is a prefix of "database"; both topics must fire
+        topics = extract_topics("database")
+        assert {"data", "database"} <= topics
+
+    def test_randomized_dynamic_index_matches_reference(self):
+        rng = random.Random(1234)
+        for _ in range(200):
+            topic_index = {
+                f"topic-{t}": {"keywords": [_random_word(rng) for _ in range(rng.randint(0, 6))]}
+                for t in range(rng.randint(0, 8))
+            }
+            if rng.random() < 0.3:
+                topic_index["database"] = {"keywords": [_random_word(rng)]}
+            text = " ".join(_random_word(rng) for _ in range(rng.randint(0, 12)))
+            assert extract_topics(text, topic_index) == _reference_extract_topics(text, topic_index)
+
+    def test_empty_keyword_matches_any_nonempty_text(self):
+        topic_index = {"odd": {"keywords": [""]}}
+        assert "odd" in extract_topics("anything", topic_index)
+        assert "odd" not in extract_topics("", topic_index)
+
+    def test_topic_without_keywords_never_matches(self):
+        assert "empty" not in extract_topics("empty words", {"empty": {"keywords": []}})
+
+
+class TestMatcherCache:
+    def test_matcher_reused_while_index_unchanged(self):
+        topic_index = {"billing": {"keywords": ["invoice", "stripe"]}}
+        assert get_topic_matcher(topic_index) is get_topic_matcher(dict(topic_index))
+
+    def test_matcher_rebuilt_when_keywords_change(self):
+        topic_index = {"billing": {"keywords": ["invoice"]}}
+        before = get_topic_matcher(topic_index)
+        assert "billing" not in extract_topics("stripe webhook", topic_index)
+
+        topic_index["billing"]["keywords"].append("stripe")
+        assert get_topic_matcher(topic_index) is not before
+        assert "billing" in extract_topics("stripe webhook", topic_index)
+
+
+class TestKeywordModel:
+    def test_eviction_is_deterministic(self):
+        entry = {"keywords": []}
+        _grow_topic_keywords(entry, {"invoice", "stripe"}, 1)
+        for n in range(2, 8):
+            _grow_topic_keywords(entry, {f"word{n}{i:02d}" for i in range(10)} | {"invoice"}, n)
+        assert len(entry["keywords"]) == KEYWORD_CAP
+        assert entry["keywords"][0] == "invoice"
+        assert entry["keyword_stats"]["invoice"] == [7, 7]
+        # Equal scores fall back to keyword order, so the newest batch is kept in sorted order
+        assert entry["keywords"][1:11] == sorted(f"word7{i:02d}" for i in range(10))
+        assert "stripe" not in entry["keywords"]
+
+    def test_keywords_without_counts_are_adopted(self):
+        entry = {"keywords": ["stripe", "invoice"]}
+        _grow_topic_keywords(entry, {"invoice"}, 5)
+        assert entry["keyword_stats"] == {"invoice": [2, 5], "stripe": [1, 0]}
+        assert entry["keywords"] == ["invoice", "stripe"]
+
+    def test_record_keeps_counts(self, tmp_project):
+        for n in range(1, 4):
+            record_consultation(
+                project_dir=tmp_project,
+                session_id=None,
+                goal=f"database pgbouncer pooling round {n}",
+                strategist_summary="s",
+                critic_summary="c",
+                decision="Pool connections with pgbouncer",
+            )
+        database = load_index(tmp_project)["topic_index"]["database"]
+        assert database["keyword_stats"]["pgbouncer"] == [3, 3]
+        assert database["keywords"] == ["connections", "database", "pgbouncer", "pool", "pooling", "round"]
+
+
+class TestSpecificityWeights:
+    def _index(self, counted: bool) -> dict:
+        topic_index = {
+            topic: {"keywords": [specific, "shared", "common"]}
+            for topic, specific in [("billing", "invoice"), ("search", "ranker"), ("mail", "smtp"), ("auth", "tokens")]
+        }
+        if counted:
+            for info in topic_index.values():
+                info["keyword_stats"] = {kw: [1, 1] for kw in info["keywords"]}
+        return topic_index
+
+    def test_words_kept_by_every_topic_do_not_tag(self):
+        topic_index = self._index(counted=True)
+        assert extract_topics("shared common words", topic_index) == set()
+        assert extract_topics("invoice shared", topic_index) == {"billing"}
+
+    def test_uncounted_keywords_weigh_one(self):
+        topic_index = self._index(counted=False)
+        assert extract_topics("shared", topic_index) == {"billing", "search", "mail", "auth"}
+
+    def test_partial_weights_add_up(self):
+        topic_index = {
+            topic: {"keywords": keywords, "keyword_stats": {kw: [1, 1] for kw in keywords}}
+            for topic, keywords in [
+                ("billing", ["ledger", "payout"]),
+                ("search", ["ledger", "payout"]),
+                ("mail", ["ledger", "payout"]),
+                ("auth", ["tokens"]),
+                ("jobs", ["cron"]),
+                ("docs", ["guide"]),
+                ("ops", ["pager"]),
+                ("misc", ["other"]),
+                ("files", ["upload"]),
+            ]
+        }
+        # Kept by 3 of 9 topics: each word weighs log(3)/log(4.5), both together reach 1
+        assert extract_topics("ledger", topic_index) == set()
+        assert extract_topics("ledger payout", topic_index) == {"billing", "search", "mail"}
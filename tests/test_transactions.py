@@ -0,0 +1,180 @@
+"""Tests for the single-transaction record path and crash recovery."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import memory
+from memory import (
+    ARCHIVE_FILES,
+    ROLES,
+    _MemoryTransaction,
+    apply_compaction,
+    build_memory_response,
+    invalidate_memory_cache,
+    load_active,
+    load_index,
+    load_lessons_index,
+    record_consultation,
+    recover_memory,
+    verify_memory,
+)
+from tests.conftest import add_consultation
+
+
+def _snapshot(project_dir: str) -> dict[str, bytes]:
+    memory_dir = Path(project_dir) / ".council" / "memory"
+    return {p.name: p.read_bytes() for p in sorted(memory_dir.iterdir()) if p.is_file()}
+
+
+class TestSingleTransaction:
+    def test_each_file_written_once(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        commits = []
+        original = _MemoryTransaction.commit
+
+        def spy(self):
+            commits.append(self)
+            return original(self)
+
+        def no_direct_writes(*args, **kwargs):
+            raise AssertionError("wrote outside the transaction")
+
+        monkeypatch.setattr(_MemoryTransaction, "commit", spy)
+        monkeypatch.setattr(memory, "_write_json", no_direct_writes)
+        add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+
+        assert len(commits) == 1
+        written = set(commits[0].bytes_written)
+        assert set(ARCHIVE_FILES) <= written
+        assert "index.json" in written
+        # The sidecars trail their files (SIDECAR_LAG bytes, RETRIEVAL_INDEX_EVERY records).
+        assert not {"lessons-index.json", "decisions-index.json", "retrieval-index.json"} & written
+        assert {f"{r}-active.json" for r in ("strategist", "critic", "hub")} <= written
+
+    def test_only_changed_roles_are_rewritten(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        commits = []
+        original = _MemoryTransaction.commit
+
+        def spy(self):
+            commits.append(self)
+            return original(self)
+
+        monkeypatch.setattr(_MemoryTransaction, "commit", spy)
+        record_consultation(
+            project_dir=tmp_project,
+            session_id="S-002",
+            goal="database consultation 2",
+            strategist_summary="s",
+            critic_summary="c",
+            decision="d",
+            critic_lesson="Critic lesson 2.",
+        )
+        written = {name for name in commits[0].bytes_written if name.endswith("-active.json")}
+        assert written == {"critic-active.json"}
+
+    def test_sidecars_rewritten_once_the_lag_is_reached(self, tmp_project, monkeypatch):
+        monkeypatch.setattr(memory, "SIDECAR_LAG", 1)
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+        memory_dir = Path(tmp_project) / ".council" / "memory"
+        for name, sidecar in (("lessons.jsonl", "lessons-index.json"), ("decisions.md", "decisions-index.json")):
+            assert memory._read_json(memory_dir / sidecar)["size"] == (memory_dir / name).stat().st_size
+
+    def test_sidecars_current_after_commit(self, tmp_project, monkeypatch):
+        for n in range(1, 4):
+            add_consultation(tmp_project, n, roles=ROLES, numbered=True)
+        memory_dir = Path(tmp_project) / ".council" / "memory"
+        assert not (memory_dir / "commit.json").exists()
+        assert not list(memory_dir.glob("*.pending"))
+
+        lidx = load_lessons_index(tmp_project)
+        assert lidx["size"] == (memory_dir / "lessons.jsonl").stat().st_size
+        assert lidx["count"] == 9
+
+        # Nothing drifted: verify finds every counter already correct.
+        invalidate_memory_cache()
+        assert verify_memory(tmp_project)["archive"] == {}
+
+    def test_session_id_allocated_when_missing(self, tmp_project):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True, session_id="")
+        add_consultation(tmp_project, 2, roles=ROLES, numbered=True, session_id="")
+        recent = load_index(tmp_project)["recent_decisions"]
+        assert [d["session_id"] for d in recent] == ["S-001", "S-002"]
+
+    def test_apply_compaction_updates_watermark_and_index(self, tmp_project):
+        for n in range(1, 4):
+            add_consultation(tmp_project, n, roles=ROLES, numbered=True)
+        kept = load_active(tmp_project, "strategist")["entries"][:1]
+        apply_compaction(tmp_project, "strategist", kept)
+        assert load_index(tmp_project)["compaction_watermark"] == "S-003"
+        assert [e["id"] for e in load_active(tmp_project, "strategist")["entries"]] == [kept[0]["id"]]
+        output = build_memory_response(tmp_project, goal="database", max_tokens=4000, role_filter="strategist")
+        assert "M-strategist-001" in output
+        assert "M-strategist-003" not in output
+
+
+class TestCrashRecovery:
+    def test_crash_before_commit_point_rolls_back(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        before = _snapshot(tmp_project)
+        original = memory._write_durable
+
+        def crash_on_pending(path, raw):
+            if path.name.endswith(".pending"):
+                raise OSError("simulated crash")
+            return original(path, raw)
+
+        monkeypatch.setattr(memory, "_write_durable", crash_on_pending)
+        with pytest.raises(OSError):
+            add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+        monkeypatch.undo()
+
+        assert "rolled back" in recover_memory(tmp_project)
+        assert _snapshot(tmp_project) == before
+
+    def test_crash_after_commit_point_rolls_forward(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        original = memory.os.replace
+        calls = []
+
+        def crash_mid_rename(src, dst):
+            if str(src).endswith(".pending"):
+                calls.append(src)
+                if len(calls) == 2:
+                    raise OSError("simulated crash")
+            return original(src, dst)
+
+        monkeypatch.setattr(memory.os, "replace", crash_mid_rename)
+        with pytest.raises(OSError):
+            add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+        monkeypatch.undo()
+
+        assert "rolled forward" in recover_memory(tmp_project)
+        index = load_index(tmp_project)
+        assert index["consultation_count"] == 2
+        assert len(load_active(tmp_project, "critic")["entries"]) == 2
+        assert verify_memory(tmp_project)["archive"] == {}
+
+    def test_next_record_recovers_first(self, tmp_project, monkeypatch):
+        add_consultation(tmp_project, 1, roles=ROLES, numbered=True)
+        original = memory._write_durable
+
+        def crash_on_pending(path, raw):
+            if path.name.endswith(".pending"):
+                raise OSError("simulated crash")
+            return original(path, raw)
+
+        monkeypatch.setattr(memory, "_write_durable", crash_on_pending)
+        with pytest.raises(OSError):
+            add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+        monkeypatch.undo()
+
+        add_consultation(tmp_project, 2, roles=ROLES, numbered=True)
+        assert load_index(tmp_project)["consultation_count"] == 2
+        assert verify_memory(tmp_project)["archive"] == {}
+        assert load_lessons_index(tmp_project)["count"] == 6